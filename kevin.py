@@ -1,51 +1,422 @@
-import speech_recognition as sr
-import pyautogui
+from __future__ import annotations
+
+import time
+STARTUP_T0 = time.perf_counter()
+
 import threading
-import tempfile
+import asyncio
+import signal
 import os
-import time
-import uuid
+import io
+import shutil
+import tempfile
+import hashlib
+import math
+import heapq
+import random
+import re
+import string
 import sys
-from datetime import datetime
-
-from gtts import gTTS
-from playsound import playsound
-from rich.console import Console
-from rich.panel import Panel
-from rich.text import Text
-from rich.layout import Layout
-from rich.live import Live
-from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.align import Align
-from rich.rule import Rule
-from rich.prompt import Prompt, IntPrompt
-
-from ctypes import cast, POINTER
-from comtypes import CLSCTX_ALL
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-
-# Add new imports for better device handling
-import sounddevice as sd
-import soundfile as sf
-import pyaudio
-import wave
+import argparse
+import importlib
 import contextlib
-from typing import Optional, Tuple, List
 import json
+import mmap
+import struct
+import socket
+import stat
 import atexit
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime
+from typing import Optional, Tuple, List
+
+from rich.console import Console
+
+# Startup timing breakdown, printed with --profile-startup
+class StartupProfiler:
+    def __init__(self, t0: float):
+        self.t0 = t0
+        self.stages = []  # (name, seconds, finished_at)
+        self.lock = threading.Lock()
+
+    def record(self, name: str, seconds: float):
+        with self.lock:
+            self.stages.append((name, seconds, time.perf_counter() - self.t0))
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def report(self):
+        table = Table(title="Startup profile", show_header=True)
+        table.add_column("Stage", style="cyan")
+        table.add_column("Duration", style="yellow", justify="right")
+        table.add_column("Done at", style="green", justify="right")
+        with self.lock:
+            stages = list(self.stages)
+        for name, seconds, done_at in stages:
+            table.add_row(name, f"{seconds * 1000:.1f} ms", f"{done_at * 1000:.0f} ms")
+        console.print(table)
+
+startup_profile = StartupProfiler(STARTUP_T0)
+
+class LazyImport:
+    """Placeholder for a module, or a name inside one, imported on first use.
+
+    The first attribute access or call imports the real object, records the
+    import time, and rebinds the global name to it so later lookups go
+    straight to the real object.
+    """
+
+    def __init__(self, alias: str, module: str, attr: Optional[str] = None):
+        self._alias = alias
+        self._module = module
+        self._attr = attr
+
+    def _resolve(self):
+        start = time.perf_counter()
+        target = importlib.import_module(self._module)
+        if self._attr:
+            target = getattr(target, self._attr)
+        startup_profile.record(f"import {self._module}", time.perf_counter() - start)
+        globals()[self._alias] = target
+        return target
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+# Heavy dependencies load on first use
+sr = LazyImport('sr', 'speech_recognition')
+pyautogui = LazyImport('pyautogui', 'pyautogui')
+gTTS = LazyImport('gTTS', 'gtts', 'gTTS')
+sd = LazyImport('sd', 'sounddevice')
+sf = LazyImport('sf', 'soundfile')
+np = LazyImport('np', 'numpy')
+pyaudio = LazyImport('pyaudio', 'pyaudio')
+Panel = LazyImport('Panel', 'rich.panel', 'Panel')
+Text = LazyImport('Text', 'rich.text', 'Text')
+Layout = LazyImport('Layout', 'rich.layout', 'Layout')
+Live = LazyImport('Live', 'rich.live', 'Live')
+Table = LazyImport('Table', 'rich.table', 'Table')
+Align = LazyImport('Align', 'rich.align', 'Align')
+Rule = LazyImport('Rule', 'rich.rule', 'Rule')
+Prompt = LazyImport('Prompt', 'rich.prompt', 'Prompt')
+IntPrompt = LazyImport('IntPrompt', 'rich.prompt', 'IntPrompt')
 
 # Console UI with custom theme
 console = Console()
 
-# Volume control setup
-devices = AudioUtilities.GetSpeakers()
-interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-volume = cast(interface, POINTER(IAudioEndpointVolume))
+# System volume backends
+class VolumeBackend:
+    """In-process mirror of the system volume and mute state.
+
+    Reads are served from the mirror and never touch the device. Writes
+    update the mirror immediately and are applied by a device thread; if
+    several writes arrive while one is being applied, only the latest level
+    and mute state reach the device. The mirror is resynchronized from the
+    device in the background to pick up changes made elsewhere. If the
+    device cannot be opened, the mirror carries on alone and volume commands
+    are simulated, as with FakeVolumeBackend.
+    """
+    name = "base"
+
+    def __init__(self, resync_interval: float = 5.0):
+        self.resync_interval = resync_interval
+        self.level = 0.0
+        self.muted = False
+        self.pending_level = None
+        self.pending_mute = None
+        self.resync_requested = True
+        self.cond = threading.Condition()
+        self.thread = None
+        self.running = False
+        self.error = None  # why the device could not be opened
+        self.synced = threading.Event()
+        self.subscribers = []
+        self.requests = 0
+        self.device_writes = 0
+        self.device_reads = 0
+
+    # Device access, run only on the device thread
+    def _thread_init(self):
+        pass
+
+    def _read_device(self) -> Tuple[float, bool]:
+        raise NotImplementedError
+
+    def _write_level(self, level: float):
+        raise NotImplementedError
+
+    def _write_mute(self, muted: bool):
+        raise NotImplementedError
+
+    def start(self):
+        """Start the device thread; the mirror is filled by its first read"""
+        with self.cond:
+            if self.running or self.error is not None:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self._run, name=f"kevin-volume-{self.name}", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.flush()
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+
+    def subscribe(self, callback):
+        """Call callback(level, muted) whenever the mirror changes"""
+        self.subscribers.append(callback)
+
+    def _publish(self):
+        for callback in self.subscribers:
+            callback(self.level, self.muted)
+
+    def _run(self):
+        try:
+            self._thread_init()
+        except Exception as e:
+            console.print(f"[red]⚠️  Volume control unavailable ({self.name}): {e}; volume commands are simulated[/red]")
+            with self.cond:
+                # Nothing will apply queued writes; release flush() and stop restarts
+                self.error = str(e)
+                self.running = False
+                self.pending_level = self.pending_mute = None
+                self.cond.notify_all()
+            self.synced.set()
+            return
+        next_resync = 0.0
+        while True:
+            with self.cond:
+                while self.running and self.pending_level is None and self.pending_mute is None \
+                        and not self.resync_requested:
+                    timeout = next_resync - time.monotonic()
+                    if timeout <= 0:
+                        self.resync_requested = True
+                        break
+                    self.cond.wait(timeout)
+                if not self.running:
+                    return
+                level, self.pending_level = self.pending_level, None
+                muted, self.pending_mute = self.pending_mute, None
+                resync = self.resync_requested and level is None and muted is None
+                self.resync_requested = False if resync else self.resync_requested
+            try:
+                if level is not None:
+                    self._write_level(level)
+                    self.device_writes += 1
+                if muted is not None:
+                    self._write_mute(muted)
+                    self.device_writes += 1
+                if resync:
+                    device_level, device_muted = self._read_device()
+                    self.device_reads += 1
+                    with self.cond:
+                        # A write queued during the read wins over what the device reported
+                        if self.pending_level is None:
+                            self.level = device_level
+                        if self.pending_mute is None:
+                            self.muted = device_muted
+                    next_resync = time.monotonic() + self.resync_interval
+                    self.synced.set()
+                    self._publish()
+            except Exception as e:
+                console.print(f"[yellow]⚠️  Volume backend error ({self.name}): {e}[/yellow]")
+                next_resync = time.monotonic() + self.resync_interval
+                self.synced.set()
+            with self.cond:
+                self.cond.notify_all()
+
+    def request_resync(self):
+        with self.cond:
+            self.resync_requested = True
+            self.cond.notify_all()
+
+    def get_level(self) -> float:
+        return self.level
+
+    def is_muted(self) -> bool:
+        return self.muted
+
+    def set_level(self, level: float) -> float:
+        """Set the level (0.0-1.0); returns the new mirrored level"""
+        if not self.running:
+            self.start()
+        with self.cond:
+            self.level = min(max(level, 0.0), 1.0)
+            self.pending_level = self.level
+            self.requests += 1
+            self.cond.notify_all()
+        self._publish()
+        return self.level
+
+    def step(self, delta: float) -> float:
+        """Move the level by delta relative to the mirror"""
+        with self.cond:
+            target = self.level + delta
+        return self.set_level(target)
+
+    def set_mute(self, muted: bool):
+        if not self.running:
+            self.start()
+        with self.cond:
+            self.muted = bool(muted)
+            self.pending_mute = self.muted
+            self.requests += 1
+            self.cond.notify_all()
+        self._publish()
+
+    def flush(self, timeout: float = 1.0) -> bool:
+        """Wait until queued writes have been applied"""
+        with self.cond:
+            return self.cond.wait_for(
+                lambda: not self.running or (self.pending_level is None and self.pending_mute is None), timeout)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "requests": self.requests,
+            "device_writes": self.device_writes,
+            "device_reads": self.device_reads,
+            "coalesced": max(0, self.requests - self.device_writes),
+            "error": self.error,
+        }
+
+class PycawVolume(VolumeBackend):
+    """Windows endpoint volume through pycaw, owned by the device thread's COM apartment"""
+    name = "pycaw"
+
+    def _thread_init(self):
+        import comtypes
+        from ctypes import cast, POINTER
+        from comtypes import CLSCTX_ALL
+        from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+        comtypes.CoInitialize()
+        devices = AudioUtilities.GetSpeakers()
+        interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+        self.endpoint = cast(interface, POINTER(IAudioEndpointVolume))
+
+    def _read_device(self) -> Tuple[float, bool]:
+        return float(self.endpoint.GetMasterVolumeLevelScalar()), bool(self.endpoint.GetMute())
+
+    def _write_level(self, level: float):
+        self.endpoint.SetMasterVolumeLevelScalar(level, None)
+
+    def _write_mute(self, muted: bool):
+        self.endpoint.SetMute(1 if muted else 0, None)
+
+class PactlVolume(VolumeBackend):
+    """PulseAudio / PipeWire sink through pactl (the default sink unless one is named).
+
+    External changes are picked up from `pactl subscribe` events rather
+    than by polling, so steady-state reads cost no subprocess calls.
+    """
+    name = "pactl"
+    SINK = "@DEFAULT_SINK@"
+
+    def __init__(self, resync_interval: float = 60.0, sink: str = SINK):
+        super().__init__(resync_interval)
+        self.sink = sink
+        self.watcher = None
+
+    def _pactl(self, *args) -> str:
+        import subprocess
+        return subprocess.run(["pactl", *args], check=True, capture_output=True, text=True, timeout=2).stdout
+
+    def _thread_init(self):
+        import subprocess
+        self.watcher = subprocess.Popen(["pactl", "subscribe"], stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, text=True)
+        threading.Thread(target=self._watch, name="kevin-volume-events", daemon=True).start()
+
+    def _watch(self):
+        for line in self.watcher.stdout:
+            if "'change' on sink" in line and self.pending_level is None:
+                self.request_resync()
+
+    def _read_device(self) -> Tuple[float, bool]:
+        volume_text = self._pactl("get-sink-volume", self.sink)
+        percents = [int(p) for p in re.findall(r"(\d+)%", volume_text)]
+        mute_text = self._pactl("get-sink-mute", self.sink)
+        level = (sum(percents) / len(percents) / 100.0) if percents else 0.0
+        return level, "yes" in mute_text.lower()
+
+    def _write_level(self, level: float):
+        self._pactl("set-sink-volume", self.sink, f"{int(round(level * 100))}%")
+
+    def _write_mute(self, muted: bool):
+        self._pactl("set-sink-mute", self.sink, "1" if muted else "0")
+
+    def stop(self):
+        super().stop()
+        if self.watcher is not None:
+            self.watcher.terminate()
+
+class FakeVolumeBackend(VolumeBackend):
+    """In-memory volume 'device' for tests and benchmarks"""
+    name = "fake"
+
+    def __init__(self, level: float = 0.5, muted: bool = False):
+        super().__init__(resync_interval=3600.0)
+        self.device_level = level
+        self.device_muted = muted
+        self.level = level
+        self.muted = muted
+
+    def _read_device(self) -> Tuple[float, bool]:
+        return self.device_level, self.device_muted
+
+    def _write_level(self, level: float):
+        self.device_level = level
+
+    def _write_mute(self, muted: bool):
+        self.device_muted = muted
+
+def create_volume_backend(kind: str = "auto") -> VolumeBackend:
+    """Pick a volume backend: pycaw on Windows, pactl where available, else in-memory"""
+    if kind == "auto":
+        if sys.platform == "win32":
+            kind = "pycaw"
+        elif shutil.which("pactl"):
+            kind = "pactl"
+        else:
+            console.print("[yellow]⚠️  No system volume control found; volume commands are simulated[/yellow]")
+            kind = "fake"
+    backend = {"pycaw": PycawVolume, "pactl": PactlVolume, "fake": FakeVolumeBackend}[kind]()
+    backend.start()
+    return backend
+
+volume_backend = None
+
+def volume_control(room=None) -> VolumeBackend:
+    """The volume backend commands act on: the room's own, else the system one, created on first use"""
+    global volume_backend
+    if room is not None and room.volume is not None:
+        return room.volume
+    if volume_backend is None:
+        volume_backend = create_volume_backend()
+        volume_backend.subscribe(sync_volume_state)
+    return volume_backend
 
 # Enhanced state management
 class KevinState:
+    # Fields shown on the dashboard; changing one notifies subscribers
+    WATCHED_FIELDS = frozenset({
+        'is_listening', 'last_command', 'commands_processed', 'current_volume',
+        'is_muted', 'status', 'mic_name', 'speaker_name',
+    })
+
     def __init__(self):
+        object.__setattr__(self, 'subscribers', [])
         self.is_listening = False
         self.last_command = "None"
         self.commands_processed = 0
@@ -57,23 +428,88 @@ class KevinState:
         self.speaker_device = None
         self.mic_name = "Default"
         self.speaker_name = "Default"
+        self.mic_key = None  # stable device identity, see DeviceRegistry
+        self.speaker_key = None
         self.config_file = "kevin_config.json"
+        self.config_lock = threading.Lock()
+        self.calibration = None  # input device identity -> calibration profile, read on first use
         self.audio_stream = None
         self.pyaudio_instance = None
         
+    def __setattr__(self, name, value):
+        if name in self.WATCHED_FIELDS:
+            if name in self.__dict__ and self.__dict__[name] == value:
+                return
+            object.__setattr__(self, name, value)
+            for callback in self.subscribers:
+                callback(name, value)
+        else:
+            object.__setattr__(self, name, value)
+
+    def subscribe(self, callback):
+        """Call callback(field, value) whenever a watched field changes"""
+        self.subscribers.append(callback)
+
+    def summary(self) -> dict:
+        """The watched fields and their current values"""
+        return {name: getattr(self, name) for name in sorted(self.WATCHED_FIELDS)}
+
     def save_config(self):
         """Save current device configuration"""
-        config = {
+        self._write_config({
             "mic_device": self.mic_device,
             "speaker_device": self.speaker_device,
             "mic_name": self.mic_name,
-            "speaker_name": self.speaker_name
-        }
-        try:
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f)
-        except Exception as e:
-            console.print(f"[yellow]⚠️  Could not save config: {e}[/yellow]")
+            "speaker_name": self.speaker_name,
+            "mic_key": list(self.mic_key) if self.mic_key else None,
+            "speaker_key": list(self.speaker_key) if self.speaker_key else None
+        })
+
+    def _write_config(self, fields: dict):
+        # Merged into what is on disk and swapped in whole, so a crash never leaves half a file
+        with self.config_lock:
+            try:
+                try:
+                    with open(self.config_file, 'r') as f:
+                        config = json.load(f)
+                except (FileNotFoundError, ValueError):
+                    config = {}
+                config.update(fields)
+                tmp_path = f"{self.config_file}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(config, f)
+                os.replace(tmp_path, self.config_file)
+            except Exception as e:
+                console.print(f"[yellow]⚠️  Could not save config: {e}[/yellow]")
+
+    @staticmethod
+    def calibration_id(key: Optional[tuple]) -> str:
+        return "|".join(str(part) for part in key) if key else "default"
+
+    def _calibration(self) -> dict:
+        if self.calibration is None:
+            try:
+                with open(self.config_file, 'r') as f:
+                    self.calibration = json.load(f).get('calibration', {})
+            except Exception:
+                self.calibration = {}
+        return self.calibration
+
+    def calibration_for(self, key: Optional[tuple]) -> Optional[dict]:
+        """Saved calibration profile of the input device with this identity"""
+        return self._calibration().get(self.calibration_id(key))
+
+    def last_good_calibration(self, key: Optional[tuple]) -> Optional[dict]:
+        """This device's profile, else the most recently saved one of any device"""
+        profiles = self._calibration()
+        return profiles.get(self.calibration_id(key)) or \
+            max(profiles.values(), key=lambda p: p.get('updated', ''), default=None)
+
+    def store_calibration(self, key: Optional[tuple], profile: dict):
+        """Remember a device's calibration profile and persist it"""
+        profiles = self._calibration()
+        profiles[self.calibration_id(key)] = profile
+        self._write_config({"calibration": dict(profiles)})
 
     def load_config(self):
         """Load saved device configuration"""
@@ -84,6 +520,9 @@ class KevinState:
                 self.speaker_device = config.get('speaker_device')
                 self.mic_name = config.get('mic_name', "Default")
                 self.speaker_name = config.get('speaker_name', "Default")
+                self.mic_key = tuple(config['mic_key']) if config.get('mic_key') else None
+                self.speaker_key = tuple(config['speaker_key']) if config.get('speaker_key') else None
+                self.calibration = config.get('calibration', {})
                 return True
         except FileNotFoundError:
             return False
@@ -93,34 +532,221 @@ class KevinState:
 
 state = KevinState()
 
+# Per-stage latency instrumentation
+METRICS_JSON = "kevin_metrics.json"
+METRICS_PROM = "kevin_metrics.prom"
+
+# Pipeline stages in the order a command passes through them
+LATENCY_STAGES = (
+    'endpoint',        # end of speech -> endpoint decision
+    'asr',             # recognizer request -> response
+    'wake',            # wake word check on an utterance
+    'match',           # grammar match
+    'trigger',         # speech onset -> command dispatched
+    'dispatch',        # action queued -> executed (includes rate limiting)
+    'action',          # action execution
+    'speech_queue',    # response queued -> picked up by the speech worker
+    'tts_synth',       # synthesis / cache lookup
+    'response',        # end of speech -> playback start
+    'first_audio',     # response ready -> first sample at the DAC
+    'playback',        # playback start -> end
+)
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram from 10 µs to 100 s with O(1) recording"""
+    MIN_LOG10 = -5.0
+    MAX_LOG10 = 2.0
+    BUCKETS_PER_DECADE = 40  # ~6% bucket width
+
+    def __init__(self):
+        self.size = int((self.MAX_LOG10 - self.MIN_LOG10) * self.BUCKETS_PER_DECADE) + 1
+        self.counts = [0] * self.size
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        if seconds > 0:
+            index = int((math.log10(seconds) - self.MIN_LOG10) * self.BUCKETS_PER_DECADE)
+            index = min(max(index, 0), self.size - 1)
+        else:
+            index = 0
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """Upper edge of the bucket holding the q-th quantile, in seconds"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                edge = 10 ** (self.MIN_LOG10 + (index + 1) / self.BUCKETS_PER_DECADE)
+                return min(edge, self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+            "sum": self.total,
+        }
+
+class CommandTrace:
+    """Monotonic start time of one command (the end of the user's speech)"""
+    __slots__ = ('start',)
+
+    def __init__(self, start: Optional[float] = None):
+        self.start = time.monotonic() if start is None else start
+
+class LatencyMetrics:
+    """Per-stage histograms with periodic JSON and Prometheus text export.
+
+    Recording is a dictionary lookup and a bucket increment, and returns
+    immediately when disabled, so it can stay on the hot path.
+    """
+
+    def __init__(self, enabled: bool = True, json_path: str = METRICS_JSON,
+                 prom_path: str = METRICS_PROM, interval: float = 10.0):
+        self.enabled = enabled
+        self.json_path = json_path
+        self.prom_path = prom_path
+        self.interval = interval
+        self.histograms = {stage: LatencyHistogram() for stage in LATENCY_STAGES}
+        self.counters = {}  # (family, outcome) -> count
+        self.lock = threading.Lock()
+        self.version = 0
+        self.written_version = 0
+        self.writer = None
+        self.stop_event = threading.Event()
+        self.observers = []
+
+    def subscribe(self, callback):
+        """Call callback(stage, seconds) after every recorded latency"""
+        self.observers.append(callback)
+
+    def record(self, stage: str, seconds: float):
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram()
+            histogram.record(seconds)
+            self.version += 1
+        for callback in self.observers:
+            callback(stage, seconds)
+
+    def count(self, family: str, outcome: str, n: int = 1):
+        """Increment a counter, exported as kevin_<family>_total{outcome=...}"""
+        if not self.enabled:
+            return
+        with self.lock:
+            key = (family, outcome)
+            self.counters[key] = self.counters.get(key, 0) + n
+            self.version += 1
+
+    def counter_snapshot(self) -> dict:
+        with self.lock:
+            snapshot = {}
+            for (family, outcome), value in self.counters.items():
+                snapshot.setdefault(family, {})[outcome] = value
+            return snapshot
+
+    def set_enabled(self, enabled: bool):
+        """Switch instrumentation on or off at runtime"""
+        self.enabled = enabled
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {stage: h.snapshot() for stage, h in self.histograms.items() if h.count}
+
+    def to_prometheus(self, snapshot: Optional[dict] = None, counters: Optional[dict] = None) -> str:
+        """Prometheus text exposition format, one summary per stage plus the counters"""
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        counters = self.counter_snapshot() if counters is None else counters
+        lines = [
+            "# HELP kevin_stage_latency_seconds Kevin command pipeline latency by stage.",
+            "# TYPE kevin_stage_latency_seconds summary",
+        ]
+        for stage, stats in snapshot.items():
+            for quantile, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+                lines.append(f'kevin_stage_latency_seconds{{stage="{stage}",quantile="{quantile}"}} {stats[key]:.6f}')
+            lines.append(f'kevin_stage_latency_seconds_sum{{stage="{stage}"}} {stats["sum"]:.6f}')
+            lines.append(f'kevin_stage_latency_seconds_count{{stage="{stage}"}} {stats["count"]}')
+        for family, outcomes in counters.items():
+            lines.append(f"# TYPE kevin_{family}_total counter")
+            for outcome, value in outcomes.items():
+                lines.append(f'kevin_{family}_total{{outcome="{outcome}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def export(self):
+        """Rewrite the JSON and Prometheus files if anything was recorded since the last export"""
+        if self.version == self.written_version:
+            return
+        version = self.version
+        snapshot = self.snapshot()
+        counters = self.counter_snapshot()
+        document = {"updated": datetime.now().isoformat(timespec='seconds'), "stages": snapshot,
+                    "counters": counters}
+        for path, text in ((self.json_path, json.dumps(document, indent=2)),
+                           (self.prom_path, self.to_prometheus(snapshot, counters))):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        self.written_version = version
+
+    def start_export(self):
+        """Export periodically on a background thread"""
+        if self.writer is not None:
+            return
+
+        def run():
+            while not self.stop_event.wait(self.interval):
+                try:
+                    self.export()
+                except Exception as e:
+                    console.print(f"[yellow]⚠️  Could not export metrics: {e}[/yellow]")
+
+        self.writer = threading.Thread(target=run, name="kevin-metrics", daemon=True)
+        self.writer.start()
+
+    def stop_export(self):
+        self.stop_event.set()
+        with contextlib.suppress(Exception):
+            self.export()
+
+metrics = LatencyMetrics()
+
 # Enhanced device management
 class AudioDeviceManager:
     def __init__(self):
-        self.pa = pyaudio.PyAudio()
+        self._pa = None
+        
+    @property
+    def pa(self):
+        """PyAudio instance, created on first use"""
+        if self._pa is None:
+            self._pa = pyaudio.PyAudio()
+        return self._pa
         
     def get_input_devices(self) -> List[Tuple[int, str]]:
         """Get all available input devices"""
-        devices = []
-        try:
-            for i in range(self.pa.get_device_count()):
-                device_info = self.pa.get_device_info_by_index(i)
-                if device_info['maxInputChannels'] > 0:
-                    devices.append((i, device_info['name']))
-        except Exception as e:
-            console.print(f"[red]Error getting input devices: {e}[/red]")
-        return devices
+        return device_registry.input_devices()
 
     def get_output_devices(self) -> List[Tuple[int, str]]:
         """Get all available output devices"""
-        devices = []
-        try:
-            for i in range(self.pa.get_device_count()):
-                device_info = self.pa.get_device_info_by_index(i)
-                if device_info['maxOutputChannels'] > 0:
-                    devices.append((i, device_info['name']))
-        except Exception as e:
-            console.print(f"[red]Error getting output devices: {e}[/red]")
-        return devices
+        return device_registry.output_devices()
 
     def test_microphone(self, device_index: int) -> bool:
         """Test if microphone is working"""
@@ -164,15 +790,265 @@ class AudioDeviceManager:
             console.print(f"[red]Speaker test failed: {e}[/red]")
             return False
 
+    def probe_devices(self, mic_index: int, speaker_index: int) -> Tuple[bool, bool]:
+        """Test a microphone and a speaker together, sharing one settle period"""
+        streams = {}
+        results = {'mic': False, 'speaker': False}
+        for kind, options in (
+            ('mic', dict(channels=1, input=True, input_device_index=mic_index)),
+            ('speaker', dict(channels=2, output=True, output_device_index=speaker_index)),
+        ):
+            try:
+                stream = self.pa.open(
+                    rate=44100,
+                    format=pyaudio.paFloat32,
+                    frames_per_buffer=1024,
+                    start=False,
+                    **options
+                )
+                stream.start_stream()
+                streams[kind] = stream
+            except Exception as e:
+                label = "Microphone" if kind == 'mic' else "Speaker"
+                console.print(f"[red]{label} test failed: {e}[/red]")
+        time.sleep(0.1)  # Short test, shared by both devices
+        for kind, stream in streams.items():
+            try:
+                stream.stop_stream()
+                stream.close()
+                results[kind] = True
+            except Exception as e:
+                console.print(f"[red]Device test failed: {e}[/red]")
+        return results['mic'], results['speaker']
+
     def cleanup(self):
         """Cleanup PyAudio resources"""
-        if self.pa:
-            self.pa.terminate()
+        if self._pa:
+            self._pa.terminate()
+            self._pa = None
 
 # Initialize audio device manager
 device_manager = AudioDeviceManager()
 atexit.register(device_manager.cleanup)
 
+# Audio device registry
+# sounddevice releases whose private _terminate()/_initialize() are known to
+# re-initialize PortAudio; the only way it re-enumerates hot-plugged devices
+SD_REINIT_VERSIONS = ((0, 3), (0, 6))
+
+def sd_can_reinitialize() -> bool:
+    """True if PortAudio can be re-initialized through this sounddevice release"""
+    try:
+        version = tuple(int(part) for part in sd.__version__.split('.')[:2])
+    except (AttributeError, ValueError):
+        return False
+    low, high = SD_REINIT_VERSIONS
+    return low <= version < high and hasattr(sd, '_terminate') and hasattr(sd, '_initialize')
+
+class DeviceRegistry:
+    """Cached index of audio devices keyed by stable identity.
+
+    PyAudio and sounddevice number devices independently, and both numberings
+    shift when a headset is plugged in or out. Devices are therefore keyed by
+    (name, host API, input channels, output channels, occurrence), and each
+    key maps to its current index in both libraries. Lookups are dictionary
+    reads; the device list is rebuilt only when a refresh finds a change.
+    """
+
+    def __init__(self):
+        self.devices = {}  # key -> device info
+        self.by_pa_index = {}
+        self.by_sd_index = {}
+        self.lock = threading.RLock()
+        self.loaded = False
+        self.fingerprint = None
+        self.subscribers = []
+        self.before_rescan = []
+        self.poller = None
+        self.stop_event = threading.Event()
+        self.last_rescan = 0.0
+        self.warned_reinit = False
+
+    @staticmethod
+    def _keyed(entries):
+        # Number identical devices so two of the same headset get distinct keys
+        seen = {}
+        for base, index, rate in entries:
+            occurrence = seen.get(base, 0)
+            seen[base] = occurrence + 1
+            yield base + (occurrence,), index, rate
+
+    def _enumerate_sounddevice(self):
+        hostapis = [api['name'] for api in sd.query_hostapis()]
+        return list(self._keyed(
+            ((d['name'], hostapis[d['hostapi']], d['max_input_channels'], d['max_output_channels']),
+             index, d['default_samplerate'])
+            for index, d in enumerate(sd.query_devices())
+        ))
+
+    def _enumerate_pyaudio(self):
+        pa = device_manager.pa
+        hostapis = {}
+        entries = []
+        for index in range(pa.get_device_count()):
+            info = pa.get_device_info_by_index(index)
+            api = info['hostApi']
+            if api not in hostapis:
+                hostapis[api] = pa.get_host_api_info_by_index(api)['name']
+            entries.append(((info['name'], hostapis[api], info['maxInputChannels'], info['maxOutputChannels']),
+                            index, info['defaultSampleRate']))
+        return list(self._keyed(entries))
+
+    def refresh(self, rescan: bool = False) -> bool:
+        """Rebuild the index; with rescan, re-initialize PortAudio to pick up hot-plugged devices.
+
+        Re-initializing tears down every open stream, so the before_rescan
+        callbacks stop capture and playback first and the subscribers reopen
+        them. On a sounddevice release outside SD_REINIT_VERSIONS the streams
+        are left running and the sounddevice side is only re-enumerated, so a
+        new device shows up there after a restart; PyAudio is always
+        reopened. Returns True if any device appeared, disappeared or moved.
+        """
+        with self.lock:
+            if rescan:
+                # PortAudio only enumerates devices when it is initialized
+                if sd_can_reinitialize():
+                    for callback in self.before_rescan:
+                        callback()
+                    sd._terminate()
+                    sd._initialize()
+                elif not self.warned_reinit:
+                    self.warned_reinit = True
+                    console.print(f"[yellow]⚠️  sounddevice {getattr(sd, '__version__', '?')} cannot be "
+                                  f"re-initialized; hot-plugged devices may need a restart[/yellow]")
+                device_manager.cleanup()
+                self.last_rescan = time.monotonic()
+
+            devices = {}
+            for field, entries in (('sd_index', self._safe(self._enumerate_sounddevice)),
+                                   ('pa_index', self._safe(self._enumerate_pyaudio))):
+                for key, index, rate in entries:
+                    info = devices.get(key)
+                    if info is None:
+                        info = devices[key] = {
+                            'key': key, 'name': key[0], 'hostapi': key[1],
+                            'inputs': key[2], 'outputs': key[3],
+                            'sd_index': None, 'pa_index': None, 'default_samplerate': rate,
+                        }
+                    info[field] = index
+
+            changed = not self.loaded or {
+                k: (v['sd_index'], v['pa_index']) for k, v in devices.items()
+            } != {k: (v['sd_index'], v['pa_index']) for k, v in self.devices.items()}
+            self.devices = devices
+            self.by_pa_index = {v['pa_index']: k for k, v in devices.items() if v['pa_index'] is not None}
+            self.by_sd_index = {v['sd_index']: k for k, v in devices.items() if v['sd_index'] is not None}
+            self.loaded = True
+            self.fingerprint = self._fingerprint()
+
+        if changed or rescan:
+            for callback in self.subscribers:
+                callback()
+        return changed
+
+    @staticmethod
+    def _safe(enumerate_fn):
+        try:
+            return enumerate_fn()
+        except Exception as e:
+            console.print(f"[red]Error listing audio devices: {e}[/red]")
+            return []
+
+    def _ensure_loaded(self):
+        if not self.loaded:
+            self.refresh()
+
+    @staticmethod
+    def _fingerprint():
+        """Cheap OS-level signature of the attached sound hardware: ALSA's /proc files on Linux,
+        the waveIn/waveOut device counts on Windows, None elsewhere"""
+        if sys.platform == "win32":
+            # winmm counts devices as they come and go, without re-initializing PortAudio
+            import ctypes
+            winmm = ctypes.windll.winmm
+            return f"{winmm.waveInGetNumDevs()}:{winmm.waveOutGetNumDevs()}"
+        parts = []
+        for path in ("/proc/asound/cards", "/proc/asound/pcm"):
+            try:
+                with open(path, 'r') as f:
+                    parts.append(f.read())
+            except OSError:
+                return None
+        return hashlib.sha1("".join(parts).encode()).hexdigest()
+
+    def key_for_pa(self, index: Optional[int]) -> Optional[tuple]:
+        self._ensure_loaded()
+        return self.by_pa_index.get(index)
+
+    def pa_index(self, key: Optional[tuple]) -> Optional[int]:
+        self._ensure_loaded()
+        info = self.devices.get(key)
+        return info['pa_index'] if info else None
+
+    def sd_index(self, key: Optional[tuple]) -> Optional[int]:
+        self._ensure_loaded()
+        info = self.devices.get(key)
+        return info['sd_index'] if info else None
+
+    def to_sd(self, pa_index: Optional[int]) -> Optional[int]:
+        """sounddevice index of the device PyAudio numbers pa_index (None stays the default device)"""
+        if pa_index is None:
+            return None
+        key = self.key_for_pa(pa_index)
+        return self.sd_index(key) if key else pa_index
+
+    def input_devices(self) -> List[Tuple[int, str]]:
+        self._ensure_loaded()
+        return sorted((v['pa_index'], v['name']) for v in self.devices.values()
+                      if v['inputs'] > 0 and v['pa_index'] is not None)
+
+    def output_devices(self) -> List[Tuple[int, str]]:
+        self._ensure_loaded()
+        return sorted((v['pa_index'], v['name']) for v in self.devices.values()
+                      if v['outputs'] > 0 and v['pa_index'] is not None)
+
+    def subscribe(self, callback):
+        """Call callback() after the device list changes or PortAudio is re-initialized"""
+        self.subscribers.append(callback)
+
+    def start_polling(self, interval: float = 3.0, needs_rescan=None):
+        """Watch for hot-plug in the background.
+
+        A rescan restarts capture, so it happens only when the OS device
+        signature changes (Linux and Windows), or when needs_rescan()
+        reports a problem (a stalled stream, or a missing saved device where
+        there is no signature to watch), at most once per interval.
+        """
+        if self.poller is not None:
+            return
+
+        def run():
+            while not self.stop_event.wait(interval):
+                try:
+                    self.poll_once(needs_rescan)
+                except Exception as e:
+                    console.print(f"[yellow]⚠️  Device poll failed: {e}[/yellow]")
+
+        self.poller = threading.Thread(target=run, name="kevin-devices", daemon=True)
+        self.poller.start()
+
+    def poll_once(self, needs_rescan=None):
+        """Rescan if the device signature changed or needs_rescan() asks for it"""
+        fingerprint = self._fingerprint()
+        if (fingerprint is not None and fingerprint != self.fingerprint) or \
+                (needs_rescan is not None and needs_rescan()):
+            self.refresh(rescan=True)
+
+    def stop_polling(self):
+        self.stop_event.set()
+
+device_registry = DeviceRegistry()
+
 # Device selection functions
 def list_microphones():
     """List available microphone devices"""
@@ -193,41 +1069,83 @@ def list_speakers():
     """List available audio output devices"""
     console.print("\n[cyan]🔊 Available Audio Output Devices:[/cyan]")
     
-    # Get all audio devices
-    import sounddevice as sd
-    devices = sd.query_devices()
+    # Cached output devices
+    output_devices = device_registry.output_devices()
     
     devices_table = Table(show_header=True, box=None)
     devices_table.add_column("Index", style="yellow", width=8)
     devices_table.add_column("Device Name", style="white")
     devices_table.add_column("Type", style="green", width=12)
     
-    output_devices = []
-    for i, device in enumerate(devices):
-        if device['max_output_channels'] > 0:  # Only output devices
-            devices_table.add_row(str(i), device['name'], "Output")
-            output_devices.append((i, device['name']))
+    for i, name in output_devices:
+        devices_table.add_row(str(i), name, "Output")
     
     console.print(devices_table)
     return output_devices
 
-def setup_dual_headset():
+def rebind_devices() -> bool:
+    """Point state at the saved devices' current indices; returns True if the microphone moved"""
+    # Configs written before device keys existed only have indices
+    if state.mic_key is None and state.mic_device is not None:
+        state.mic_key = device_registry.key_for_pa(state.mic_device)
+    if state.speaker_key is None and state.speaker_device is not None:
+        state.speaker_key = device_registry.key_for_pa(state.speaker_device)
+    
+    mic_moved = False
+    if state.mic_key is not None:
+        index = device_registry.pa_index(state.mic_key)
+        mic_moved = index != state.mic_device
+        state.mic_device = index
+    if state.speaker_key is not None:
+        state.speaker_device = device_registry.pa_index(state.speaker_key)
+    return mic_moved
+
+def on_devices_changed():
+    """Registry callback: follow saved devices to their new indices without prompting"""
+    mic_moved = rebind_devices()
+    capture = audio_capture
+    if capture is not None and (mic_moved or capture.stream is None):
+        device = device_registry.to_sd(state.mic_device)
+        console.print(f"[yellow]🔌 Audio devices changed; capturing from "
+                      f"{'default microphone' if device is None else state.mic_name}[/yellow]")
+        capture.rebind(device)
+
+# Without an OS device signature, how often to look for a missing saved device
+MISSING_DEVICE_RESCAN_S = 60.0
+
+def devices_need_rescan() -> bool:
+    """Capture has stalled, or a saved device is missing and may have been plugged back in"""
+    if audio_capture is not None and audio_capture.stalled:
+        return True
+    if device_registry.fingerprint is not None:
+        return False  # the device returning changes the signature, and poll_once rescans then
+    missing = any(key is not None and device_registry.pa_index(key) is None
+                  for key in (state.mic_key, state.speaker_key))
+    return missing and time.monotonic() - device_registry.last_rescan > MISSING_DEVICE_RESCAN_S
+
+def setup_dual_headset(use_saved: bool = False):
     """Enhanced interactive setup for dual headset configuration"""
     console.print(Rule("[bold cyan]🎧 DUAL HEADSET SETUP 🎧[/bold cyan]"))
     
     # Try to load previous configuration
     if state.load_config():
-        use_previous = Prompt.ask(
+        use_previous = "y" if use_saved else Prompt.ask(
             "\n[cyan]Previous configuration found. Use it?[/cyan]",
             choices=["y", "n"],
             default="y"
         )
         if use_previous == "y":
-            # Test previous devices
-            if (state.mic_device is None or 
-                state.speaker_device is None or 
-                not device_manager.test_microphone(state.mic_device) or 
-                not device_manager.test_speaker(state.speaker_device)):
+            # Find the saved devices wherever they are numbered now
+            rebind_devices()
+            for label, key in (("microphone", state.mic_key), ("audio output", state.speaker_key)):
+                if key is not None and device_registry.pa_index(key) is None:
+                    console.print(f"[yellow]⚠️  Saved {label} '{key[0]}' is not connected; "
+                                  f"using the default until it is plugged back in[/yellow]")
+            
+            # Test previous devices together
+            if (state.mic_key is None or 
+                state.speaker_key is None or 
+                not all(device_manager.probe_devices(state.mic_device, state.speaker_device))):
                 console.print("[yellow]⚠️  Previous configuration invalid, starting fresh setup[/yellow]")
             else:
                 console.print("[green]✅ Previous configuration loaded successfully![/green]")
@@ -255,6 +1173,7 @@ def setup_dual_headset():
             if any(idx == mic_choice for idx, _ in input_devices):
                 if device_manager.test_microphone(mic_choice):
                     state.mic_device = mic_choice
+                    state.mic_key = device_registry.key_for_pa(mic_choice)
                     state.mic_name = next(name for idx, name in input_devices if idx == mic_choice)
                     console.print(f"[green]✅ Microphone set to: {state.mic_name}[/green]")
                     break
@@ -267,6 +1186,7 @@ def setup_dual_headset():
         except KeyboardInterrupt:
             console.print("\n[yellow]⚠️  Setup cancelled, using default microphone[/yellow]")
             state.mic_device = None
+            state.mic_key = None
             state.mic_name = "Default"
             break
 
@@ -292,6 +1212,7 @@ def setup_dual_headset():
             if any(idx == speaker_choice for idx, _ in output_devices):
                 if device_manager.test_speaker(speaker_choice):
                     state.speaker_device = speaker_choice
+                    state.speaker_key = device_registry.key_for_pa(speaker_choice)
                     state.speaker_name = next(name for idx, name in output_devices if idx == speaker_choice)
                     console.print(f"[green]✅ Audio output set to: {state.speaker_name}[/green]")
                     break
@@ -304,6 +1225,7 @@ def setup_dual_headset():
         except KeyboardInterrupt:
             console.print("\n[yellow]⚠️  Setup cancelled, using default speakers[/yellow]")
             state.speaker_device = None
+            state.speaker_key = None
             state.speaker_name = "Default"
             break
 
@@ -322,64 +1244,1739 @@ def setup_dual_headset():
     console.print(config_table)
     console.print("\n[green]✅ Dual headset setup complete![/green]")
 
-# Enhanced speak function with better device handling
-def speak(text):
-    try:
-        # Generate speech file
-        filename = os.path.join(tempfile.gettempdir(), f"kevin_speech_{uuid.uuid4().hex}.wav")
-        tts = gTTS(text=text, lang='en', slow=False)
-        tts.save(filename)
-        
-        # Play audio with specific device
-        if state.speaker_device is not None:
+# Command grammar: intent -> trigger phrases, action, spoken response and status.
+# Responses may contain {placeholders} filled from the action result and device names.
+GRAMMAR_FILE = "kevin_grammar.json"
+
+DEFAULT_GRAMMAR = {
+    'pause': {
+        'keywords': ['pause', 'stop', 'halt', 'freeze'],
+        'response': "Media paused.", 'status': "Media Paused"
+    },
+    'play': {
+        'keywords': ['play', 'start', 'resume', 'continue', 'unpause'],
+        'response': "Media playing.", 'status': "Media Playing"
+    },
+    'forward': {
+        'keywords': ['forward', 'next', 'skip', 'ahead', 'advance', 'skip forward', 'skip ahead',
+                     'go forward', 'fast forward'],
+        'response': "Moved forward.", 'status': "Seeking Forward"
+    },
+    'backward': {
+        'keywords': ['back', 'previous', 'rewind', 'return', 'behind', 'skip back', 'go back',
+                     'skip backward', 'jump back'],
+        'response': "Moved back.", 'status': "Seeking Backward"
+    },
+    'next_track': {
+        'keywords': ['next track', 'next song', 'skip track', 'skip song', 'skip this song'],
+        'response': "Next track.", 'status': "Next Track"
+    },
+    'previous_track': {
+        'keywords': ['previous track', 'previous song', 'last track', 'last song'],
+        'response': "Previous track.", 'status': "Previous Track"
+    },
+    'scroll_up': {
+        'keywords': ['scroll up', 'move up', 'go up', 'upward', 'up'],
+        'response': "Scrolling up.", 'status': "Scrolling Up"
+    },
+    'scroll_down': {
+        'keywords': ['scroll down', 'move down', 'go down', 'downward', 'down'],
+        'response': "Scrolling down.", 'status': "Scrolling Down"
+    },
+    'volume_up': {
+        'keywords': ['volume up', 'louder', 'increase volume', 'turn up', 'raise volume'],
+        'response': "Volume increased to {volume} percent.", 'status': "Volume Increased"
+    },
+    'volume_down': {
+        'keywords': ['volume down', 'quieter', 'decrease volume', 'turn down', 'lower volume'],
+        'response': "Volume decreased to {volume} percent.", 'status': "Volume Decreased"
+    },
+    'set_volume': {
+        'keywords': ['volume', 'set volume', 'volume to', 'volume at'],
+        'response': "Volume set to {volume} percent.", 'status': "Volume Set"
+    },
+    'mute': {
+        'keywords': ['mute', 'silence', 'quiet', 'no sound', 'shut up'],
+        'response': "Audio muted.", 'status': "Audio Muted"
+    },
+    'unmute': {
+        'keywords': ['unmute', 'unsilence', 'sound on', 'restore sound'],
+        'response': "Audio unmuted.", 'status': "Audio Unmuted"
+    },
+    'praise': {
+        'keywords': ['good job', 'nice work', 'well done', 'great job', 'excellent'],
+        'response': "Thank you, boss. I'm here to help.", 'status': "Acknowledged Praise"
+    },
+    'thanks': {
+        'keywords': ['thank you', 'thanks', 'appreciate', 'grateful'],
+        'response': "You're welcome, boss.", 'status': "Acknowledged Thanks"
+    },
+    'status': {
+        'keywords': ['how are you', "how're you", 'how you doing', 'status'],
+        'response': "I'm functioning optimally and ready to serve, boss.", 'status': "Status Check"
+    },
+    'greeting': {
+        'keywords': ['hello', 'hi', 'hey', 'greetings'],
+        'response': "Hello boss! How can I assist?", 'status': "Greeting Acknowledged"
+    },
+    'device_info': {
+        'keywords': ['check devices', 'device status', 'audio setup', 'sound setup'],
+        'response': "Using {mic_name} for mic and {speaker_name} for audio.", 'status': "Device Status Check"
+    }
+}
+
+STARTUP_GREETING = "Kevin Artificial Intelligence dual headset system activated. All systems online Boss. Ready for voice commands."
+SHUTDOWN_MESSAGE = "Kevin AI shutting down. Goodbye boss."
+
+# Keyboard/mouse injection used by media actions
+INPUT_KEYS = ('space', 'left', 'right', 'up', 'down', 'playpause', 'nexttrack', 'prevtrack')
+WHEEL_DELTA = 120  # scroll units per wheel notch, as on Windows
+
+class InputBackend:
+    """Key presses and scrolls, sent to the focused window (media keys go to the system).
+
+    Each call turns into a batch of key-down, key-up and wheel events that
+    is sent in one go, so a six-step seek is one write to the device rather
+    than twelve calls. Keys are the names in INPUT_KEYS, plus any keys given
+    as {name: code} in the backend's own key codes, and scroll amounts are in
+    WHEEL_DELTA units per notch, positive scrolling up, on every backend.
+    Implementations provide _send() for a list of ('key', name, down) and
+    ('scroll', amount) events, with amounts in wheel_resolution units per notch.
+    """
+    name = "base"
+    wheel_resolution = WHEEL_DELTA  # scroll units per notch the backend's events take
+
+    def __init__(self, keys: Optional[dict] = None):
+        self.extra_keys = dict(keys or {})
+        self.scroll_remainder = 0  # in WHEEL_DELTA * wheel_resolution units
+        self.batches = 0
+        self.sent = 0
+
+    def press(self, key: str, presses: int = 1):
+        if key not in INPUT_KEYS and key not in self.extra_keys:
+            raise ValueError(f"unknown key '{key}'")
+        self._submit([event for _ in range(presses) for event in (('key', key, True), ('key', key, False))])
+
+    def scroll(self, amount: int):
+        """Scroll by amount WHEEL_DELTA units; a backend with coarser units carries the rest to the next scroll"""
+        self.scroll_remainder += int(amount) * self.wheel_resolution
+        units = int(self.scroll_remainder / WHEEL_DELTA)
+        self.scroll_remainder -= units * WHEEL_DELTA
+        if units:
+            self._submit([('scroll', units)])
+
+    def _submit(self, events: list):
+        if events:
+            self._send(events)
+            self.batches += 1
+            self.sent += len(events)
+
+    def _send(self, events: list):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class PyAutoGuiInput(InputBackend):
+    """Send key presses and scrolls through pyautogui, on any platform it supports.
+
+    pause=True keeps pyautogui's sleep of pyautogui.PAUSE (0.1 s) after
+    every call, as Kevin used to; by default it is skipped. pyautogui.scroll()
+    takes wheel units on Windows but whole clicks everywhere else.
+    """
+    name = "pyautogui"
+    wheel_resolution = WHEEL_DELTA if sys.platform == "win32" else 1
+
+    def __init__(self, pause: bool = False, keys: Optional[dict] = None):
+        super().__init__(keys)
+        self.pause = pause
+
+    def _send(self, events: list):
+        i = 0
+        while i < len(events):
+            event = events[i]
+            if event[0] == 'scroll':
+                pyautogui.scroll(event[1], _pause=self.pause)
+                i += 1
+                continue
+            # Down/up pairs of one key become a single press() call
+            presses = 0
+            while i < len(events) and events[i][0] == 'key' and events[i][1] == event[1]:
+                presses += 1
+                i += 2
+            pyautogui.press(self.extra_keys.get(event[1], event[1]), presses=presses, interval=0.0,
+                            _pause=self.pause)
+
+class UinputInput(InputBackend):
+    """A virtual keyboard and wheel created through /dev/uinput (Linux, under X11 or Wayland).
+
+    Needs write access to /dev/uinput: root, or a udev rule giving a group
+    such as input access to it. A batch is packed into input_event structs,
+    with a SYN_REPORT after each change, and written with one write().
+    With create=False the events are written to path as they are, without
+    setting up a device, which the input benchmark uses on machines
+    without uinput.
+    """
+    name = "uinput"
+    # linux/input-event-codes.h
+    EV_SYN, EV_KEY, EV_REL = 0, 1, 2
+    SYN_REPORT = 0
+    REL_X, REL_Y, REL_WHEEL, REL_WHEEL_HI_RES = 0, 1, 8, 11
+    BTN_LEFT = 0x110
+    BUS_VIRTUAL = 0x06
+    KEY_CODES = {'space': 57, 'up': 103, 'left': 105, 'right': 106, 'down': 108,
+                 'nexttrack': 163, 'playpause': 164, 'prevtrack': 165}
+    # linux/uinput.h
+    UI_SET_EVBIT, UI_SET_KEYBIT, UI_SET_RELBIT = 0x40045564, 0x40045565, 0x40045566
+    UI_DEV_SETUP, UI_DEV_CREATE, UI_DEV_DESTROY = 0x405C5503, 0x5501, 0x5502
+    EVENT = struct.Struct('llHHi')  # struct input_event; the kernel fills in the time
+    SETTLE_SECONDS = 0.2  # the desktop ignores a new device's events until it has opened it
+
+    def __init__(self, path: str = "/dev/uinput", create: bool = True, keys: Optional[dict] = None):
+        super().__init__(keys)
+        self.key_codes = dict(self.KEY_CODES, **self.extra_keys)
+        self.created = create
+        self.fd = os.open(path, os.O_WRONLY)
+        self.wheel_remainder = 0
+        self.ready_at = 0.0
+        if create:
             try:
-                data, sample_rate = sf.read(filename)
-                sd.play(data, sample_rate, device=state.speaker_device)
-                sd.wait()
-            except Exception as e:
-                console.print(f"[yellow]⚠️  Device-specific playback failed, using default: {e}[/yellow]")
-                playsound(filename)
-        else:
-            playsound(filename)
-        
-        # Cleanup
-        try:
-            os.remove(filename)
-        except:
-            pass
-            
-    except Exception as e:
-        console.print(f"[red]⚠️  Speech error: {e}[/red]")
+                self._create()
+            except OSError:
+                os.close(self.fd)
+                raise
+            self.ready_at = time.monotonic() + self.SETTLE_SECONDS
 
-# Create dynamic status display with device info
-def create_status_display():
-    # Update volume info
+    def _create(self):
+        import fcntl
+        for event_type in (self.EV_KEY, self.EV_REL):
+            fcntl.ioctl(self.fd, self.UI_SET_EVBIT, event_type)
+        # A wheel only counts as a pointer with motion axes and a button
+        for code in (*self.key_codes.values(), self.BTN_LEFT):
+            fcntl.ioctl(self.fd, self.UI_SET_KEYBIT, code)
+        for code in (self.REL_X, self.REL_Y, self.REL_WHEEL, self.REL_WHEEL_HI_RES):
+            fcntl.ioctl(self.fd, self.UI_SET_RELBIT, code)
+        setup = struct.pack('HHHH80sI', self.BUS_VIRTUAL, 0x4B45, 0x5649, 1, b"Kevin voice control", 0)
+        fcntl.ioctl(self.fd, self.UI_DEV_SETUP, setup)
+        fcntl.ioctl(self.fd, self.UI_DEV_CREATE)
+
+    def encode(self, events: list) -> bytes:
+        pack = self.EVENT.pack
+        out = []
+        for event in events:
+            if event[0] == 'key':
+                out.append(pack(0, 0, self.EV_KEY, self.key_codes[event[1]], 1 if event[2] else 0))
+            else:
+                # High-resolution wheel units are WHEEL_DELTA per notch; whole notches are also reported
+                self.wheel_remainder += event[1]
+                notches = int(self.wheel_remainder / WHEEL_DELTA)
+                self.wheel_remainder -= notches * WHEEL_DELTA
+                out.append(pack(0, 0, self.EV_REL, self.REL_WHEEL_HI_RES, event[1]))
+                if notches:
+                    out.append(pack(0, 0, self.EV_REL, self.REL_WHEEL, notches))
+            out.append(pack(0, 0, self.EV_SYN, self.SYN_REPORT, 0))
+        return b"".join(out)
+
+    def _send(self, events: list):
+        data = memoryview(self.encode(events))
+        wait = self.ready_at - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        while data:
+            data = data[os.write(self.fd, data):]
+
+    def close(self):
+        if self.fd is None:
+            return
+        if self.created:
+            import fcntl
+            with contextlib.suppress(OSError):
+                fcntl.ioctl(self.fd, self.UI_DEV_DESTROY)
+        os.close(self.fd)
+        self.fd = None
+
+def _sendinput_types():
+    """ctypes declarations of the Win32 INPUT structure and its members"""
+    import ctypes
+    from ctypes import wintypes
+
+    class KEYBDINPUT(ctypes.Structure):
+        _fields_ = [('wVk', wintypes.WORD), ('wScan', wintypes.WORD), ('dwFlags', wintypes.DWORD),
+                    ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+    class MOUSEINPUT(ctypes.Structure):
+        _fields_ = [('dx', wintypes.LONG), ('dy', wintypes.LONG), ('mouseData', wintypes.DWORD),
+                    ('dwFlags', wintypes.DWORD), ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+    class HARDWAREINPUT(ctypes.Structure):
+        _fields_ = [('uMsg', wintypes.DWORD), ('wParamL', wintypes.WORD), ('wParamH', wintypes.WORD)]
+
+    class INPUTUNION(ctypes.Union):
+        _fields_ = [('ki', KEYBDINPUT), ('mi', MOUSEINPUT), ('hi', HARDWAREINPUT)]
+
+    class INPUT(ctypes.Structure):
+        _fields_ = [('type', wintypes.DWORD), ('u', INPUTUNION)]
+
+    return ctypes, INPUT
+
+class SendInputInput(InputBackend):
+    """Inject events with the Win32 SendInput call, which takes a whole batch at once"""
+    name = "sendinput"
+    INPUT_MOUSE, INPUT_KEYBOARD = 0, 1
+    KEYEVENTF_EXTENDEDKEY, KEYEVENTF_KEYUP = 0x0001, 0x0002
+    MOUSEEVENTF_WHEEL = 0x0800
+    VK_CODES = {'space': 0x20, 'left': 0x25, 'up': 0x26, 'right': 0x27, 'down': 0x28,
+                'nexttrack': 0xB0, 'prevtrack': 0xB1, 'playpause': 0xB3}
+    EXTENDED = frozenset(('left', 'up', 'right', 'down', 'nexttrack', 'prevtrack', 'playpause'))
+
+    def __init__(self, keys: Optional[dict] = None):
+        super().__init__(keys)
+        self.vk_codes = dict(self.VK_CODES, **self.extra_keys)
+        self.ctypes, self.INPUT = _sendinput_types()
+        self.user32 = self.ctypes.WinDLL('user32', use_last_error=True)
+
+    def _send(self, events: list):
+        inputs = (self.INPUT * len(events))()
+        for item, event in zip(inputs, events):
+            if event[0] == 'key':
+                item.type = self.INPUT_KEYBOARD
+                item.u.ki.wVk = self.vk_codes[event[1]]
+                item.u.ki.dwFlags = (self.KEYEVENTF_EXTENDEDKEY if event[1] in self.EXTENDED else 0) | \
+                    (0 if event[2] else self.KEYEVENTF_KEYUP)
+            else:
+                item.type = self.INPUT_MOUSE
+                item.u.mi.dwFlags = self.MOUSEEVENTF_WHEEL
+                item.u.mi.mouseData = event[1] & 0xFFFFFFFF
+        sent = self.user32.SendInput(len(events), inputs, self.ctypes.sizeof(self.INPUT))
+        if sent != len(events):
+            # Blocked by UIPI (an elevated window has focus) or by another program
+            raise self.ctypes.WinError(self.ctypes.get_last_error())
+
+class FakeInput(InputBackend):
+    """Record injected events instead of sending them, for tests and benchmarks"""
+    name = "fake"
+
+    def __init__(self, keys: Optional[dict] = None):
+        super().__init__(keys)
+        self.events = []
+
+    def _send(self, events: list):
+        self.events.extend(events)
+
+INPUT_BACKENDS = {"uinput": UinputInput, "sendinput": SendInputInput, "pyautogui": PyAutoGuiInput,
+                  "fake": FakeInput}
+
+def create_input_backend(kind: str = "auto") -> InputBackend:
+    """Pick an input backend: SendInput on Windows, uinput where it is writable, else pyautogui"""
+    if kind != "auto":
+        return INPUT_BACKENDS[kind]()
+    if sys.platform == "win32":
+        kind = "sendinput"
+    elif sys.platform.startswith("linux") and os.access("/dev/uinput", os.W_OK):
+        kind = "uinput"
+    else:
+        return PyAutoGuiInput()
     try:
-        state.current_volume = int(volume.GetMasterVolumeLevelScalar() * 100)
-        state.is_muted = volume.GetMute()
-    except:
-        state.current_volume = 0
-        state.is_muted = False
-    
-    # Create main layout
-    layout = Layout()
-    
-    # Header with title
-    header = Panel(
-        Align.center(
-            Text("🎧 KEVIN AI - DUAL HEADSET VOICE CONTROLLER 🎧", style="bold cyan")
-        ),
-        style="bold blue",
-        border_style="bright_blue"
-    )
-    
-    # Status info table
-    status_table = Table(show_header=False, box=None, expand=True)
-    status_table.add_column("", style="cyan", width=20)
-    status_table.add_column("", style="white")
-    
-    # Calculate uptime
-    uptime = datetime.now() - state.start_time
+        return INPUT_BACKENDS[kind]()
+    except OSError as e:
+        console.print(f"[yellow]⚠️  {kind} input is not available ({e}); using pyautogui[/yellow]")
+        return PyAutoGuiInput()
+
+input_backend = None
+toggle_key = "playpause"  # or "space" for players that only listen to their own window
+
+def input_control() -> InputBackend:
+    """The input backend actions use, created on first use"""
+    global input_backend
+    if input_backend is None:
+        input_backend = create_input_backend()
+    return input_backend
+
+def sync_volume_state(level: float, muted: bool):
+    """Copy the mirrored volume and mute state into KevinState"""
+    state.current_volume = int(round(level * 100))
+    state.is_muted = bool(muted)
+
+def _volume_step(delta: float, room=None) -> dict:
+    """Move the room's (else the master) volume by delta and report the new level"""
+    level = volume_control(room).step(delta)
+    return {'volume': int(round(level * 100))}
+
+def _set_mute(muted: bool, room=None):
+    volume_control(room).set_mute(muted)
+
+def _volume_set(level: float, room=None) -> dict:
+    """Set the room's (else the master) volume to an absolute level and report it"""
+    level = volume_control(room).set_level(level)
+    return {'volume': int(round(level * 100))}
+
+def _seek(steps: int, room=None):
+    # Seeks that add up, or a misheard number, must not hold the arrow key for minutes
+    input_control().press("right" if steps > 0 else "left", presses=min(abs(steps), MAX_SEEK_STEPS))
+
+def _skip_tracks(tracks: int, room=None):
+    input_control().press("nexttrack" if tracks > 0 else "prevtrack", presses=abs(tracks))
+
+# Actions by name; an intent uses the action with its own name unless it sets
+# 'action'. Each action adds an amount to its group, and queued requests in
+# the same group are combined and applied once.
+COMMAND_ACTIONS = {
+    'pause': ('toggle', 1),
+    'play': ('toggle', 1),
+    'forward': ('seek', 1),
+    'backward': ('seek', -1),
+    'next_track': ('track', 1),
+    'previous_track': ('track', -1),
+    'scroll_up': ('scroll', 300),
+    'scroll_down': ('scroll', -300),
+    'volume_up': ('volume', 0.1),
+    'volume_down': ('volume', -0.1),
+    'set_volume': ('volume_set', None),  # needs a spoken level
+    'mute': ('mute', True),
+    'unmute': ('mute', False),
+}
+
+# How each group combines queued amounts, applies the result, and how often it may run.
+# apply(amount, room) gets the room the commands came from, or None for the single-room setup.
+# In the additive groups (zero_is_noop) a combined amount of zero (net seek, even
+# number of toggles) is not applied at all; absolute levels and mute always are.
+ACTION_GROUPS = {
+    'toggle': {'combine': lambda amounts: sum(amounts) % 2,
+               'apply': lambda n, room: input_control().press(toggle_key), 'min_interval': 0.3, 'zero_is_noop': True},
+    'seek': {'combine': sum, 'apply': _seek, 'min_interval': 0.2, 'zero_is_noop': True},
+    'track': {'combine': sum, 'apply': _skip_tracks, 'min_interval': 0.3, 'zero_is_noop': True},
+    'scroll': {'combine': sum, 'apply': lambda amount, room: input_control().scroll(amount), 'min_interval': 0.1,
+               'zero_is_noop': True},
+    'volume': {'combine': lambda amounts: round(sum(amounts), 6), 'apply': _volume_step, 'min_interval': 0.25,
+               'zero_is_noop': True},
+    'volume_set': {'combine': lambda amounts: amounts[-1], 'apply': _volume_set, 'min_interval': 0.1},
+    'mute': {'combine': lambda amounts: amounts[-1], 'apply': _set_mute, 'min_interval': 0.1},
+}
+
+# Command classes that may fire on a partial hypothesis in streaming mode; the
+# class is the action group, or 'reply' for intents that only answer. The rest
+# (mute, volume steps and absolute volume) wait for the final result.
+EARLY_COMMIT_CLASSES = frozenset(('toggle', 'seek', 'track', 'scroll', 'reply'))
+
+def command_class(action: Optional[str]) -> str:
+    return COMMAND_ACTIONS[action][0] if action in COMMAND_ACTIONS else 'reply'
+
+# Seconds within which a repeat of the same intent is treated as a duplicate recognition
+DEDUP_WINDOW = 0.3
+
+# Spoken arguments: "volume 40", "skip forward 30 seconds", "scroll down 3"
+SEEK_STEP_SECONDS = 5  # one arrow key press in most players
+MAX_SEEK_STEPS = 60  # five minutes either way
+SCROLL_STEP = 300
+
+def _seek_steps(value: float, unit: Optional[str]) -> int:
+    # "forward 3" counts steps; "forward 30" / "forward 30 seconds" is seconds
+    if unit == 'minutes':
+        value = value * 60 / SEEK_STEP_SECONDS
+    elif unit == 'seconds' or (unit is None and value > 10):
+        value = value / SEEK_STEP_SECONDS
+    return min(max(1, int(round(value))), MAX_SEEK_STEPS)
+
+def _volume_delta(value: float, unit: Optional[str]) -> float:
+    # "up 20" / "up 20 percent" is a percentage; "up 2" / "up 2 steps" counts steps
+    if unit == 'percent' or (unit is None and value > 10):
+        return value / 100.0
+    return value * 0.1
+
+# How an action's amount is derived from a number said after it
+ACTION_ARGUMENTS = {
+    'forward': lambda value, unit: _seek_steps(value, unit),
+    'backward': lambda value, unit: -_seek_steps(value, unit),
+    'next_track': lambda value, unit: max(1, int(round(value))),
+    'previous_track': lambda value, unit: -max(1, int(round(value))),
+    'scroll_up': lambda value, unit: int(SCROLL_STEP * value),
+    'scroll_down': lambda value, unit: -int(SCROLL_STEP * value),
+    'volume_up': lambda value, unit: _volume_delta(value, unit),
+    'volume_down': lambda value, unit: -_volume_delta(value, unit),
+    'set_volume': lambda value, unit: min(max(value / 100.0, 0.0), 1.0),
+}
+
+def action_amount(action: Optional[str], value: Optional[float], unit: Optional[str]):
+    """The amount an action contributes to its group, or None if it cannot run"""
+    if action not in COMMAND_ACTIONS:
+        return None
+    amount = COMMAND_ACTIONS[action][1]
+    if value is not None and action in ACTION_ARGUMENTS:
+        amount = ACTION_ARGUMENTS[action](value, unit)
+    return amount
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+def tokenize(text: str) -> List[str]:
+    """Split an utterance into lowercase word tokens"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+NUMBER_WORDS = {
+    'zero': 0, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7,
+    'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12, 'thirteen': 13,
+    'fourteen': 14, 'fifteen': 15, 'sixteen': 16, 'seventeen': 17, 'eighteen': 18,
+    'nineteen': 19, 'twenty': 20, 'thirty': 30, 'forty': 40, 'fifty': 50, 'sixty': 60,
+    'seventy': 70, 'eighty': 80, 'ninety': 90, 'hundred': 100,
+}
+NUMBER_UNITS = {
+    'percent': 'percent', 'seconds': 'seconds', 'second': 'seconds', 'secs': 'seconds',
+    'minutes': 'minutes', 'minute': 'minutes', 'times': 'steps', 'steps': 'steps',
+    'step': 'steps', 'notches': 'steps', 'notch': 'steps',
+}
+# Words that may sit between a phrase and its number ("volume to 40", "back by 10 seconds")
+ARGUMENT_LEAD_WORDS = frozenset(('to', 'by', 'at', 'of'))
+# Relative actions that set an absolute level when the number follows "to":
+# "volume up to 60" sets 60, while "volume up by 20" and "volume up 20" add 20
+ABSOLUTE_FORMS = {'volume_up': 'set_volume', 'volume_down': 'set_volume'}
+# Pleasantries that ride along with a command ("hey kevin, pause", "pause, thanks")
+# are dropped when the utterance also asks for an action, and wait for the final result
+SOCIAL_INTENTS = frozenset(('greeting', 'thanks', 'praise'))
+
+def parse_number(tokens: List[str], i: int) -> Tuple[Optional[float], Optional[str], int]:
+    """Read a number (digits or words) and optional unit at tokens[i]; returns (value, unit, next index)"""
+    start = i
+    value = None
+    if i < len(tokens) and tokens[i].isdigit():
+        value = float(tokens[i])
+        i += 1
+    else:
+        if i + 1 < len(tokens) and tokens[i] in ('a', 'an') and tokens[i + 1] == 'hundred':
+            i += 1  # "a hundred"
+        total = 0
+        while i < len(tokens) and NUMBER_WORDS.get(tokens[i]) is not None:
+            word = NUMBER_WORDS[tokens[i]]
+            total = total * word if word == 100 and total else total + word
+            value = float(total)
+            i += 1
+    if value is None:
+        return None, None, start
+    unit = None
+    if i < len(tokens) and tokens[i] in NUMBER_UNITS:
+        unit = NUMBER_UNITS[tokens[i]]
+        i += 1
+    return value, unit, i
+
+class ParsedCommand:
+    """One intent found in an utterance, with the number said after it if any"""
+    __slots__ = ('intent', 'value', 'unit')
+
+    def __init__(self, intent: str, value: Optional[float] = None, unit: Optional[str] = None):
+        self.intent = intent
+        self.value = value
+        self.unit = unit
+
+    def __repr__(self):
+        return f"ParsedCommand({self.intent!r}, {self.value!r}, {self.unit!r})"
+
+class GrammarMatch:
+    """A phrase found in an utterance, spanning tokens [start, end)"""
+    __slots__ = ('intent', 'start', 'end', 'rank')
+
+    def __init__(self, intent: str, start: int, end: int, rank: int):
+        self.intent = intent
+        self.start = start
+        self.end = end
+        self.rank = rank
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start
+
+    def __repr__(self):
+        return f"GrammarMatch({self.intent!r}, {self.start}, {self.end})"
+
+class CommandGrammar:
+    """Command phrases compiled once into a token-level Aho-Corasick automaton.
+
+    Matching is a single pass over the utterance's tokens, so phrases only
+    match on word boundaries ("up" does not fire inside "unpause"), and
+    overlapping candidates are resolved longest-match-wins.
+    """
+
+    def __init__(self, intents: dict):
+        self.intents = OrderedDict()
+        for name, spec in intents.items():
+            self.intents[name] = {
+                'keywords': list(spec.get('keywords', [])),
+                'response': spec.get('response', ""),
+                'status': spec.get('status', name.replace('_', ' ').title()),
+                'action': spec.get('action', name if name in COMMAND_ACTIONS else None),
+                'min_interval': spec.get('min_interval'),
+                'dedup_window': spec.get('dedup_window', DEDUP_WINDOW),
+                'commit': spec.get('commit'),  # 'early' or 'final'; None follows the class
+                'social': spec.get('social', name in SOCIAL_INTENTS),
+            }
+        # intent -> the intent it becomes before "to <number>"
+        by_action = {}
+        for name, spec in self.intents.items():
+            by_action.setdefault(spec['action'], name)
+        self.absolute = {}
+        for name, spec in self.intents.items():
+            absolute = ABSOLUTE_FORMS.get(spec['action'])
+            if absolute is not None and absolute in by_action:
+                self.absolute[name] = by_action[absolute]
+        self._compile()
+
+    def _compile(self):
+        # Node 0 is the root; each node has token transitions, a failure link
+        # and the (length, rank, intent) of every phrase that ends there.
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for rank, (name, spec) in enumerate(self.intents.items()):
+            for keyword in spec['keywords']:
+                tokens = tokenize(keyword)
+                if not tokens:
+                    continue
+                node = 0
+                for token in tokens:
+                    nxt = self.goto[node].get(token)
+                    if nxt is None:
+                        nxt = len(self.goto)
+                        self.goto[node][token] = nxt
+                        self.goto.append({})
+                        self.fail.append(0)
+                        self.output.append([])
+                    node = nxt
+                self.output[node].append((len(tokens), rank, name))
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and token not in self.goto[f]:
+                    f = self.fail[f]
+                nxt = self.goto[f].get(token, 0)
+                self.fail[child] = nxt if nxt != child else 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    @classmethod
+    def from_file(cls, path: str, base: Optional[dict] = None) -> 'CommandGrammar':
+        """Load intents from a JSON file, overriding or extending base"""
+        with open(path, 'r') as f:
+            loaded = json.load(f)
+        intents = OrderedDict((name, dict(spec)) for name, spec in (base or DEFAULT_GRAMMAR).items())
+        for name, spec in loaded.items():
+            intents.setdefault(name, {}).update(spec)
+        return cls(intents)
+
+    def find_all(self, text: str) -> List[GrammarMatch]:
+        """All non-overlapping phrases in text, leftmost first and longest-match-wins"""
+        return self._scan(tokenize(text))
+
+    def _scan(self, tokens: List[str]) -> List[GrammarMatch]:
+        candidates = []
+        node = 0
+        for i, token in enumerate(tokens):
+            while node and token not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(token, 0)
+            for length, rank, name in self.output[node]:
+                candidates.append(GrammarMatch(name, i + 1 - length, i + 1, rank))
+        candidates.sort(key=lambda m: (m.start, -m.length, m.rank))
+        matches = []
+        end = 0
+        for m in candidates:
+            if m.start >= end:
+                matches.append(m)
+                end = m.end
+        return matches
+
+    def parse(self, text: str) -> List[ParsedCommand]:
+        """Every intent in text in spoken order, each with the number that follows it;
+        pleasantries are left out when the utterance also asks for an action"""
+        tokens = tokenize(text)
+        matches = self._scan(tokens)
+        commands = []
+        for n, m in enumerate(matches):
+            limit = matches[n + 1].start if n + 1 < len(matches) else len(tokens)
+            i = m.end
+            while i < limit and tokens[i] in ARGUMENT_LEAD_WORDS:
+                i += 1
+            value, unit, _ = parse_number(tokens[:limit], i)
+            intent = m.intent
+            if value is not None and 'to' in tokens[m.end:i]:
+                intent = self.absolute.get(intent, intent)
+            commands.append(ParsedCommand(intent, value, unit))
+        if any(self.intents[c.intent]['action'] in COMMAND_ACTIONS for c in commands):
+            commands = [c for c in commands if not self.intents[c.intent]['social']]
+        return commands
+
+    def early_match(self, text: str, classes=EARLY_COMMIT_CLASSES) -> Optional[ParsedCommand]:
+        """The command a partial hypothesis already settles, if exactly one can follow from it.
+
+        The text must hold a single phrase that ends at its last word and
+        cannot grow into a longer phrase ("volume" might become "volume up"),
+        and the intent's class must allow committing early. Volume steps
+        wait, since "volume up" may go on "to 60", and so do pleasantries,
+        since "hey" may go on "kevin, pause", unless the intent sets
+        "commit": "early".
+        """
+        tokens = tokenize(text)
+        matches = self._scan(tokens)
+        if len(matches) != 1 or matches[0].end != len(tokens):
+            return None
+        m = matches[0]
+        node = 0
+        for token in tokens[m.start:m.end]:
+            node = self.goto[node][token]
+        if self.goto[node]:
+            return None
+        intent = self.intents[m.intent]
+        early = (command_class(intent['action']) in classes and m.intent not in self.absolute
+                 and not intent['social'])
+        commit = intent['commit'] or ('early' if early else 'final')
+        if commit != 'early':
+            return None
+        return ParsedCommand(m.intent)
+
+    def match(self, text: str) -> Optional[GrammarMatch]:
+        """The single best phrase in text: longest first, then earliest, then grammar order"""
+        matches = self.find_all(text)
+        if not matches:
+            return None
+        return min(matches, key=lambda m: (-m.length, m.start, m.rank))
+
+    def static_responses(self) -> List[str]:
+        """Responses without placeholders, which can be synthesized ahead of time"""
+        return [spec['response'] for spec in self.intents.values()
+                if spec['response'] and '{' not in spec['response']]
+
+def load_grammar(path: str = GRAMMAR_FILE) -> CommandGrammar:
+    """Build the command grammar, using the data file when present"""
+    if os.path.exists(path):
+        try:
+            return CommandGrammar.from_file(path)
+        except Exception as e:
+            console.print(f"[yellow]⚠️  Could not load grammar from {path}, using defaults: {e}[/yellow]")
+    return CommandGrammar(DEFAULT_GRAMMAR)
+
+command_grammar = load_grammar()
+
+def static_phrases() -> List[str]:
+    """Every fixed phrase Kevin can say, including the segments templated replies are spliced from"""
+    return command_grammar.static_responses() + [STARTUP_GREETING, SHUTDOWN_MESSAGE] + \
+        response_renderer.segment_phrases()
+
+GRAMMAR_FILLER_WORDS = (
+    'please', 'the', 'video', 'now', 'could', 'you', 'music', 'a', 'bit',
+    'kevin', 'hey', 'uh', 'right', 'okay', 'song', 'this', 'for', 'me',
+)
+
+def benchmark_grammar(grammar: CommandGrammar, utterances: int = 100000, seed: int = 0) -> dict:
+    """Match a synthetic utterance corpus and report throughput"""
+    rng = random.Random(seed)
+    phrases = [k for spec in grammar.intents.values() for k in spec['keywords']]
+    corpus = []
+    for _ in range(utterances):
+        words = [rng.choice(GRAMMAR_FILLER_WORDS) for _ in range(rng.randint(2, 8))]
+        for _ in range(rng.choice((0, 1, 1, 1, 2))):
+            words.insert(rng.randint(0, len(words)), rng.choice(phrases))
+        corpus.append(" ".join(words))
+
+    matched = 0
+    start = time.perf_counter()
+    for text in corpus:
+        if grammar.match(text) is not None:
+            matched += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "utterances": utterances,
+        "phrases": len(phrases),
+        "automaton_nodes": len(grammar.goto),
+        "matched": matched,
+        "seconds": elapsed,
+        "matches_per_second": utterances / elapsed if elapsed else float('inf'),
+        "us_per_match": elapsed / utterances * 1e6,
+    }
+
+# Persistent speech cache
+SPEECH_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".kevin", "speech_cache")
+
+def gtts_synthesize(text: str, lang: str, voice: str) -> bytes:
+    """Run gTTS and return the compressed audio bytes"""
+    buffer = io.BytesIO()
+    gTTS(text=text, lang=lang, tld=voice, slow=False).write_to_fp(buffer)
+    return buffer.getvalue()
+
+def silent_synthesize(text: str, lang: str, voice: str) -> bytes:
+    """Deterministic offline stand-in for gTTS: silence sized like the spoken text"""
+    buffer = io.BytesIO()
+    sf.write(buffer, np.zeros(int(16000 * 0.06 * len(text)), dtype=np.float32), 16000, format='WAV')
+    return buffer.getvalue()
+
+def tone_synthesize(text: str, lang: str, voice: str) -> bytes:
+    """Deterministic offline stand-in for gTTS with audible content: a faded tone per text,
+    with its pitch and level derived from the text and silence either side as gTTS leaves it"""
+    rate = 24000
+    digest = hashlib.sha1(text.encode("utf-8")).digest()
+    t = np.arange(int(rate * 0.06 * len(text))) / rate
+    tone = (0.1 + digest[1] / 400) * np.sin(2 * np.pi * (120 + digest[0]) * t) * np.hanning(len(t)) ** 0.1
+    silence = np.zeros(rate // 10)
+    buffer = io.BytesIO()
+    sf.write(buffer, np.concatenate([silence, tone, silence]).astype(np.float32), rate, format='WAV')
+    return buffer.getvalue()
+
+class SpeechCache:
+    """Content-addressed cache of synthesized speech.
+
+    Entries are keyed by (text, lang, voice). Decoded PCM is kept in a
+    size-bounded in-memory LRU, and the compressed gTTS output is kept on
+    disk (also LRU-bounded) so it survives restarts.
+    """
+
+    def __init__(self, cache_dir: str = SPEECH_CACHE_DIR, lang: str = 'en', voice: str = 'com',
+                 max_memory_bytes: int = 32 * 1024 * 1024, max_disk_bytes: int = 64 * 1024 * 1024,
+                 synthesizer=None):
+        self.cache_dir = cache_dir
+        self.synthesizer = synthesizer or gtts_synthesize
+        self.lang = lang
+        self.voice = voice
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = OrderedDict()  # key -> (pcm, sample_rate)
+        self.memory_bytes = 0
+        self.disk = OrderedDict()  # key -> size in bytes, least recently used first
+        self.disk_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.pending = {}  # key -> threading.Event for in-flight synthesis
+        self.prewarm_pool = None
+        self.segments = OrderedDict()  # key -> (trimmed, normalized pcm, sample_rate) for splicing
+        self.max_segments = 512
+        self._scan_disk()
+
+    def _scan_disk(self):
+        """Index compressed entries already on disk, oldest first"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".mp3"):
+                    path = os.path.join(self.cache_dir, name)
+                    st = os.stat(path)
+                    entries.append((st.st_mtime, name[:-4], st.st_size))
+            for _, key, size in sorted(entries):
+                self.disk[key] = size
+                self.disk_bytes += size
+        except Exception as e:
+            console.print(f"[yellow]⚠️  Speech cache unavailable on disk: {e}[/yellow]")
+
+    def key(self, text: str, lang: Optional[str] = None, voice: Optional[str] = None) -> str:
+        """Content address for a phrase"""
+        ident = "\0".join((text, lang or self.lang, voice or self.voice))
+        return hashlib.sha1(ident.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def _decode(self, encoded: bytes) -> Tuple[np.ndarray, int]:
+        data, sample_rate = sf.read(io.BytesIO(encoded), dtype='float32')
+        return data, sample_rate
+
+    def _store_memory(self, key: str, pcm: np.ndarray, sample_rate: int):
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                return
+            self.memory[key] = (pcm, sample_rate)
+            self.memory_bytes += pcm.nbytes
+            while self.memory_bytes > self.max_memory_bytes and len(self.memory) > 1:
+                _, (old_pcm, _) = self.memory.popitem(last=False)
+                self.memory_bytes -= old_pcm.nbytes
+
+    def _store_disk(self, key: str, encoded: bytes):
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(encoded)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            console.print(f"[yellow]⚠️  Could not write speech cache: {e}[/yellow]")
+            return
+        evicted = []
+        with self.lock:
+            if key in self.disk:
+                self.disk_bytes -= self.disk.pop(key)
+            self.disk[key] = len(encoded)
+            self.disk_bytes += len(encoded)
+            while self.disk_bytes > self.max_disk_bytes and len(self.disk) > 1:
+                old_key, size = self.disk.popitem(last=False)
+                self.disk_bytes -= size
+                evicted.append(old_key)
+        for old_key in evicted:
+            with contextlib.suppress(OSError):
+                os.remove(self._path(old_key))
+
+    def _load_disk(self, key: str) -> Optional[bytes]:
+        with self.lock:
+            if key not in self.disk:
+                return None
+            self.disk.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                encoded = f.read()
+            os.utime(path)
+            return encoded
+        except OSError:
+            with self.lock:
+                if key in self.disk:
+                    self.disk_bytes -= self.disk.pop(key)
+            return None
+
+    def get(self, text: str, lang: Optional[str] = None, voice: Optional[str] = None) -> Tuple[np.ndarray, int]:
+        """Return decoded PCM and sample rate for text, synthesizing on a miss"""
+        lang = lang or self.lang
+        voice = voice or self.voice
+        key = self.key(text, lang, voice)
+        while True:
+            with self.lock:
+                entry = self.memory.get(key)
+                if entry is not None:
+                    self.memory.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                waiter = self.pending.get(key)
+                if waiter is None:
+                    self.pending[key] = threading.Event()
+                    break
+            # Another thread is already synthesizing this phrase
+            waiter.wait()
+            with self.lock:
+                if key not in self.memory and key not in self.pending:
+                    # The other synthesis failed; try ourselves
+                    self.pending[key] = threading.Event()
+                    break
+
+        try:
+            encoded = self._load_disk(key)
+            if encoded is not None:
+                with self.lock:
+                    self.disk_hits += 1
+            else:
+                with self.lock:
+                    self.misses += 1
+                encoded = self.synthesizer(text, lang, voice)
+                self._store_disk(key, encoded)
+            pcm, sample_rate = self._decode(encoded)
+            self._store_memory(key, pcm, sample_rate)
+            return pcm, sample_rate
+        finally:
+            with self.lock:
+                self.pending.pop(key).set()
+
+    def segment(self, text: str) -> Tuple[np.ndarray, int]:
+        """PCM of text prepared for splicing: surrounding silence trimmed and loudness normalized"""
+        key = self.key(text)
+        with self.lock:
+            entry = self.segments.get(key)
+            if entry is not None:
+                self.segments.move_to_end(key)
+                return entry
+        pcm, sample_rate = self.get(text)
+        entry = (prepare_segment(pcm, sample_rate), sample_rate)
+        with self.lock:
+            self.segments[key] = entry
+            while len(self.segments) > self.max_segments:
+                self.segments.popitem(last=False)
+        return entry
+
+    def file_for(self, text: str, lang: Optional[str] = None, voice: Optional[str] = None) -> str:
+        """Return the path of the compressed audio for text, synthesizing if needed"""
+        key = self.key(text, lang, voice)
+        path = self._path(key)
+        if not os.path.exists(path):
+            self._store_disk(key, self.synthesizer(text, lang or self.lang, voice or self.voice))
+        return path
+
+    def prewarm(self, phrases, workers: int = 4):
+        """Synthesize phrases in a background pool without blocking the caller"""
+        if self.prewarm_pool is None:
+            self.prewarm_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kevin-prewarm")
+
+        def warm(text):
+            try:
+                self.get(text)
+            except Exception as e:
+                console.print(f"[yellow]⚠️  Could not pre-synthesize '{text}': {e}[/yellow]")
+
+        return [self.prewarm_pool.submit(warm, text) for text in phrases]
+
+    def stats(self) -> dict:
+        """Hit/miss counters and cache sizes"""
+        with self.lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self.memory),
+                "memory_bytes": self.memory_bytes,
+                "disk_entries": len(self.disk),
+                "disk_bytes": self.disk_bytes,
+            }
+
+speech_cache = None
+
+def speech_cache_instance() -> SpeechCache:
+    """The speech cache replies are rendered from, created on first use so importing Kevin touches no files"""
+    global speech_cache
+    if speech_cache is None:
+        speech_cache = SpeechCache()
+    return speech_cache
+
+# Concatenative rendering of templated responses
+SPLICE_FADE_MS = 8
+SPLICE_PAD_MS = 15
+SPLICE_MAX_JOIN_RATIO = 1.0  # a join may step no further than the segments either side of it
+SENTENCE_PAUSE_MS = 120
+SEGMENT_RMS = 0.1  # about -20 dBFS
+SLOT_PREWARM = {'volume': range(0, 101)}  # slot values synthesized ahead of time
+
+def prepare_segment(pcm: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Trim silence (40 dB under the peak) to a short pad each side and normalize the RMS of what is left"""
+    pcm = np.asarray(pcm, dtype=np.float32)
+    if pcm.ndim > 1:
+        pcm = pcm.mean(axis=1)
+    peak = float(np.max(np.abs(pcm))) if len(pcm) else 0.0
+    pad = int(sample_rate * SPLICE_PAD_MS / 1000)
+    if peak == 0.0:
+        return np.zeros(2 * pad, dtype=np.float32)
+    loud = np.flatnonzero(np.abs(pcm) > peak * 0.01)
+    start, end = max(0, loud[0] - pad), min(len(pcm), loud[-1] + 1 + pad)
+    pcm = pcm[start:end]
+    rms = float(np.sqrt(np.mean(pcm[pad:len(pcm) - pad] ** 2))) if len(pcm) > 2 * pad else peak
+    gain = min(SEGMENT_RMS / max(rms, 1e-6), 0.99 / peak)
+    return pcm * np.float32(gain)
+
+def splice(pieces: List[np.ndarray], fade: int) -> np.ndarray:
+    """Join pieces end to end, overlapping neighbours by fade samples with linear crossfades"""
+    pieces = [piece if len(piece) >= 2 * fade else np.pad(piece, (0, 2 * fade - len(piece))) for piece in pieces]
+    out = np.zeros(sum(len(piece) for piece in pieces) - fade * (len(pieces) - 1), dtype=np.float32)
+    fade_in = np.linspace(0.0, 1.0, fade, dtype=np.float32)
+    fade_out = 1.0 - fade_in
+    position = 0
+    for i, piece in enumerate(pieces):
+        n = len(piece)
+        out[position:position + n] += piece
+        if i > 0:
+            out[position:position + fade] -= piece[:fade] * fade_out
+        if i < len(pieces) - 1:
+            out[position + n - fade:position + n] -= piece[n - fade:] * fade_in
+        position += n - fade
+    return out
+
+def join_step_ratios(out: np.ndarray, pieces: List[np.ndarray], fade: int) -> List[float]:
+    """For each join of splice(pieces, fade) == out: the largest step between neighbouring
+    samples across the crossfade, against the largest step inside the two pieces it joins"""
+    pieces = [piece if len(piece) >= 2 * fade else np.pad(piece, (0, 2 * fade - len(piece))) for piece in pieces]
+    ratios = []
+    position = 0
+    for left, right in zip(pieces, pieces[1:]):
+        position += len(left) - fade
+        join_step = float(np.max(np.abs(np.diff(out[position - 1:position + fade + 1]))))
+        inner_step = max(float(np.max(np.abs(np.diff(piece)))) for piece in (left, right))
+        ratios.append(join_step / max(inner_step, 1e-9))
+    return ratios
+
+class ResponseRenderer:
+    """Speaks replies built from response templates without synthesizing them whole.
+
+    A reply is parsed back into the grammar responses it was formatted from;
+    each template splits into fixed segments and {slot} values, which are
+    synthesized once and cached as PCM. "Volume increased to 40 percent." is
+    "Volume increased to" + "40" + "percent.", spliced with short crossfades,
+    and the replies of a combined command are joined with a short pause.
+    Fixed responses spoken on their own play from the cache as before, and
+    anything that does not parse is synthesized whole.
+    """
+
+    def __init__(self):
+        self.grammar = None
+        self.patterns = []  # (compiled regex, [('text', segment) | ('slot', name)])
+        self.spliced = 0
+        self.whole = 0
+
+    def _compile(self):
+        # Rebuilt whenever the grammar is replaced
+        if self.grammar is command_grammar:
+            return
+        patterns = []
+        for response in dict.fromkeys(spec['response'] for spec in command_grammar.intents.values()):
+            if not response:
+                continue
+            regex, parts = "", []
+            for literal, slot, _, _ in string.Formatter().parse(response):
+                if literal.strip():
+                    parts.append(('text', literal.strip()))
+                regex += re.escape(literal)
+                if slot is not None:
+                    parts.append(('slot', slot))
+                    regex += rf"(?P<{slot}>\d+)" if slot in SLOT_PREWARM else rf"(?P<{slot}>.+?)"
+            patterns.append((re.compile(regex), parts))
+        # Templated responses first, so a fixed prefix cannot shadow them
+        patterns.sort(key=lambda pattern: not any(kind == 'slot' for kind, _ in pattern[1]))
+        self.patterns = patterns
+        self.grammar = command_grammar
+
+    def parse(self, text: str) -> Optional[List[List[str]]]:
+        """Segment texts of each sentence in text, or None if it is not made of grammar responses"""
+        self._compile()
+        sentences = []
+        position = 0
+        while position < len(text):
+            for regex, parts in self.patterns:
+                match = regex.match(text, position)
+                if match is not None and (match.end() == len(text) or text[match.end()] == ' '):
+                    sentences.append([value if kind == 'text' else match.group(value) for kind, value in parts])
+                    position = match.end() + 1
+                    break
+            else:
+                return None
+        return sentences
+
+    def segment_phrases(self) -> List[str]:
+        """Every fixed segment and prewarmed slot value, to synthesize ahead of time"""
+        self._compile()
+        phrases = {}
+        for _, parts in self.patterns:
+            if any(kind == 'slot' for kind, _ in parts):
+                for kind, value in parts:
+                    if kind == 'text':
+                        phrases[value] = None
+                    else:
+                        phrases.update((str(v), None) for v in SLOT_PREWARM.get(value, ()))
+        return list(phrases)
+
+    def render(self, text: str) -> Tuple[np.ndarray, int]:
+        """PCM and sample rate of a reply"""
+        sentences = self.parse(text)
+        if sentences is None or (len(sentences) == 1 and len(sentences[0]) == 1):
+            self.whole += 1
+            return speech_cache_instance().get(text)
+        pieces, sample_rate = self.pieces(sentences)
+        self.spliced += 1
+        return splice(pieces, int(sample_rate * SPLICE_FADE_MS / 1000)), sample_rate
+
+    def pieces(self, sentences: List[List[str]]) -> Tuple[List[np.ndarray], int]:
+        """The prepared segments of parsed sentences at one sample rate, with a pause between sentences"""
+        sample_rate = None
+        pieces = []
+        for i, segments in enumerate(sentences):
+            for segment in segments:
+                pcm, rate = speech_cache_instance().segment(segment)
+                if sample_rate is None:
+                    sample_rate = rate
+                elif rate != sample_rate:
+                    pcm = resample(pcm, rate, sample_rate)
+                pieces.append(pcm)
+            if i < len(sentences) - 1:
+                pieces.append(np.zeros(int(sample_rate * SENTENCE_PAUSE_MS / 1000), dtype=np.float32))
+        return pieces, sample_rate
+
+response_renderer = ResponseRenderer()
+
+def benchmark_tts() -> dict:
+    """Render every volume acknowledgement from 0 to 100 by splicing and check the joins.
+
+    Segments come from the deterministic tone synthesizer. Once prewarmed,
+    rendering must not synthesize anything. Joins are measured on the
+    rendered audio: the step between neighbouring samples across each
+    crossfade, against the largest step inside the two segments, must stay
+    within SPLICE_MAX_JOIN_RATIO.
+    """
+    global speech_cache
+    saved = speech_cache
+    cache_dir = tempfile.mkdtemp(prefix="kevin_bench_")
+    try:
+        speech_cache = SpeechCache(cache_dir=cache_dir, synthesizer=tone_synthesize)
+        for future in speech_cache.prewarm(static_phrases()):
+            future.result()
+        misses = speech_cache.stats()["misses"]
+        templates = [spec['response'] for spec in command_grammar.intents.values()
+                     if '{volume}' in (spec['response'] or '')]
+        texts = [template.format(volume=level) for template in templates for level in range(101)]
+        timings = []
+        worst_ratio = 0.0
+        levels = []
+        for text in texts:
+            start = time.perf_counter()
+            out, rate = response_renderer.render(text)
+            timings.append(time.perf_counter() - start)
+            pieces, _ = response_renderer.pieces(response_renderer.parse(text))
+            levels.extend(20 * math.log10(float(np.sqrt(np.mean(piece ** 2)))) for piece in pieces)
+            ratios = join_step_ratios(out, pieces, int(rate * SPLICE_FADE_MS / 1000))
+            worst_ratio = max([worst_ratio] + ratios)
+        timings.sort()
+        return {
+            "responses": len(texts),
+            "synthesized_on_hot_path": speech_cache.stats()["misses"] - misses,
+            "render_p50_ms": timings[len(timings) // 2] * 1000,
+            "render_max_ms": timings[-1] * 1000,
+            "worst_join_step_ratio": worst_ratio,
+            "max_join_step_ratio": SPLICE_MAX_JOIN_RATIO,
+            "continuous": worst_ratio <= SPLICE_MAX_JOIN_RATIO,
+            "segment_level_db": [min(levels), max(levels)],
+        }
+    finally:
+        speech_cache = saved
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+# Audio output for spoken responses
+class SoundDevicePlayer:
+    """Blocking playback through sounddevice on the selected speaker, or on a fixed PyAudio device index"""
+
+    def __init__(self, device: Optional[int] = None):
+        self.device = device
+
+    def play(self, data: np.ndarray, sample_rate: int):
+        device = state.speaker_device if self.device is None else self.device
+        sd.play(data, sample_rate, device=device_registry.to_sd(device))
+        sd.wait()
+
+    def stop(self):
+        """Cut off the current playback (wakes a blocked play())"""
+        sd.stop()
+
+class NullPlayer:
+    """Discard audio, for tests and benchmarks"""
+
+    def __init__(self):
+        self.clips = 0
+        self.seconds = 0.0
+
+    def play(self, data: np.ndarray, sample_rate: int):
+        self.clips += 1
+        self.seconds += len(data) / sample_rate
+
+    def stop(self):
+        pass
+
+class EchoReference:
+    """What the speaker is playing, published block by block from the output callback.
+
+    The capture side reads it back by time to cancel Kevin's own voice from
+    the microphone. anchor maps a ring position to the monotonic time its
+    sample reaches the DAC.
+    """
+
+    def __init__(self, seconds: float = 2.0, clock=time.monotonic):
+        self.seconds = seconds
+        self.clock = clock
+        self.ring = None
+        self.rate = None
+        self.anchor = (0, 0.0)
+        self.audible_until = float('-inf')
+
+    def reset(self, rate: int):
+        """Start a fresh timeline when the output stream (re)opens"""
+        self.ring = RingBuffer(int(rate * self.seconds))
+        self.rate = rate
+        self.anchor = (0, 0.0)
+        self.audible_until = float('-inf')
+
+    def publish(self, block: np.ndarray, dac_time: float):
+        self.anchor = (self.ring.written, dac_time)
+        self.ring.write(block)
+        self.audible_until = dac_time + len(block) / self.rate
+
+    @property
+    def playing(self) -> bool:
+        return self.clock() < self.audible_until
+
+    def position_at(self, t: float) -> int:
+        """Ring position of the sample at the DAC at monotonic time t"""
+        position, dac_time = self.anchor
+        return position + int(round((t - dac_time) * self.rate))
+
+    def read(self, start: int, count: int) -> np.ndarray:
+        """count samples from position start, zero where nothing was played"""
+        out = np.zeros(count, dtype=np.float32)
+        ring = self.ring
+        lo, hi = max(start, ring.oldest), min(start + count, ring.written)
+        if hi > lo:
+            out[lo - start:hi - start] = ring.view(lo, hi)
+        return out
+
+class PlaybackClip:
+    """One queued response, advanced by the output callback"""
+    __slots__ = ('pcm', 'position', 'done', 'queued', 'audible')
+
+    def __init__(self, pcm: np.ndarray):
+        self.pcm = pcm
+        self.position = 0
+        self.done = threading.Event()
+        self.queued = time.monotonic()
+        self.audible = None  # monotonic time the first sample reaches the DAC
+
+class StreamPlayer:
+    """Low-latency playback through one long-lived output stream.
+
+    The stream stays open on the speaker at the device's native rate and its
+    callback mixes every queued clip into a preallocated block, so a response
+    costs no device open and no file I/O. Each clip is resampled once on the
+    way in, and repeated phrases reuse their resampled PCM. play() blocks until
+    its clip has drained, or raises once the clip has overrun its length by
+    stall_seconds, reopening the stream of a device that stopped pulling
+    blocks. The stream is paused after idle_seconds of silence and reopened
+    only when the speaker changes or PortAudio is rescanned.
+    Everything played is published to reference for echo cancellation.
+    """
+
+    def __init__(self, device: Optional[int] = None, blocksize: int = 256, idle_seconds: float = 30.0,
+                 samplerate: Optional[int] = None, stream_factory=None, stall_seconds: float = 2.0):
+        self.device = device
+        self.blocksize = blocksize
+        self.idle_seconds = idle_seconds
+        self.stall_seconds = stall_seconds
+        self.samplerate = samplerate
+        self.stream_factory = stream_factory
+        self.stream = None
+        self.stream_device = None
+        self.rate = None
+        self.output_latency = 0.0
+        self.mix = None  # mixing block, allocated with the stream so constructing a player imports nothing
+        self.clips = []  # replaced, never mutated, so the callback reads it without a lock
+        self.lock = threading.Lock()
+        self.resampled = OrderedDict()
+        self.max_resampled = 64
+        self.idle_timer = None
+        self.gain = 1.0
+        self.reference = EchoReference()
+        self.opens = 0
+        self.callbacks = 0
+        self.callback_max = 0.0
+        self.stalls = 0
+
+    def _open(self, device: Optional[int]):
+        self._close_stream()
+        sd_device = device_registry.to_sd(device)
+        if self.samplerate is None:
+            info = sd.query_devices(sd_device, 'output')
+            rate, channels = int(info['default_samplerate']), max(1, min(2, int(info['max_output_channels'])))
+        else:
+            rate, channels = self.samplerate, 2
+        stream = (self.stream_factory or sd.OutputStream)(
+            device=sd_device, samplerate=rate, channels=channels, dtype='float32',
+            blocksize=self.blocksize, latency='low', callback=self._callback)
+        if rate != self.rate:
+            self.resampled.clear()
+        if self.mix is None:
+            self.mix = np.zeros(self.blocksize, dtype=np.float32)
+        self.stream, self.stream_device, self.rate = stream, device, rate
+        self.output_latency = float(stream.latency or 0.0)
+        self.reference.reset(rate)
+        self.opens += 1
+
+    def _prepare(self, data: np.ndarray, sample_rate: int) -> np.ndarray:
+        """Mono float32 PCM at the stream rate, cached by source array for repeated phrases"""
+        key = id(data)
+        entry = self.resampled.get(key)
+        if entry is not None and entry[0] is data and entry[1] == sample_rate:
+            self.resampled.move_to_end(key)
+            return entry[2]
+        pcm = data if data.ndim == 1 else data.mean(axis=1)
+        pcm = np.ascontiguousarray(resample(pcm, sample_rate, self.rate), dtype=np.float32)
+        # Holding the source keeps its id from being reused while cached
+        self.resampled[key] = (data, sample_rate, pcm)
+        while len(self.resampled) > self.max_resampled:
+            self.resampled.popitem(last=False)
+        return pcm
+
+    def _callback(self, outdata, frames, time_info, status):
+        started = time.perf_counter()
+        if self.mix is None or frames > len(self.mix):
+            self.mix = np.zeros(frames, dtype=np.float32)
+        mix = self.mix[:frames]
+        mix.fill(0.0)
+        clips = self.clips
+        if clips:
+            latency = time_info.outputBufferDacTime - time_info.currentTime
+            audible = time.monotonic() + (latency if latency > 0 else self.output_latency)
+            for clip in clips:
+                remaining = len(clip.pcm) - clip.position
+                if remaining <= 0:
+                    continue
+                n = min(frames, remaining)
+                if clip.position == 0:
+                    clip.audible = audible
+                mix[:n] += clip.pcm[clip.position:clip.position + n]
+                clip.position += n
+                if n == remaining:
+                    clip.done.set()
+            if self.gain != 1.0:
+                mix *= self.gain
+            np.clip(mix, -1.0, 1.0, out=mix)
+            self.reference.publish(mix, audible)
+        outdata[:] = mix[:, None]
+        self.callbacks += 1
+        elapsed = time.perf_counter() - started
+        if elapsed > self.callback_max:
+            self.callback_max = elapsed
+
+    def play(self, data: np.ndarray, sample_rate: int):
+        device = state.speaker_device if self.device is None else self.device
+        with self.lock:
+            if self.idle_timer is not None:
+                self.idle_timer.cancel()
+                self.idle_timer = None
+            if self.stream is None or device != self.stream_device:
+                self._open(device)
+            if not self.clips:
+                self.gain = 1.0
+            clip = PlaybackClip(self._prepare(data, sample_rate))
+            self.clips = self.clips + [clip]
+            if not self.stream.active:
+                self.stream.start()
+            timeout = len(clip.pcm) / self.rate + self.output_latency + self.stall_seconds
+        if not clip.done.wait(timeout):
+            self._recover(clip, device)
+            raise TimeoutError(f"speaker stopped playing ({timeout:.1f} s without finishing a reply)")
+        with self.lock:
+            self.clips = [c for c in self.clips if c is not clip]
+            if not self.clips and self.stream is not None and self.idle_timer is None:
+                self.idle_timer = threading.Timer(self.idle_seconds, self._pause)
+                self.idle_timer.daemon = True
+                self.idle_timer.start()
+        if clip.audible is not None:
+            metrics.record('first_audio', clip.audible - clip.queued)
+
+    def _recover(self, clip: PlaybackClip, device: Optional[int]):
+        """Drop a clip the device never finished and reopen the stream for whatever plays next"""
+        with self.lock:
+            self.clips = [c for c in self.clips if c is not clip]
+            self.stalls += 1
+            self._close_stream()
+            try:
+                self._open(device)
+                if self.clips:
+                    self.stream.start()
+            except Exception as e:
+                # Left closed; the next play() opens it again
+                self._close_stream()
+                console.print(f"[yellow]⚠️  Could not reopen the speaker: {e}[/yellow]")
+
+    def _pause(self):
+        """Stop the callback after a quiet spell; the device stays open"""
+        with self.lock:
+            self.idle_timer = None
+            if not self.clips and self.stream is not None and self.stream.active:
+                self.stream.stop()
+
+    def duck(self, gain: float = 0.2):
+        """Turn down whatever is playing until it finishes"""
+        self.gain = gain
+
+    def stop(self):
+        """Cut off everything playing (wakes blocked play() calls)"""
+        clips, self.clips = self.clips, []
+        for clip in clips:
+            clip.position = len(clip.pcm)
+            clip.done.set()
+
+    def _close_stream(self):
+        if self.stream is not None:
+            with contextlib.suppress(Exception):
+                self.stream.close()
+            self.stream = None
+
+    def close(self):
+        """Release the device, e.g. before PortAudio is re-initialized"""
+        self.stop()
+        with self.lock:
+            if self.idle_timer is not None:
+                self.idle_timer.cancel()
+                self.idle_timer = None
+            self._close_stream()
+
+class FakeOutputTime:
+    __slots__ = ('currentTime', 'outputBufferDacTime')
+
+class FakeOutputStream:
+    """Stand-in for sd.OutputStream that pulls blocks on a thread in real time"""
+
+    def __init__(self, samplerate, blocksize, channels, callback, latency=0.01, **_):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.callback = callback
+        self.latency = 0.01 if latency == 'low' else latency
+        self.buffer = np.zeros((blocksize, channels), dtype=np.float32)
+        self.active = False
+        self.thread = None
+        self.samples = 0  # non-silent frames written
+
+    def _run(self):
+        period = self.blocksize / self.samplerate
+        deadline = time.monotonic()
+        time_info = FakeOutputTime()
+        while self.active:
+            now = time.monotonic()
+            time_info.currentTime = now
+            time_info.outputBufferDacTime = now + self.latency
+            self.callback(self.buffer, self.blocksize, time_info, None)
+            self.samples += int(np.count_nonzero(self.buffer[:, 0]))
+            deadline += period
+            time.sleep(max(0.0, deadline - time.monotonic()))
+
+    def start(self):
+        self.active = True
+        self.thread = threading.Thread(target=self._run, name="kevin-fake-output", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.active = False
+        if self.thread is not None:
+            self.thread.join()
+
+    def close(self):
+        self.stop()
+
+audio_player = StreamPlayer()
+
+# Enhanced speak function with better device handling
+def speak(text, trace: Optional[CommandTrace] = None, player=None):
+    try:
+        # Cached PCM, synthesized on first use
+        synth_start = time.monotonic()
+        data, sample_rate = response_renderer.render(text)
+        playback_start = time.monotonic()
+        metrics.record('tts_synth', playback_start - synth_start)
+        if trace is not None:
+            metrics.record('response', playback_start - trace.start)
+        
+        # Play audio with specific device (None selects the default output)
+        try:
+            (player or audio_player).play(data, sample_rate)
+            metrics.record('playback', time.monotonic() - playback_start)
+        except Exception as e:
+            console.print(f"[yellow]⚠️  Device-specific playback failed, using default: {e}[/yellow]")
+            # Straight to the system default output; the selected speaker is the one that just failed
+            sd.play(data, sample_rate, device=None)
+            sd.wait()
+            
+    except Exception as e:
+        console.print(f"[red]⚠️  Speech error: {e}[/red]")
+
+def benchmark_playback(clips: int = 100, clip_ms: int = 40, rate: int = 48000) -> dict:
+    """Play short responses back to back through the stream player on a simulated device.
+
+    Reports the time from a response being ready to its first sample reaching
+    the (simulated) DAC, how often the device was opened, and the worst mixer
+    callback time. Clips come from a 22.05 kHz source so every one needs
+    resampling, and half repeat so the resample cache is exercised.
+    """
+    global metrics
+    saved = metrics
+    player = StreamPlayer(device=0, samplerate=rate, stream_factory=FakeOutputStream)
+    try:
+        metrics = LatencyMetrics()
+        source = 22050
+        t = np.arange(int(source * clip_ms / 1000)) / source
+        phrases = [(0.5 * np.cos(2 * np.pi * (300 + 40 * i) * t)).astype(np.float32) for i in range(clips // 2)]
+        expected = 0
+        for i in range(clips):
+            pcm = phrases[i % len(phrases)] if i % 2 else (0.5 * np.cos(2 * np.pi * 500 * t)).astype(np.float32)
+            expected += len(resample(pcm, source, rate))
+            player.play(pcm, source)
+        first = metrics.histograms['first_audio'].snapshot()
+        return {
+            "clips": clips,
+            "clip_ms": clip_ms,
+            "device_opens": player.opens,
+            "first_audio_p50_ms": first["p50"] * 1000,
+            "first_audio_p95_ms": first["p95"] * 1000,
+            "first_audio_max_ms": first["max"] * 1000,
+            "block_ms": player.blocksize / rate * 1000,
+            "simulated_output_latency_ms": player.output_latency * 1000,
+            "callback_max_us": player.callback_max * 1e6,
+            "resampled_cached": len(player.resampled),
+            "samples_played": player.stream.samples,
+            "samples_expected": expected,
+        }
+    finally:
+        player.close()
+        metrics = saved
+
+# Speech response priorities (lower values are spoken first)
+PRIORITY_ALERT = 0
+PRIORITY_ACK = 1
+PRIORITY_INFO = 2
+
+class SpeechScheduler:
+    """Bounded, prioritized queue of spoken responses played on a worker thread.
+
+    Submitting never blocks the caller. A newer command acknowledgement
+    supersedes any acknowledgements still waiting, so a burst of commands
+    is answered once instead of being read out in sequence.
+    """
+
+    def __init__(self, speak_fn=None, max_pending: int = 8):
+        self.speak_fn = speak_fn or speak
+        self.max_pending = max_pending
+        self.queue = []  # heap of (priority, seq, submitted_at, text)
+        self.cond = threading.Condition()
+        self.seq = 0
+        self.worker = None
+        self.running = False
+        self.notify = None  # set when an external driver plays responses
+        self.speaking = False
+        self.submitted = 0
+        self.spoken = 0
+        self.dropped = 0
+        self.last_wait = 0.0
+        self.max_wait = 0.0
+        self.total_wait = 0.0
+
+    def start(self):
+        """Start the playback worker if it is not already running"""
+        with self.cond:
+            if self.running:
+                return
+            self.running = True
+        self.worker = threading.Thread(target=self._run, name="kevin-speech", daemon=True)
+        self.worker.start()
+
+    def attach(self, notify):
+        """Have an external driver play responses instead of the worker thread.
+
+        notify() is called after every submit; the driver then calls take()
+        and speak_item() until take() returns None.
+        """
+        with self.cond:
+            self.notify = notify
+            self.running = True
+
+    def stop(self):
+        """Discard pending responses and stop the worker after the current one"""
+        with self.cond:
+            self.dropped += len(self.queue)
+            self.queue.clear()
+            self.running = False
+            self.cond.notify_all()
+
+    def interrupt(self):
+        """Drop waiting acknowledgements and information; alerts are still spoken"""
+        with self.cond:
+            kept = [item for item in self.queue if item[0] == PRIORITY_ALERT]
+            self.dropped += len(self.queue) - len(kept)
+            self.queue = kept
+            heapq.heapify(self.queue)
+
+    def submit(self, text: str, priority: int = PRIORITY_ACK, trace: Optional[CommandTrace] = None) -> bool:
+        """Queue a response; returns False if it was rejected because the queue is full"""
+        if not self.running:
+            self.start()
+        with self.cond:
+            self.submitted += 1
+            if priority == PRIORITY_ACK:
+                # A newer acknowledgement makes the older ones stale
+                stale = [item for item in self.queue if item[0] == PRIORITY_ACK]
+                if stale:
+                    self.queue = [item for item in self.queue if item[0] != PRIORITY_ACK]
+                    heapq.heapify(self.queue)
+                    self.dropped += len(stale)
+            if len(self.queue) >= self.max_pending:
+                worst = max(self.queue)
+                if worst[0] <= priority:
+                    self.dropped += 1
+                    return False
+                self.queue.remove(worst)
+                heapq.heapify(self.queue)
+                self.dropped += 1
+            self.seq += 1
+            heapq.heappush(self.queue, (priority, self.seq, time.monotonic(), text, trace))
+            self.cond.notify()
+        if self.notify is not None:
+            self.notify()
+        return True
+
+    def _pop(self):
+        # Caller holds the lock and has checked the queue is not empty
+        priority, _, submitted_at, text, trace = heapq.heappop(self.queue)
+        wait = time.monotonic() - submitted_at
+        self.last_wait = wait
+        self.max_wait = max(self.max_wait, wait)
+        self.total_wait += wait
+        self.speaking = True
+        metrics.record('speech_queue', wait)
+        return text, trace
+
+    def take(self):
+        """The next (text, trace) to speak, or None if nothing is waiting"""
+        with self.cond:
+            if not self.running or not self.queue:
+                return None
+            return self._pop()
+
+    def speak_item(self, item):
+        """Speak one item returned by take(); blocks for the playback"""
+        try:
+            self.speak_fn(*item)
+        except Exception as e:
+            console.print(f"[red]⚠️  Speech scheduler error: {e}[/red]")
+        finally:
+            with self.cond:
+                self.speaking = False
+                self.spoken += 1
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.running and not self.queue:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                item = self._pop()
+            self.speak_item(item)
+
+    @property
+    def depth(self) -> int:
+        """Number of responses waiting to be spoken"""
+        with self.cond:
+            return len(self.queue)
+
+    def stats(self) -> dict:
+        """Queue depth and wait-time counters"""
+        with self.cond:
+            started = self.spoken + (1 if self.speaking else 0)
+            return {
+                "depth": len(self.queue),
+                "speaking": self.speaking,
+                "submitted": self.submitted,
+                "spoken": self.spoken,
+                "dropped": self.dropped,
+                "last_wait": self.last_wait,
+                "max_wait": self.max_wait,
+                "avg_wait": self.total_wait / started if started else 0.0,
+            }
+
+speech_scheduler = SpeechScheduler()
+
+# Dashboard panels, each rendered on its own so only changed panels are rebuilt
+def render_header():
+    return Panel(
+        Align.center(
+            Text("🎧 KEVIN AI - DUAL HEADSET VOICE CONTROLLER 🎧", style="bold cyan")
+        ),
+        style="bold blue",
+        border_style="bright_blue"
+    )
+
+def render_status_panel():
+    # Status info table
+    status_table = Table(show_header=False, box=None, expand=True)
+    status_table.add_column("", style="cyan", width=20)
+    status_table.add_column("", style="white")
+    
+    # Calculate uptime
+    uptime = datetime.now() - state.start_time
     uptime_str = str(uptime).split('.')[0]
     
     status_table.add_row("🟢 Status:", f"[green]{state.status}[/green]")
@@ -389,12 +2986,13 @@ def create_status_display():
     status_table.add_row("⏱️  Uptime:", f"[blue]{uptime_str}[/blue]")
     status_table.add_row("🔊 Volume:", f"[{'red' if state.is_muted else 'green'}]{state.current_volume}%{' (MUTED)' if state.is_muted else ''}[/]")
     
-    status_panel = Panel(
+    return Panel(
         status_table,
         title="📊 [bold green]SYSTEM STATUS[/bold green]",
         border_style="green"
     )
-    
+
+def render_device_panel():
     # Device configuration table
     device_table = Table(show_header=False, box=None, expand=True)
     device_table.add_column("", style="cyan", width=20)
@@ -403,12 +3001,13 @@ def create_status_display():
     device_table.add_row("🎤 Microphone:", f"[green]{state.mic_name}[/green]")
     device_table.add_row("🔊 Audio Output:", f"[green]{state.speaker_name}[/green]")
     
-    device_panel = Panel(
+    return Panel(
         device_table,
         title="🎧 [bold cyan]DEVICE CONFIGURATION[/bold cyan]",
         border_style="cyan"
     )
-    
+
+def render_commands_panel():
     # Commands help table
     commands_table = Table(show_header=True, box=None)
     commands_table.add_column("🎵 Media Controls", style="cyan", width=20)
@@ -419,12 +3018,13 @@ def create_status_display():
     commands_table.add_row("'forward' / 'next'", "'increase/decrease volume'", "")
     commands_table.add_row("'back' / 'previous'", "'mute' / 'unmute'", "")
     
-    commands_panel = Panel(
+    return Panel(
         commands_table,
         title="🎮 [bold cyan]AVAILABLE COMMANDS[/bold cyan]",
         border_style="cyan"
     )
-    
+
+def render_listening_panel():
     # Listening indicator
     listening_text = Text()
     if state.is_listening:
@@ -434,177 +3034,2275 @@ def create_status_display():
         listening_text.append("🔇 ", style="red")
         listening_text.append("PROCESSING...", style="bold red")
     
-    listening_panel = Panel(
+    return Panel(
         Align.center(listening_text),
         border_style="bright_green" if state.is_listening else "bright_red",
         height=3
     )
+
+def render_latency_panel():
+    # Latency percentiles per pipeline stage
+    latency_table = Table(show_header=True, box=None, expand=True)
+    latency_table.add_column("Stage", style="cyan")
+    latency_table.add_column("p50", style="green", justify="right")
+    latency_table.add_column("p95", style="yellow", justify="right")
+    latency_table.add_column("p99", style="red", justify="right")
+    
+    snapshot = metrics.snapshot()
+    for stage in ('endpoint', 'asr', 'dispatch', 'action', 'response'):
+        stats = snapshot.get(stage)
+        if stats:
+            latency_table.add_row(stage, *(f"{stats[key] * 1000:.0f} ms" for key in ("p50", "p95", "p99")))
+    if not metrics.enabled:
+        latency_table.add_row("[dim]disabled[/dim]", "", "", "")
     
-    # Layout composition
+    return Panel(
+        latency_table,
+        title="⏱️  [bold magenta]LATENCY[/bold magenta]",
+        border_style="magenta"
+    )
+
+PANEL_RENDERERS = {
+    'header': render_header,
+    'status': render_status_panel,
+    'devices': render_device_panel,
+    'commands': render_commands_panel,
+    'listening': render_listening_panel,
+    'latency': render_latency_panel,
+}
+
+# Which panel shows each watched KevinState field
+FIELD_PANELS = {
+    'is_listening': ('status', 'listening'),
+    'last_command': ('status',),
+    'commands_processed': ('status',),
+    'current_volume': ('status',),
+    'is_muted': ('status',),
+    'status': ('status',),
+    'mic_name': ('devices',),
+    'speaker_name': ('devices',),
+}
+
+# Create dynamic status display with device info
+def create_status_display():
+    # Layout composition with named regions so panels can be swapped in place
+    layout = Layout()
     layout.split_column(
-        Layout(header, size=3),
-        Layout().split_row(
-            Layout(status_panel),
-            Layout(device_panel)
-        ),
-        Layout(commands_panel, size=6),
-        Layout(listening_panel, size=3)
+        Layout(render_header(), name="header", size=3),
+        Layout(name="body"),
+        Layout(render_commands_panel(), name="commands", size=6),
+        Layout(render_listening_panel(), name="listening", size=3)
+    )
+    layout["body"].split_row(
+        Layout(render_status_panel(), name="status"),
+        Layout(name="side")
+    )
+    layout["side"].split_column(
+        Layout(render_device_panel(), name="devices", size=4),
+        Layout(render_latency_panel(), name="latency")
     )
-    
     return layout
 
+class StatusDashboard:
+    """Live dashboard redrawn only when KevinState changes.
+
+    State changes mark the affected panels dirty; a render thread rebuilds
+    just those panels and refreshes the rich Live display, at most max_fps
+    times a second. When nothing is dirty nothing is drawn (the uptime
+    clock marks the status panel once a second).
+    """
+
+    def __init__(self, max_fps: float = 4.0):
+        self.min_interval = 1.0 / max_fps
+        self.layout = None
+        self.dirty = set()
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.wake_async = None  # set while run_async() drives the display
+        self.running = False
+        self.thread = None
+        self.last_frame = 0.0
+        self.last_uptime = -1
+        self.latency_version = -1
+        self.frames = 0
+        self.render_seconds = 0.0
+        self.last_render_ms = 0.0
+        self.started_at = None
+
+    def prepare(self):
+        """Build the layout and start following state changes"""
+        backend = volume_control()
+        backend.synced.wait(timeout=0.5)
+        sync_volume_state(backend.get_level(), backend.is_muted())
+        self.layout = create_status_display()
+        state.subscribe(self._on_change)
+        self.running = True
+        self.started_at = time.monotonic()
+
+    def start(self):
+        self.prepare()
+        self.thread = threading.Thread(target=self._run, name="kevin-dashboard", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1)
+
+    def _on_change(self, name, value):
+        panels = FIELD_PANELS.get(name)
+        if panels:
+            with self.lock:
+                self.dirty.update(panels)
+            self.wake.set()
+            if self.wake_async is not None:
+                self.wake_async()
+
+    def _take_dirty(self) -> set:
+        with self.lock:
+            dirty, self.dirty = self.dirty, set()
+            self.wake.clear()
+            return dirty
+
+    def render(self, dirty) -> float:
+        """Rebuild the dirty panels in place; returns seconds spent"""
+        start = time.perf_counter()
+        for name in dirty:
+            self.layout[name].update(PANEL_RENDERERS[name]())
+        return time.perf_counter() - start
+
+    def _until_tick(self) -> float:
+        """Seconds until the uptime clock next changes"""
+        return 1.0 - (time.monotonic() - self.started_at) % 1.0
+
+    def _mark_periodic(self):
+        uptime = int(time.monotonic() - self.started_at)
+        if uptime != self.last_uptime:
+            self.last_uptime = uptime
+            with self.lock:
+                self.dirty.add('status')
+                # New latency samples are picked up on the same tick
+                if metrics.version != self.latency_version:
+                    self.latency_version = metrics.version
+                    self.dirty.add('latency')
+
+    def _draw(self, live):
+        dirty = self._take_dirty()
+        if not dirty:
+            return
+        try:
+            start = time.perf_counter()
+            self.render(dirty)
+            live.refresh()
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            console.print(f"[red]Display error:[/red] {e}")
+            return
+        self.last_frame = time.monotonic()
+        self.frames += 1
+        self.render_seconds += elapsed
+        self.last_render_ms = elapsed * 1000
+
+    def _run(self):
+        with Live(self.layout, console=console, auto_refresh=False, transient=False) as live:
+            while self.running:
+                # Wake on a state change, or on the next uptime second
+                self.wake.wait(timeout=self._until_tick())
+                if not self.running:
+                    break
+                self._mark_periodic()
+                # Cap the refresh rate; changes during the wait are batched
+                pause = self.last_frame + self.min_interval - time.monotonic()
+                if pause > 0:
+                    time.sleep(pause)
+                self._draw(live)
+
+    async def run_async(self):
+        """The render loop as an asyncio task; state changes wake it through the event loop"""
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+        self.wake_async = lambda: loop.call_soon_threadsafe(changed.set)
+        try:
+            with Live(self.layout, console=console, auto_refresh=False, transient=False) as live:
+                while self.running:
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(changed.wait(), self._until_tick())
+                    changed.clear()
+                    self._mark_periodic()
+                    pause = self.last_frame + self.min_interval - time.monotonic()
+                    if pause > 0:
+                        await asyncio.sleep(pause)
+                    self._draw(live)
+        finally:
+            self.wake_async = None
+
+    def stats(self) -> dict:
+        """Frames drawn, frames per second and render time"""
+        running_for = time.monotonic() - self.started_at if self.started_at else 0.0
+        return {
+            "frames": self.frames,
+            "fps": self.frames / running_for if running_for else 0.0,
+            "avg_render_ms": self.render_seconds / self.frames * 1000 if self.frames else 0.0,
+            "last_render_ms": self.last_render_ms,
+        }
+
+dashboard = None
+
+def benchmark_dashboard(frames: int = 200) -> dict:
+    """Time layout rebuilds, single-panel updates and draws against an off-screen console"""
+    offscreen = Console(file=io.StringIO(), width=120, height=30, force_terminal=True)
+    layout = create_status_display()
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        create_status_display()
+    rebuild = (time.perf_counter() - start) / frames
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        state.commands_processed += 1
+        layout["status"].update(render_status_panel())
+    update = (time.perf_counter() - start) / frames
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        offscreen.print(layout)
+    draw = (time.perf_counter() - start) / frames
+    return {
+        "frames": frames,
+        "full_rebuild_ms": rebuild * 1000,
+        "status_panel_update_ms": update * 1000,
+        "draw_ms": draw * 1000,
+        "max_fps": 1 / (update + draw),
+    }
+
 # Enhanced UI with device setup
-def show_enhanced_ui():
+def show_enhanced_ui(use_saved: bool = False):
     # Clear screen
     console.clear()
     
+    # Pre-synthesize fixed responses while the user goes through setup
+    speech_cache_instance().prewarm(static_phrases())
+    
     # Setup dual headset configuration
-    setup_dual_headset()
-    
-    # Startup animation
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[bold blue]Initializing Kevin AI Dual Headset System..."),
-        console=console,
-        transient=True
-    ) as progress:
-        task = progress.add_task("Loading...", total=100)
-        for i in range(100):
-            progress.update(task, advance=1)
-            time.sleep(0.02)
+    with startup_profile.stage("device setup"):
+        setup_dual_headset(use_saved)
     
     # Welcome message
     console.print(Rule("[bold cyan]🎧 KEVIN AI DUAL HEADSET ACTIVATED 🎧[/bold cyan]"))
     
-    # Initial status update
+    # Initial status update; the greeting is spoken once capture is running
+    state.status = "Online & Ready"
+
+def setup_headless(mic: Optional[str] = None, speaker: Optional[str] = None):
+    """Device setup without prompts: the saved configuration, with mic/speaker (index or name part) overriding it"""
+    speech_cache_instance().prewarm(static_phrases())
+    with startup_profile.stage("device setup"):
+        if state.load_config():
+            rebind_devices()
+        for label, spec, devices, field in (("microphone", mic, device_registry.input_devices, "mic"),
+                                            ("audio output", speaker, device_registry.output_devices, "speaker")):
+            if spec is not None:
+                index, name = _find_device(int(spec) if spec.isdigit() else spec, devices(), set())
+                setattr(state, f"{field}_device", index)
+                setattr(state, f"{field}_name", name)
+                setattr(state, f"{field}_key", device_registry.key_for_pa(index))
+            key = getattr(state, f"{field}_key")
+            if key is not None and device_registry.pa_index(key) is None:
+                console.print(f"[yellow]⚠️  Saved {label} '{key[0]}' is not connected; "
+                              f"using the default until it is plugged back in[/yellow]")
+    console.print(f"[cyan]🎧 Microphone: {state.mic_name} | Audio output: {state.speaker_name}[/cyan]")
     state.status = "Online & Ready"
-    speak("Kevin Artificial Intelligence dual headset system activated. All systems online Boss. Ready for voice commands.")
 
-# Enhanced command handler
-def handle_command(command):
-    command = command.lower().strip()
-    state.last_command = command
-    state.commands_processed += 1
-    
-    # Command keywords mapping
-    command_keywords = {
-        'pause': {
-            'keywords': ['pause', 'stop', 'halt', 'freeze'],
-            'action': lambda cmd: (pyautogui.press("space"), "Media paused.", "Media Paused")
-        },
-        'play': {
-            'keywords': ['play', 'start', 'resume', 'continue', 'unpause'],
-            'action': lambda cmd: (pyautogui.press("space"), "Media playing.", "Media Playing")
-        },
-        'forward': {
-            'keywords': ['forward', 'next', 'skip', 'ahead', 'advance'],
-            'action': lambda cmd: (pyautogui.press("right"), "Moved forward.", "Seeking Forward")
-        },
-        'backward': {
-            'keywords': ['back', 'previous', 'rewind', 'return', 'behind'],
-            'action': lambda cmd: (pyautogui.press("left"), "Moved back.", "Seeking Backward")
-        },
-        'scroll_up': {
-            'keywords': ['scroll up', 'move up', 'go up', 'upward', 'up'],
-            'action': lambda cmd: (pyautogui.scroll(300), "Scrolling up.", "Scrolling Up")
-        },
-        'scroll_down': {
-            'keywords': ['scroll down', 'move down', 'go down', 'downward', 'down'],
-            'action': lambda cmd: (pyautogui.scroll(-300), "Scrolling down.", "Scrolling Down")
-        },
-        'volume_up': {
-            'keywords': ['volume up', 'louder', 'increase volume', 'turn up', 'raise volume'],
-            'action': lambda cmd: (
-                volume.SetMasterVolumeLevelScalar(min(volume.GetMasterVolumeLevelScalar() + 0.1, 1.0), None),
-                f"Volume increased to {int(volume.GetMasterVolumeLevelScalar() * 100)} percent.",
-                "Volume Increased"
-            )
-        },
-        'volume_down': {
-            'keywords': ['volume down', 'quieter', 'decrease volume', 'turn down', 'lower volume'],
-            'action': lambda cmd: (
-                volume.SetMasterVolumeLevelScalar(max(volume.GetMasterVolumeLevelScalar() - 0.1, 0.0), None),
-                f"Volume decreased to {int(volume.GetMasterVolumeLevelScalar() * 100)} percent.",
-                "Volume Decreased"
-            )
-        },
-        'mute': {
-            'keywords': ['mute', 'silence', 'quiet', 'no sound', 'shut up'],
-            'action': lambda cmd: (volume.SetMute(1, None), "Audio muted.", "Audio Muted")
-        },
-        'unmute': {
-            'keywords': ['unmute', 'unsilence', 'sound on', 'restore sound'],
-            'action': lambda cmd: (volume.SetMute(0, None), "Audio unmuted.", "Audio Unmuted")
+# Enhanced command handler
+# Action dispatch queue
+class ActionReply:
+    """The single spoken acknowledgement for one utterance, assembled from its batches"""
+    __slots__ = ('parts', 'remaining', 'trace', 'room')
+
+    def __init__(self, size: int, trace, room=None):
+        self.parts = [None] * size
+        self.remaining = size
+        self.trace = trace
+        self.room = room
+
+class ActionBatch:
+    """Queued requests of one action group, applied together"""
+    __slots__ = ('intent', 'group', 'amounts', 'reply', 'slot', 'submitted_at', 'queued_at', 'min_interval')
+
+    @property
+    def room(self):
+        return self.reply.room
+
+    def __init__(self, intent: str, group: Optional[str], amount, reply: ActionReply, slot: int,
+                 submitted_at: float, queued_at: float, min_interval: float):
+        self.intent = intent
+        self.group = group
+        self.amounts = [] if group is None else [amount]
+        self.reply = reply
+        self.slot = slot
+        self.submitted_at = submitted_at
+        self.queued_at = queued_at
+        self.min_interval = min_interval
+
+class ActionDispatcher:
+    """Queue between intent matching and execution.
+
+    A request joins the last queued batch when both belong to the same
+    action group, so a burst of "volume up" becomes one absolute volume
+    change with one spoken confirmation. The intents of one utterance are
+    queued together in spoken order and answered with one combined reply;
+    when a batch absorbs a later request, the later utterance's reply
+    reports the result. Each group is rate limited: a batch
+    waits until min_interval has passed since the group last ran, and
+    anything arriving meanwhile is merged into it. Repeats of an intent
+    within its dedup window are dropped as duplicate recognitions.
+    In multi-room mode all of this is per room: batches of different rooms
+    never merge, rate limits and dedup are kept per room, and a batch runs
+    against its room's volume and is answered on its room's speaker.
+
+    clock drives rate limiting and dedup; with threaded=False nothing runs
+    until pump() is called, which lets the replay harness use audio time.
+    """
+
+    def __init__(self, clock=time.monotonic, threaded: bool = True):
+        self.clock = clock
+        self.threaded = threaded
+        self.pending = deque()
+        self.cond = threading.Condition()
+        self.last_run = {}   # (room, group) -> clock time it last ran
+        self.last_seen = {}  # (room, intent) -> clock time it was last submitted
+        self.busy = False
+        self.running = False
+        self.thread = None
+        self.notify = None  # set when an external driver pumps the queue
+        self.counts = {'submitted': 0, 'merged': 0, 'deduplicated': 0, 'executed': 0,
+                       'applied': 0, 'cancelled': 0}
+        self.max_depth = 0
+
+    def start(self):
+        with self.cond:
+            if self.running or not self.threaded:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self._run, name="kevin-actions", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+
+    def attach(self, notify):
+        """Have an external driver call pump() instead of the worker thread; notify() follows every submit"""
+        with self.cond:
+            self.threaded = False
+            self.notify = notify
+
+    def _count(self, outcome: str):
+        self.counts[outcome] += 1
+        metrics.count('actions', outcome)
+
+    def submit(self, requests: List[Tuple[str, object]], trace: Optional[CommandTrace] = None, room=None,
+               dedup: bool = True) -> List[str]:
+        """Queue (intent, amount) pairs from one utterance; returns the intents that were not duplicates
+
+        dedup=False skips the duplicate-recognition check, for commands that
+        were typed or injected rather than heard.
+        """
+        if self.threaded and not self.running:
+            self.start()
+        now = self.clock()
+        submitted_at = time.monotonic()
+        with self.cond:
+            fresh = []
+            for name, amount in requests:
+                self._count('submitted')
+                last = self.last_seen.get((room, name))
+                if dedup and last is not None and now - last < command_grammar.intents[name]['dedup_window']:
+                    self._count('deduplicated')
+                    continue
+                fresh.append((name, amount))
+            for name, _ in fresh:
+                self.last_seen[(room, name)] = now
+
+            reply = ActionReply(len(fresh), trace, room)
+            for slot, (name, amount) in enumerate(fresh):
+                intent = command_grammar.intents[name]
+                group = COMMAND_ACTIONS[intent['action']][0] if intent['action'] in COMMAND_ACTIONS else None
+                min_interval = intent['min_interval']
+                if min_interval is None:
+                    min_interval = ACTION_GROUPS[group]['min_interval'] if group else 0.0
+                tail = self.pending[-1] if self.pending else None
+                if group is not None and tail is not None and tail.group == group and tail.room is room:
+                    # The merged result is reported by the newer reply
+                    self._release(tail.reply, tail.slot, None)
+                    tail.amounts.append(amount)
+                    tail.intent = name
+                    tail.reply, tail.slot = reply, slot
+                    tail.min_interval = max(tail.min_interval, min_interval)
+                    self._count('merged')
+                else:
+                    self.pending.append(ActionBatch(name, group, amount, reply, slot, submitted_at, now, min_interval))
+                    self.max_depth = max(self.max_depth, len(self.pending))
+            self.cond.notify_all()
+        if self.notify is not None:
+            self.notify()
+        return [name for name, _ in fresh]
+
+    def _release(self, reply: ActionReply, slot: int, text: Optional[str]):
+        """Fill one part of a reply and speak it once every part is in"""
+        reply.parts[slot] = text
+        reply.remaining -= 1
+        if reply.remaining == 0:
+            spoken = " ".join(part for part in reply.parts if part)
+            if spoken:
+                (reply.room.speech if reply.room is not None else speech_scheduler).submit(spoken, trace=reply.trace)
+
+    def _take_ready(self, now: float) -> Tuple[Optional[ActionBatch], Optional[float]]:
+        """Pop the head batch if its group may run; otherwise the seconds until it may"""
+        if not self.pending:
+            return None, None
+        head = self.pending[0]
+        ready_at = self.last_run.get((head.room, head.group), float('-inf')) + head.min_interval
+        if head.group is not None and now < ready_at:
+            return None, ready_at - now
+        self.pending.popleft()
+        if head.group is not None:
+            self.last_run[(head.room, head.group)] = now
+        self.busy = True
+        return head, 0.0
+
+    def _execute(self, batch: ActionBatch):
+        start = time.monotonic()
+        metrics.record('dispatch', start - batch.submitted_at)
+        intent = command_grammar.intents[batch.intent]
+        target = batch.room.state if batch.room is not None else state
+        context = {'mic_name': target.mic_name, 'speaker_name': target.speaker_name,
+                   'volume': target.current_volume}
+        text = None
+        try:
+            if batch.group is not None:
+                group = ACTION_GROUPS[batch.group]
+                amount = group['combine'](batch.amounts)
+                if amount is not None and (amount or not group.get('zero_is_noop')):
+                    result = group['apply'](amount, batch.room)
+                    metrics.record('action', time.monotonic() - start)
+                    self._count('applied')
+                    if isinstance(result, dict):
+                        context.update(result)
+                else:
+                    self._count('cancelled')
+            self._count('executed')
+            text = intent['response'].format(**context)
+        except Exception as e:
+            console.print(f"[red]⚠️  Action '{batch.intent}' failed: {e}[/red]")
+        finally:
+            with self.cond:
+                self._release(batch.reply, batch.slot, text)
+                self.busy = False
+                self.cond.notify_all()
+
+    def next_wait(self) -> Optional[float]:
+        """Seconds until the head batch may run, or None when the queue is empty"""
+        with self.cond:
+            if not self.pending:
+                return None
+            head = self.pending[0]
+            if head.group is None:
+                return 0.0
+            ready_at = self.last_run.get((head.room, head.group), float('-inf')) + head.min_interval
+            return max(0.0, ready_at - self.clock())
+
+    def pump(self, now: Optional[float] = None) -> int:
+        """Execute every batch that may run at now; returns how many ran"""
+        executed = 0
+        while True:
+            with self.cond:
+                batch, _ = self._take_ready(self.clock() if now is None else now)
+            if batch is None:
+                return executed
+            self._execute(batch)
+            executed += 1
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while True:
+                    if not self.running:
+                        return
+                    batch, wait = self._take_ready(self.clock())
+                    if batch is not None:
+                        break
+                    self.cond.wait(wait)
+            self._execute(batch)
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Wait until the queue has drained (threaded mode)"""
+        with self.cond:
+            return self.cond.wait_for(lambda: not self.pending and not self.busy, timeout)
+
+    @property
+    def depth(self) -> int:
+        return len(self.pending)
+
+    def stats(self) -> dict:
+        with self.cond:
+            return dict(self.counts, depth=len(self.pending), max_depth=self.max_depth)
+
+action_dispatcher = ActionDispatcher()
+
+def handle_command(command, trace: Optional[CommandTrace] = None, room=None, dedup: bool = True,
+                   after: Optional[str] = None):
+    """Parse and dispatch one utterance; after names an intent that already ran early,
+    so only the intents spoken after it are dispatched"""
+    target = room.state if room is not None else state
+    command = command.lower().strip()
+    target.last_command = command
+    target.commands_processed += 1
+    
+    # Single pass over the utterance; the "kevin" wake word is simply not a phrase
+    match_start = time.monotonic()
+    requests = []
+    commands = command_grammar.parse(command)
+    if after is not None:
+        # A final result without the early intent is a late correction; it must not fire
+        intents = [parsed.intent for parsed in commands]
+        commands = commands[intents.index(after) + 1:] if after in intents else []
+    for parsed in commands:
+        action = command_grammar.intents[parsed.intent]['action']
+        amount = action_amount(action, parsed.value, parsed.unit)
+        if action in COMMAND_ACTIONS and amount is None:
+            continue  # e.g. "volume" without a level
+        requests.append((parsed.intent, amount))
+    metrics.record('match', time.monotonic() - match_start)
+    event_hub.publish('command', text=command, intent=requests[0][0] if requests else None,
+                      room=room.name if room is not None else None)
+    if not requests:
+        # Silently ignore unrecognized commands
+        target.status = "Ready..."
+        return None
+    
+    # Every intent runs on the dispatch queue, in order, with one combined reply
+    queued = action_dispatcher.submit(requests, trace=trace, room=room, dedup=dedup)
+    if queued:
+        # A repeat dropped as a duplicate recognition leaves the status of the command that ran
+        target.status = " + ".join(command_grammar.intents[name]['status'] for name in queued)
+    return requests[0][0]
+
+# Persistent microphone capture
+CAPTURE_RATE = 16000
+CAPTURE_BLOCK = 320  # 20 ms at 16 kHz
+CAPTURE_SECONDS = 30.0
+
+class RingBuffer:
+    """Preallocated mono float32 ring buffer addressed by absolute sample position.
+
+    Every sample is written twice, at i and i + capacity, so any window of
+    up to capacity samples is a single contiguous slice of the backing
+    array and can be handed out as a zero-copy view.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.data = np.zeros(2 * capacity, dtype=np.float32)
+        self.written = 0  # total samples ever written
+        self.write_time = time.monotonic()  # when the newest sample arrived
+        self.cond = threading.Condition()
+        self.async_waiters = []  # (position, loop, future) of asyncio readers
+
+    def write(self, samples: np.ndarray):
+        n = len(samples)
+        skipped = 0
+        if n > self.capacity:
+            skipped = n - self.capacity
+            samples = samples[skipped:]
+            n = self.capacity
+        pos = (self.written + skipped) % self.capacity
+        first = min(n, self.capacity - pos)
+        self.data[pos:pos + first] = samples[:first]
+        self.data[pos + self.capacity:pos + self.capacity + first] = samples[:first]
+        rest = n - first
+        if rest:
+            self.data[:rest] = samples[first:]
+            self.data[self.capacity:self.capacity + rest] = samples[first:]
+        with self.cond:
+            self.written += n + skipped
+            self.write_time = time.monotonic()
+            self.cond.notify_all()
+            if self.async_waiters:
+                self._wake_async()
+
+    def _wake_async(self):
+        # Only readers whose position has been reached are scheduled, so an
+        # asyncio reader wakes once per block it asked for, not once per write
+        waiting = []
+        for entry in self.async_waiters:
+            position, loop, future = entry
+            if self.written >= position:
+                loop.call_soon_threadsafe(_resolve_future, future)
+            else:
+                waiting.append(entry)
+        self.async_waiters = waiting
+
+    @property
+    def oldest(self) -> int:
+        """Oldest absolute position still held in the buffer"""
+        return max(0, self.written - self.capacity)
+
+    def view(self, start: int, end: int) -> np.ndarray:
+        """Zero-copy view of samples [start, end); valid until overwritten"""
+        if start < self.oldest or end > self.written or end - start > self.capacity:
+            raise IndexError(f"window [{start}, {end}) is outside the buffer")
+        offset = start % self.capacity
+        return self.data[offset:offset + (end - start)]
+
+    def latest(self, count: int) -> np.ndarray:
+        """View of the most recent count samples"""
+        end = self.written
+        return self.view(max(self.oldest, end - count), end)
+
+    def time_of(self, position: int, sample_rate: int) -> float:
+        """Approximate monotonic time at which the sample at position was captured"""
+        return self.write_time - (self.written - position) / sample_rate
+
+    def wait_for(self, position: int, timeout: Optional[float] = None) -> bool:
+        """Block until at least position samples have been written"""
+        with self.cond:
+            return self.cond.wait_for(lambda: self.written >= position, timeout)
+
+    async def wait_async(self, position: int, timeout: Optional[float] = None) -> bool:
+        """Await until at least position samples have been written, without holding a thread"""
+        loop = asyncio.get_running_loop()
+        with self.cond:
+            if self.written >= position:
+                return True
+            entry = (position, loop, loop.create_future())
+            self.async_waiters.append(entry)
+        try:
+            await asyncio.wait_for(entry[2], timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self.cond:
+                if entry in self.async_waiters:
+                    self.async_waiters.remove(entry)
+
+def _resolve_future(future):
+    if not future.done():
+        future.set_result(True)
+
+class AudioCapture:
+    """One long-lived input stream on the selected microphone feeding a RingBuffer.
+
+    With a speaker reference, Kevin's own voice is cancelled from each block
+    before it reaches the ring.
+    """
+
+    def __init__(self, device: Optional[int] = None, sample_rate: int = CAPTURE_RATE,
+                 seconds: float = CAPTURE_SECONDS, block: int = CAPTURE_BLOCK,
+                 reference: Optional[EchoReference] = None):
+        self.device = device
+        self.sample_rate = sample_rate
+        self.seconds = seconds
+        self.block = block
+        self.reference = reference
+        self.canceller = None
+        self.recorder = None
+        self.ring = None
+        self.stream = None
+        self.overflows = 0
+
+    def start(self):
+        """Open the input stream, falling back to the device's native rate"""
+        try:
+            self._open(self.sample_rate)
+        except sd.PortAudioError:
+            native = int(sd.query_devices(self.device, 'input')['default_samplerate'])
+            self._open(native)
+
+    def _open(self, sample_rate: int):
+        block = int(self.block * sample_rate / CAPTURE_RATE)
+        # Reopening at the same rate keeps the ring, so readers carry on seamlessly
+        if self.ring is not None and sample_rate == self.sample_rate:
+            ring = self.ring
+        else:
+            ring = RingBuffer(int(sample_rate * self.seconds))
+        stream = sd.InputStream(
+            device=self.device,
+            samplerate=sample_rate,
+            channels=1,
+            dtype='float32',
+            blocksize=block,
+            callback=self._callback
+        )
+        if self.reference is not None and (self.canceller is None or self.canceller.sample_rate != sample_rate):
+            # A reopen at the same rate keeps the converged echo path
+            self.canceller = EchoCanceller(self.reference, sample_rate, block)
+        self.ring = ring
+        self.sample_rate = sample_rate
+        self.stream = stream
+        stream.start()
+
+    def _callback(self, indata, frames, time_info, status):
+        if status.input_overflow:
+            self.overflows += 1
+        samples = indata[:, 0]
+        if self.canceller is not None:
+            latency = time_info.currentTime - time_info.inputBufferAdcTime
+            adc_time = time.monotonic() - (latency if latency > 0 else frames / self.sample_rate)
+            samples = self.canceller.process(samples, adc_time)
+        self.ring.write(samples)
+
+    def rebind(self, device: Optional[int]):
+        """Move the stream to another device index, keeping the ring buffer"""
+        self.stop()
+        self.device = device
+        try:
+            self.start()
+        except Exception as e:
+            console.print(f"[red]⚠️  Could not reopen microphone: {e}[/red]")
+
+    @property
+    def stalled(self) -> bool:
+        """True when no audio has arrived for a second (device unplugged or stream died)"""
+        return self.stream is None or time.monotonic() - self.ring.write_time > 1.0
+
+    def stop(self):
+        if self.stream is not None:
+            with contextlib.suppress(Exception):
+                self.stream.stop()
+                self.stream.close()
+            self.stream = None
+
+audio_capture = None
+
+# Echo cancellation and barge-in
+BARGE_IN_MODES = ("stop", "duck", "off")
+barge_in_mode = "stop"
+
+class EchoCanceller:
+    """Removes Kevin's own voice from the microphone and gates what is left.
+
+    A partitioned-block frequency-domain NLMS filter models the path from
+    the speaker reference to the microphone and subtracts its estimate.
+    While a response plays, a block counts as the user talking only when the
+    residual rises margin_db above what the loudest reference block in the
+    filter span predicts (a Geigel-style double-talk test); other blocks are
+    replaced by comfort noise at the room's level, so the VAD hears neither
+    the echo nor a suspicious silence. Adaptation is frozen while the user
+    talks over the response. With nothing played, blocks pass through untouched.
+    """
+
+    def __init__(self, reference: EchoReference, sample_rate: int, block: int, partitions: int = 8,
+                 step: float = 0.5, lead: float = 0.02, margin_db: float = 8.0, hangover_blocks: int = 10,
+                 seed: int = 0):
+        self.reference = reference
+        self.sample_rate = sample_rate
+        self.block = block
+        self.partitions = partitions
+        self.step = step
+        self.lead = lead  # reference is read this early so the causal filter covers timing error
+        self.margin_db = margin_db
+        self.hangover_blocks = hangover_blocks
+        self.span = partitions * block / sample_rate
+        bins = block + 1
+        self.weights = np.zeros((partitions, bins), dtype=np.complex128)
+        self.history = np.zeros((partitions, bins), dtype=np.complex128)
+        self.power = np.zeros(bins)
+        self.previous = np.zeros(block, dtype=np.float32)
+        self.ref_levels = np.zeros(partitions)
+        self.cursor = None  # reference position of the next block; None while nothing plays
+        self.source_rate = None
+        self.filled = 0  # reference blocks in the filter span since the last realignment
+        self.leak_db = 0.0  # residual level relative to the reference in echo-only blocks
+        self.noise_power = 1e-8
+        self.over = 0  # consecutive blocks above the double-talk margin
+        self.talk = 0  # double-talk hangover blocks left
+        self.gated = False  # the last block was replaced by comfort noise
+        self.rng = np.random.default_rng(seed)
+        self.echo_blocks = 0
+        self.talk_blocks = 0
+        self.mic_energy = 0.0
+        self.residual_energy = 0.0
+
+    def _reference_block(self, adc_time: float) -> np.ndarray:
+        reference = self.reference
+        factor = reference.rate / self.sample_rate
+        count = int(round(self.block * factor))
+        expected = reference.position_at(adc_time - self.lead)
+        if self.cursor is None or reference.rate != self.source_rate or \
+                abs(self.cursor - expected) > 0.01 * reference.rate:
+            # (Re)align with the speaker timeline and start a fresh reference history
+            self.cursor = expected
+            self.source_rate = reference.rate
+            self.history[:] = 0
+            self.previous[:] = 0
+            self.ref_levels[:] = 0
+            self.power[:] = 0
+            self.filled = 0
+        x = reference.read(self.cursor, count)
+        self.cursor += count
+        if count == self.block * int(factor) and factor == int(factor):
+            return x.reshape(self.block, int(factor)).mean(axis=1)
+        x = resample(x, reference.rate, self.sample_rate)
+        return np.pad(x, (0, max(0, self.block - len(x))))[:self.block]
+
+    def process(self, mic: np.ndarray, adc_time: float) -> np.ndarray:
+        """The microphone block with Kevin's voice removed; adc_time is when its first sample was captured"""
+        reference = self.reference
+        self.gated = False
+        if len(mic) != self.block or reference.ring is None or adc_time - self.lead > reference.audible_until + self.span:
+            # Nothing played within the filter span: learn the room's level and pass through
+            self.cursor = None
+            level = float(np.dot(mic, mic)) / max(1, len(mic))
+            self.noise_power += (0.3 if level < self.noise_power else 0.01) * (level - self.noise_power)
+            return mic
+        x = self._reference_block(adc_time)
+        self.history[1:] = self.history[:-1]
+        self.history[0] = np.fft.rfft(np.concatenate([self.previous, x]))
+        self.previous = x
+        self.ref_levels[1:] = self.ref_levels[:-1]
+        self.ref_levels[0] = float(np.dot(x, x)) / self.block
+        self.filled = min(self.filled + 1, self.partitions)
+        echo = np.fft.irfft(np.sum(self.weights * self.history, axis=0))[self.block:]
+        residual = (mic - echo).astype(np.float32)
+        ref_level = float(self.ref_levels.max())
+        if ref_level < 1e-7:
+            # A pause inside the response: no echo to remove or gate
+            return mic
+        residual_level = float(np.dot(residual, residual)) / self.block
+        mic_level = float(np.dot(mic, mic)) / self.block
+        # A filter still converging (or thrown off) can leave more than it removed
+        level = min(residual_level, mic_level)
+        excess_db = 10.0 * math.log10((level + 1e-12) / ref_level) - self.leak_db
+        self.over = self.over + 1 if excess_db > self.margin_db else 0
+        if self.over >= 2:
+            # Two blocks in a row, so a transient in a filter still tracking the voice does not count
+            self.talk = self.hangover_blocks
+        elif self.talk:
+            self.talk -= 1
+        if self.talk:
+            self.talk_blocks += 1
+            # Drift up slowly so an underestimated leak cannot hold adaptation off for good
+            self.leak_db += 0.01 * excess_db
+            return residual if residual_level < mic_level else mic
+
+        # Echo only: adapt, track how much echo is left, and gate
+        self.echo_blocks += 1
+        self.mic_energy += float(np.dot(mic, mic))
+        self.residual_energy += residual_level * self.block
+        self.gated = True
+        if self.filled == self.partitions:
+            # Until the span fills, the echo of the first reference blocks has not arrived yet.
+            # Rising fast and falling slowly keeps the leak near the top of the residual's range
+            self.leak_db += (0.3 if excess_db > 0 else 0.03) * excess_db
+        power = self.history[0].real ** 2 + self.history[0].imag ** 2
+        self.power = power if not self.power.any() else 0.9 * self.power + 0.1 * power
+        error = np.fft.rfft(np.concatenate([np.zeros(self.block), residual]))
+        # Bins the reference barely excites are regularized towards the average power
+        normalizer = self.partitions * self.power + 0.1 * float(self.power.mean()) + 1e-9
+        gradient = self.history.conj() * (error * (self.step / normalizer))
+        # Constrain each partition to a linear convolution of block taps
+        taps = np.fft.irfft(gradient, axis=1)
+        taps[:, self.block:] = 0
+        self.weights += np.fft.rfft(taps, axis=1)
+        return (self.rng.standard_normal(self.block) * math.sqrt(self.noise_power)).astype(np.float32)
+
+    def stats(self) -> dict:
+        return {
+            "echo_blocks": self.echo_blocks,
+            "double_talk_blocks": self.talk_blocks,
+            "erle_db": 10.0 * math.log10(self.mic_energy / self.residual_energy)
+            if self.residual_energy > 0 else 0.0,
+            "leak_db": self.leak_db,
+        }
+
+def echo_reference(player) -> Optional[EchoReference]:
+    """The echo reference of player, or None when barge-in is off or the player publishes none"""
+    return None if barge_in_mode == "off" else getattr(player, 'reference', None)
+
+def barge_in(room=None):
+    """The user started talking over a response: cut it off (or duck it) and open a command window"""
+    player = room.player if room is not None else audio_player
+    scheduler = room.speech if room is not None else speech_scheduler
+    gate = room.wake_gate if room is not None else wake_gate
+    if barge_in_mode == "duck" and hasattr(player, 'duck'):
+        player.duck()
+    else:
+        scheduler.interrupt()
+        player.stop()
+    if gate is not None:
+        gate.open_window()
+    metrics.count('barge_in', barge_in_mode)
+    (room.state if room is not None else state).status = "Listening (interrupted)"
+
+# Voice activity detection and endpointing
+VAD_FRAME_MS = 20
+CALIBRATION_BANDS = 16  # noise spectrum resolution of a saved calibration profile
+
+class VoiceActivityDetector:
+    """Per-frame speech decisions computed over whole blocks at once.
+
+    Frame energy, zero-crossing rate and spectral flatness are vectorized
+    across every frame in a block. The noise floor follows the energy of
+    non-speech frames with exponential smoothing (and creeps up slowly
+    during long speech) so the threshold adapts while capture runs.
+    """
+
+    def __init__(self, sample_rate: int, frame_ms: int = VAD_FRAME_MS, margin_db: float = 9.0,
+                 noise_alpha: float = 0.05, speech_alpha: float = 0.002,
+                 flatness_max: float = 0.45, zcr_min: float = 0.3, initial_floor_db: float = -60.0):
+        self.sample_rate = sample_rate
+        self.frame_len = int(sample_rate * frame_ms / 1000)
+        self.margin_db = margin_db
+        self.noise_alpha = noise_alpha
+        self.speech_alpha = speech_alpha
+        self.flatness_max = flatness_max
+        self.zcr_min = zcr_min
+        self.noise_floor_db = initial_floor_db
+        self.window = np.hanning(self.frame_len).astype(np.float32)
+
+    def features(self, frames: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Energy (dB), zero-crossing rate and spectral flatness for (frames, frame_len)"""
+        energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_len - 1)
+        spectrum = np.fft.rfft(frames * self.window, axis=1)
+        power = spectrum.real ** 2 + spectrum.imag ** 2 + 1e-12
+        flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+        return energy_db, zcr, flatness
+
+    def calibrate(self, samples: np.ndarray):
+        """Seed the noise floor from audio known to contain no speech"""
+        frames = self.frames(samples)
+        if len(frames):
+            energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+            self.noise_floor_db = float(np.median(energy_db))
+
+    def profile(self, samples: np.ndarray, previous: Optional[dict] = None) -> dict:
+        """Calibration profile from recent live audio: the adapted noise floor and threshold,
+        the spectrum of the quiet frames and the level of the speech frames"""
+        frames = self.frames(samples)
+        energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10) if len(frames) else np.zeros(0)
+        profile = {
+            "noise_floor_db": round(self.noise_floor_db, 2),
+            "margin_db": self.margin_db,
+            "threshold_db": round(self.noise_floor_db + self.margin_db, 2),
+            "noise_spectrum_db": (previous or {}).get("noise_spectrum_db"),
+            "speech_level_db": (previous or {}).get("speech_level_db"),
+            "sample_rate": self.sample_rate,
+            "updated": datetime.now().isoformat(timespec='seconds'),
+        }
+        quiet = frames[energy_db < self.noise_floor_db + self.margin_db / 2]
+        if len(quiet) >= 10:
+            spectrum = np.fft.rfft(quiet * self.window, axis=1)
+            power = np.mean(spectrum.real ** 2 + spectrum.imag ** 2, axis=0)
+            bands = [float(band.mean()) for band in np.array_split(power, CALIBRATION_BANDS)]
+            profile["noise_spectrum_db"] = [round(10.0 * math.log10(band + 1e-12), 1) for band in bands]
+        loud = energy_db[energy_db > self.noise_floor_db + self.margin_db]
+        if len(loud) >= 10:
+            profile["speech_level_db"] = round(float(np.percentile(loud, 90)), 2)
+        return profile
+
+    def apply_profile(self, profile: dict) -> bool:
+        """Start from a saved profile instead of calibrating; False if it was taken at another rate"""
+        if profile.get("sample_rate") != self.sample_rate:
+            return False
+        self.noise_floor_db = float(profile["noise_floor_db"])
+        self.margin_db = float(profile.get("margin_db", self.margin_db))
+        return True
+
+    def frames(self, samples: np.ndarray) -> np.ndarray:
+        whole = len(samples) // self.frame_len * self.frame_len
+        return samples[:whole].reshape(-1, self.frame_len)
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Speech decision for each whole frame in samples, updating the noise floor"""
+        frames = self.frames(samples)
+        if not len(frames):
+            return np.zeros(0, dtype=bool)
+        energy_db, zcr, flatness = self.features(frames)
+        above = energy_db - self.noise_floor_db
+        speech = (above > self.margin_db) & (
+            (flatness < self.flatness_max) | (zcr > self.zcr_min) | (above > 2 * self.margin_db))
+
+        # Exponential smoothing over the block in closed form:
+        # floor_n = prod(1 - a) * floor_0 + sum(a_i * x_i * prod_{j>i}(1 - a_j))
+        alpha = np.where(speech, self.speech_alpha, self.noise_alpha)
+        keep = 1.0 - alpha
+        tail = np.append(np.cumprod(keep[::-1])[::-1][1:], 1.0)
+        self.noise_floor_db = float(np.prod(keep) * self.noise_floor_db + np.sum(alpha * energy_db * tail))
+        return speech
+
+    def detect(self, pcm: np.ndarray, block_frames: int = 5) -> np.ndarray:
+        """Decisions for a whole clip, processed block by block as capture would"""
+        block = block_frames * self.frame_len
+        return np.concatenate([self.process(pcm[i:i + block]) for i in range(0, len(pcm), block)] or
+                              [np.zeros(0, dtype=bool)])
+
+class Endpointer:
+    """Turns frame decisions into utterance boundaries (absolute sample positions).
+
+    A phrase starts after min_speech_ms of speech and ends once
+    trailing_silence_ms of non-speech follows it, or at max_phrase_s.
+    """
+
+    def __init__(self, frame_len: int, sample_rate: int, trailing_silence_ms: int = 200,
+                 min_speech_ms: int = 60, pre_roll_ms: int = 200, max_phrase_s: float = 6.0):
+        frame_ms = frame_len * 1000.0 / sample_rate
+        self.frame_len = frame_len
+        self.end_frames = max(1, int(round(trailing_silence_ms / frame_ms)))
+        self.start_frames = max(1, int(round(min_speech_ms / frame_ms)))
+        self.pre_roll = int(sample_rate * pre_roll_ms / 1000)
+        self.max_samples = int(sample_rate * max_phrase_s)
+        self.reset()
+
+    def reset(self):
+        self.in_speech = False
+        self.speech_run = 0
+        self.silence_run = 0
+        self.onset = None
+        self.last_speech_end = None
+
+    def feed(self, decisions: np.ndarray, position: int) -> List[Tuple[int, int]]:
+        """Consume decisions for frames starting at position; return finished utterances"""
+        finished = []
+        for i, is_speech in enumerate(decisions):
+            frame_start = position + i * self.frame_len
+            frame_end = frame_start + self.frame_len
+            if not self.in_speech:
+                if is_speech:
+                    self.speech_run += 1
+                    if self.speech_run == 1:
+                        self.onset = frame_start
+                    if self.speech_run >= self.start_frames:
+                        self.in_speech = True
+                        self.silence_run = 0
+                        self.last_speech_end = frame_end
+                else:
+                    self.speech_run = 0
+                continue
+            if is_speech:
+                self.silence_run = 0
+                self.last_speech_end = frame_end
+            else:
+                self.silence_run += 1
+            if self.silence_run >= self.end_frames or frame_end - self.onset >= self.max_samples:
+                finished.append((max(0, self.onset - self.pre_roll), frame_end))
+                self.reset()
+        return finished
+
+class PhraseListener:
+    """Runs VAD over the capture ring and hands out endpointed utterances"""
+
+    def __init__(self, capture: 'AudioCapture', vad: Optional[VoiceActivityDetector] = None,
+                 block_frames: int = 5, on_barge_in=None, **endpoint_options):
+        self.capture = capture
+        self.on_barge_in = on_barge_in  # called when speech starts while Kevin is talking
+        self.vad = vad or VoiceActivityDetector(capture.sample_rate)
+        self.endpoint_options = endpoint_options
+        self.block_frames = block_frames
+        self.endpointer = Endpointer(self.vad.frame_len, capture.sample_rate, **endpoint_options)
+        self.block = block_frames * self.vad.frame_len
+        self.ring = capture.ring
+        self.position = capture.ring.written
+        self.ready = deque()
+        self.last_decisions = np.zeros(0, dtype=bool)
+        self.processed_at = time.monotonic()  # when audio up to position was processed
+
+    def calibrate(self, seconds: float = 0.5, timeout: float = 2.0):
+        """Seed the noise floor from the next seconds of audio"""
+        ring = self.capture.ring
+        needed = int(self.capture.sample_rate * seconds)
+        if not ring.wait_for(self.position + needed, timeout):
+            raise TimeoutError("no audio from microphone")
+        self.vad.calibrate(ring.view(self.position, self.position + needed))
+        self.position += needed
+
+    def use_profile(self, profile: Optional[dict]) -> bool:
+        """Take the noise floor from a saved calibration profile instead of measuring it"""
+        return profile is not None and self.vad.apply_profile(profile)
+
+    def listen(self, timeout: Optional[float] = None, on_partial=None) -> Optional[Tuple[int, int]]:
+        """Block until an utterance ends; returns its (start, end) or None on timeout.
+
+        While a phrase is in progress, on_partial(start, end) is called after
+        every block with the audio heard so far.
+        """
+        ring = self.capture.ring
+        if ring is not self.ring:
+            self._follow(ring)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.ready:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not ring.wait_for(self.position + self.block, remaining):
+                return None
+            self._process(ring, on_partial)
+        return self.ready.popleft()
+
+    async def listen_async(self, timeout: Optional[float] = None, on_partial=None) -> Optional[Tuple[int, int]]:
+        """listen() for the asyncio runtime: awaits the capture ring instead of blocking"""
+        ring = self.capture.ring
+        if ring is not self.ring:
+            self._follow(ring)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.ready:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not await ring.wait_async(self.position + self.block, remaining):
+                return None
+            self._process(ring, on_partial)
+        return self.ready.popleft()
+
+    def _process(self, ring: RingBuffer, on_partial):
+        # Run VAD and the endpointer over every whole frame available
+        if self.position < ring.oldest:
+            # Fell a whole buffer behind; drop the partial phrase and resync
+            self.position = ring.oldest - ring.oldest % self.vad.frame_len
+            self.endpointer.reset()
+        available = ring.written - self.position
+        count = available - available % self.vad.frame_len
+        decisions = self.vad.process(ring.view(self.position, self.position + count))
+        self.last_decisions = decisions
+        was_in_speech = self.endpointer.in_speech
+        finished = self.endpointer.feed(decisions, self.position)
+        self.ready.extend(finished)
+        self.position += count
+        self.processed_at = time.monotonic()
+        if self.on_barge_in is not None and not was_in_speech and (self.endpointer.in_speech or finished):
+            reference = getattr(self.capture, 'reference', None)
+            if reference is not None and reference.playing:
+                self.on_barge_in()
+        if on_partial is not None and self.endpointer.in_speech:
+            on_partial(max(0, self.endpointer.onset - self.endpointer.pre_roll), self.position)
+
+    def _follow(self, ring: RingBuffer):
+        # Capture reopened at a different rate with a new ring; keep the noise floor
+        if self.vad.sample_rate != self.capture.sample_rate:
+            floor = self.vad.noise_floor_db
+            self.vad = VoiceActivityDetector(self.capture.sample_rate)
+            self.vad.noise_floor_db = floor
+            self.endpointer = Endpointer(self.vad.frame_len, self.capture.sample_rate, **self.endpoint_options)
+            self.block = self.block_frames * self.vad.frame_len
+        self.endpointer.reset()
+        self.ring = ring
+        self.position = ring.written
+
+    def since_speech_start(self, start: int) -> float:
+        """Seconds from the onset of an utterance starting at start until now: the audio
+        heard since then plus the time spent after that audio was processed"""
+        heard = (self.position - start - self.endpointer.pre_roll) / self.capture.sample_rate
+        return heard + time.monotonic() - self.processed_at
+
+    def speech_end_time(self, end: int) -> float:
+        """Monotonic time the speaker stopped, for an utterance ending at end"""
+        speech_end = end - self.endpointer.end_frames * self.vad.frame_len
+        return self.capture.ring.time_of(speech_end, self.capture.sample_rate)
+
+    def audio(self, start: int, end: int) -> np.ndarray:
+        """Zero-copy view of an utterance from the ring"""
+        ring = self.capture.ring
+        return ring.view(max(start, ring.oldest), end)
+
+# Persisted microphone calibration
+class CalibrationRefiner:
+    """Keeps a microphone's saved calibration profile current from live audio.
+
+    Runs off the audio path: each refine() profiles the last few seconds the
+    listener has processed and saves the profile when the noise floor, noise
+    spectrum or speech level has moved noticeably. The profile belongs to the
+    room's microphone, or to the selected one outside multi-room mode.
+    """
+
+    def __init__(self, listener: PhraseListener, room=None, window_seconds: float = 3.0, interval: float = 30.0):
+        self.listener = listener
+        self.room = room
+        self.window_seconds = window_seconds
+        self.interval = interval
+        self.key = None
+        self.saved = None
+        self.updates = 0
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def refine(self) -> bool:
+        """Profile recent audio and save it if it has moved; returns True if saved"""
+        key = (self.room.state if self.room is not None else state).mic_key
+        if key != self.key or self.saved is None:
+            self.key = key
+            self.saved = state.calibration_for(key)
+        ring = self.listener.capture.ring
+        end = self.listener.position
+        start = max(ring.oldest, end - int(self.window_seconds * self.listener.capture.sample_rate))
+        if end - start < 10 * self.listener.vad.frame_len:
+            return False
+        # Copied: the capture thread keeps writing behind this view
+        profile = self.listener.vad.profile(np.array(ring.view(start, end)), self.saved)
+        if self.saved is not None and not self._moved(self.saved, profile):
+            return False
+        state.store_calibration(key, profile)
+        self.saved = profile
+        self.updates += 1
+        return True
+
+    @staticmethod
+    def _moved(old: dict, new: dict) -> bool:
+        if abs(old['noise_floor_db'] - new['noise_floor_db']) >= 1.0:
+            return True
+        old_level, new_level = old.get('speech_level_db'), new.get('speech_level_db')
+        if (old_level is None) != (new_level is None) or \
+                (new_level is not None and abs(old_level - new_level) >= 2.0):
+            return True
+        old_spectrum, new_spectrum = old.get('noise_spectrum_db'), new.get('noise_spectrum_db')
+        if (old_spectrum is None) != (new_spectrum is None):
+            return True
+        return bool(new_spectrum) and len(old_spectrum) == len(new_spectrum) and \
+            float(np.mean(np.abs(np.subtract(old_spectrum, new_spectrum)))) >= 3.0
+
+    def start(self):
+        """Refine every interval on a background thread (thread runtime)"""
+        if self.thread is not None:
+            return
+
+        def run():
+            while not self.stop_event.wait(self.interval):
+                try:
+                    self.refine()
+                except Exception as e:
+                    console.print(f"[yellow]⚠️  Calibration refresh failed: {e}[/yellow]")
+
+        self.thread = threading.Thread(target=run, name="kevin-calibration", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+calibration_refiner = None
+
+def benchmark_vad(seconds: float = 60.0, sample_rate: int = CAPTURE_RATE, seed: int = 0) -> dict:
+    """Run VAD and endpointing over synthetic audio and report CPU cost"""
+    rng = np.random.default_rng(seed)
+    pcm = (0.003 * rng.standard_normal(int(seconds * sample_rate))).astype(np.float32)
+    t = np.arange(int(0.6 * sample_rate)) / sample_rate
+    burst = (0.2 * np.sin(2 * np.pi * 180 * t) * np.sin(np.pi * t / t[-1])).astype(np.float32)
+    for offset in range(sample_rate, len(pcm) - len(burst), 2 * sample_rate):
+        pcm[offset:offset + len(burst)] += burst
+
+    vad = VoiceActivityDetector(sample_rate)
+    vad.calibrate(pcm[:sample_rate // 2])
+    endpointer = Endpointer(vad.frame_len, sample_rate)
+    block = 5 * vad.frame_len
+    utterances = 0
+    start = time.process_time()
+    for position in range(0, len(pcm) - block + 1, block):
+        utterances += len(endpointer.feed(vad.process(pcm[position:position + block]), position))
+    cpu = time.process_time() - start
+    return {
+        "audio_seconds": seconds,
+        "utterances": utterances,
+        "expected_utterances": len(range(sample_rate, len(pcm) - len(burst), 2 * sample_rate)),
+        "cpu_seconds": cpu,
+        "cpu_ms_per_audio_second": cpu / seconds * 1000,
+    }
+
+def benchmark_echo(seconds: float = 12.0, seed: int = 0) -> dict:
+    """Play a synthetic response into a simulated room and interrupt it two thirds of the way in.
+
+    The response is a harmonic voice with a syllable rhythm played at 48 kHz.
+    The microphone hears it through a delayed, decaying echo path plus room
+    noise, and the user then talks at the same level as the echo. Barge-in
+    stops the response as the live player would. Reports the echo return loss
+    enhancement once converged, barge-ins triggered by Kevin's own voice with
+    and without cancellation, how soon the user's barge-in fires, how much of
+    their speech gets through and the canceller's cost per block.
+    """
+    rng = np.random.default_rng(seed)
+    out_rate, rate, block = 48000, CAPTURE_RATE, CAPTURE_BLOCK
+
+    def voice(count, sample_rate, f0):
+        t = np.arange(count) / sample_rate
+        phase = 2 * np.pi * np.cumsum(f0 * (1 + 0.08 * np.sin(2 * np.pi * 0.7 * t))) / sample_rate
+        harmonics = sum(np.sin(k * phase) / k for k in range(1, 12))
+        syllables = np.sqrt(np.clip(np.sin(2 * np.pi * 3.5 * t + rng.uniform(0, np.pi)), 0, None))
+        pcm = harmonics * syllables + 0.05 * rng.standard_normal(count)
+        return (0.5 * pcm / np.max(np.abs(pcm))).astype(np.float32)
+
+    lead_in = rate  # one second of room noise before Kevin starts talking
+    total = lead_in + int(seconds * rate)
+    response = voice(int(seconds * out_rate), out_rate, 140.0)
+    delay = int(0.03 * rate)
+    tail = np.arange(int(0.08 * rate))
+    path = np.zeros(delay + len(tail))
+    path[delay] = 0.4
+    path[delay + 1:] = 0.05 * rng.standard_normal(len(tail) - 1) * np.exp(-tail[1:] / (0.015 * rate))
+    heard = response.reshape(-1, out_rate // rate).mean(axis=1)
+    user_start = lead_in + int(seconds * rate * 2 / 3) // block * block
+    user = voice(total - user_start, rate, 220.0)
+    user *= np.sqrt(np.mean(np.convolve(heard, path)[:len(heard)] ** 2) / np.mean(user ** 2))
+    noise = (0.002 * rng.standard_normal(total)).astype(np.float32)
+    converged_at = lead_in + min(3 * rate, (user_start - lead_in) // 2) // block * block
+
+    def run(cancel: bool):
+        clock = [0.0]
+        reference = EchoReference(seconds=seconds + 1, clock=lambda: clock[0])
+        reference.reset(out_rate)
+        published = 0
+        stopped = None
+        echo = np.convolve(heard, path)[:total - lead_in]
+        capture = ReplayCapture(rate, seconds + 2)
+        capture.reference = reference
+        canceller = EchoCanceller(reference, rate, block)
+        barge_ins = []
+
+        def interrupt():
+            nonlocal stopped, echo
+            barge_ins.append(listener.position)
+            if stopped is None:
+                # The player cuts the response: nothing more is published or heard but the echo tail
+                stopped = published
+                echo = np.convolve(heard[:stopped * rate // out_rate], path)
+                echo = np.pad(echo, (0, max(0, total - lead_in - len(echo))))[:total - lead_in]
+
+        listener = PhraseListener(capture, on_barge_in=interrupt)
+        energies = {}
+        passed = 0
+        cost = 0.0
+        for index, position in enumerate(range(0, total - block + 1, block)):
+            clock[0] = position / rate
+            # The output stream runs 50 ms ahead of the DAC
+            while stopped is None and published < len(response) and \
+                    1.0 + published / out_rate < clock[0] + 0.05:
+                reference.publish(response[published:published + 256], 1.0 + published / out_rate)
+                published += 256
+            samples = noise[position:position + block].copy()
+            if position >= lead_in:
+                samples += echo[position - lead_in:position - lead_in + block]
+            if position >= user_start:
+                samples += user[position - user_start:position - user_start + block]
+            if cancel:
+                started = time.perf_counter()
+                out = canceller.process(samples, clock[0])
+                cost += time.perf_counter() - started
+                passed += position >= user_start and not canceller.gated
+                samples = out
+            capture.ring.write(samples)
+            if position == lead_in // 2:
+                listener.calibrate(0.5, timeout=0)
+            elif position > lead_in // 2:
+                listener._process(capture.ring, None)
+            if position in (converged_at, user_start):
+                energies[position] = (canceller.mic_energy, canceller.residual_energy)
+        return barge_ins, canceller, energies, passed, cost / (index + 1)
+
+    raw_barge_ins = run(False)[0]
+    barge_ins, canceller, energies, passed, cost = run(True)
+    # Echo-only blocks from three seconds in (the filter has converged) until the user talks
+    (mic_from, residual_from), (mic_to, residual_to) = energies[converged_at], energies[user_start]
+    erle = 10.0 * math.log10((mic_to - mic_from) / (residual_to - residual_from)) \
+        if residual_to > residual_from else None  # None: a false barge-in cut the response short
+    detected = [p for p in barge_ins if p >= user_start]
+    return {
+        "response_seconds": seconds,
+        "erle_db": erle,
+        "false_barge_ins_without_cancellation": sum(1 for p in raw_barge_ins if p < user_start),
+        "false_barge_ins": sum(1 for p in barge_ins if p < user_start),
+        "barge_in_after_ms": (detected[0] - user_start) / rate * 1000 if detected else None,
+        "user_blocks_passed": passed / ((total - user_start) // block),
+        "response_seconds_saved": (lead_in + seconds * rate - detected[0]) / rate if detected else 0.0,
+        "canceller_us_per_block": cost * 1e6,
+        "block_ms": block / rate * 1000,
+    }
+
+# Flight recorder
+FLIGHT_DIR = "kevin_flight"
+FLIGHT_MAGIC = b"KEVFLT01"
+FLIGHT_STAMPS = 4096
+_flight_layout = None
+
+def flight_layout() -> tuple:
+    """(header dtype, stamp dtype, PCM offset) of the ring file, built on first use so numpy loads lazily"""
+    global _flight_layout
+    if _flight_layout is None:
+        header = np.dtype([('magic', 'S8'), ('sample_rate', '<u4'), ('stamp_count', '<u4'),
+                           ('capacity', '<u8'), ('written', '<u8'), ('stamps_written', '<u8')])
+        stamp = np.dtype([('position', '<u8'), ('time', '<f8')])  # file position, Unix time of that sample
+        _flight_layout = (header, stamp, 64 + FLIGHT_STAMPS * stamp.itemsize)
+    return _flight_layout
+
+class FlightRecorder:
+    """Always-on recording of the capture stream into a fixed-size memory-mapped ring file.
+
+    Each flush copies what the capture ring gained since the last one into
+    capture.ring as 16-bit PCM and stamps the file position with the wall
+    time, so the capture callback does no extra work. Utterances marked by
+    the recognizer are cut into WAV clips once their audio is on disk and
+    appended, with the recognized text, intent and stage timings, to
+    index.jsonl, which the replay harness reads as its labels. The oldest
+    clips are pruned beyond max_clips.
+    """
+
+    def __init__(self, directory: str = FLIGHT_DIR, seconds: float = 300.0, interval: float = 0.5,
+                 max_clips: int = 500, room: Optional[str] = None):
+        self.directory = directory
+        self.seconds = seconds
+        self.interval = interval
+        self.max_clips = max_clips
+        self.room = room
+        self.capture = None
+        self.ring = None  # capture ring being followed
+        self.position = 0  # next ring position to copy
+        self.offset = 0  # file position minus ring position
+        self.sample_rate = None
+        self.mm = None
+        self.pending = deque()  # marked utterances waiting for their audio to reach the file
+        self.scratch = np.zeros(CAPTURE_RATE, dtype=np.float32)
+        self.seq = 0
+        self.indexed = 0
+        self.clips = 0
+        self.flushes = 0
+        self.flush_seconds = 0.0
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stop_event = threading.Event()
+        os.makedirs(os.path.join(directory, "clips"), exist_ok=True)
+        with contextlib.suppress(OSError):
+            with open(os.path.join(directory, "index.jsonl"), 'r') as f:
+                self.indexed = sum(1 for _ in f)
+
+    def attach(self, capture):
+        """Record capture from now on (it may replace an earlier capture)"""
+        self.capture = capture
+        capture.recorder = self
+
+    def _open(self, sample_rate: int):
+        """Map the ring file, reusing an existing one taken at the same rate and length"""
+        header_dtype, stamp_dtype, data_offset = flight_layout()
+        capacity = int(sample_rate * self.seconds)
+        size = data_offset + 2 * capacity
+        path = os.path.join(self.directory, "capture.ring")
+        reuse = False
+        with contextlib.suppress(OSError, ValueError):
+            with open(path, 'rb') as f:
+                header = np.frombuffer(f.read(header_dtype.itemsize), header_dtype)[0]
+            reuse = os.path.getsize(path) == size and header['magic'] == FLIGHT_MAGIC and \
+                header['sample_rate'] == sample_rate
+        if self.mm is not None:
+            self.mm.close()
+        with open(path, 'r+b' if reuse else 'w+b') as f:
+            if not reuse:
+                f.truncate(size)
+            self.mm = mmap.mmap(f.fileno(), size)
+        self.header = np.ndarray((), header_dtype, buffer=self.mm)
+        self.stamps = np.ndarray((FLIGHT_STAMPS,), stamp_dtype, buffer=self.mm, offset=64)
+        self.pcm = np.ndarray((capacity,), '<i2', buffer=self.mm, offset=data_offset)
+        if not reuse:
+            self.header['magic'] = FLIGHT_MAGIC
+            self.header['sample_rate'] = sample_rate
+            self.header['stamp_count'] = FLIGHT_STAMPS
+            self.header['capacity'] = capacity
+        self.sample_rate = sample_rate
+
+    def mark(self, start: int, end: int, text: Optional[str], intent: Optional[str], timings: dict):
+        """Queue the utterance [start, end) of the capture ring for a clip and an index entry"""
+        self.pending.append((self.capture.ring, start, end, text, intent, timings, datetime.now()))
+
+    def flush(self):
+        """Copy new capture audio into the ring file, then cut the clips whose audio is now on disk"""
+        with self.lock:
+            started = time.process_time()
+            capture = self.capture
+            if capture is None or capture.ring is None:
+                return
+            ring = capture.ring
+            if ring is not self.ring:
+                if capture.sample_rate != self.sample_rate:
+                    self._open(capture.sample_rate)
+                self.ring = ring
+                self.position = ring.oldest  # whatever the ring still holds is recorded too
+            end = ring.written
+            start = max(self.position, ring.oldest)
+            written = int(self.header['written'])
+            capacity = len(self.pcm)
+            self.offset = written - start
+            while start < end:
+                n = min(end - start, len(self.scratch))
+                scratch = self.scratch[:n]
+                np.multiply(ring.view(start, start + n), 32767.0, out=scratch)
+                np.clip(scratch, -32768.0, 32767.0, out=scratch)
+                at = written % capacity
+                first = min(n, capacity - at)
+                self.pcm[at:at + first] = scratch[:first]
+                if n > first:
+                    self.pcm[:n - first] = scratch[first:]
+                written += n
+                start += n
+            if end > self.position:
+                stamp = self.stamps[int(self.header['stamps_written']) % FLIGHT_STAMPS]
+                stamp['position'] = written
+                stamp['time'] = time.time() - (time.monotonic() - ring.time_of(end, self.sample_rate))
+                self.header['stamps_written'] += 1
+                self.header['written'] = written
+            self.position = end
+            self.flushes += 1
+            self.flush_seconds += time.process_time() - started
+            while self.pending and (self.pending[0][0] is not ring or self.pending[0][2] <= end):
+                self._cut(*self.pending.popleft())
+
+    def _cut(self, ring, start, end, text, intent, timings, when):
+        written = int(self.header['written'])
+        capacity = len(self.pcm)
+        first, last = start + self.offset, end + self.offset
+        if ring is not self.ring or first < max(0, written - capacity) or last > written:
+            return  # overwritten or from a capture that has since been replaced
+        positions = np.arange(first, last) % capacity
+        self.seq += 1
+        name = f"{when:%Y%m%d-%H%M%S}-{self.seq:04d}.wav"
+        sf.write(os.path.join(self.directory, "clips", name), self.pcm[positions], self.sample_rate,
+                 subtype='PCM_16')
+        entry = {
+            "clip": f"clips/{name}",
+            "time": when.isoformat(timespec='milliseconds'),
+            "position": first,
+            "seconds": round((last - first) / self.sample_rate, 3),
+            "text": text,
+            "intent": intent,
+            "timings_ms": {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()},
+        }
+        if self.room is not None:
+            entry["room"] = self.room
+        with open(os.path.join(self.directory, "index.jsonl"), 'a') as f:
+            f.write(json.dumps(entry) + "\n")
+        self.clips += 1
+        self.indexed += 1
+        if self.indexed > self.max_clips * 1.2:
+            self._prune()
+
+    def _prune(self):
+        """Drop the oldest clips beyond max_clips and rewrite the index"""
+        path = os.path.join(self.directory, "index.jsonl")
+        with open(path, 'r') as f:
+            lines = f.readlines()
+        for line in lines[:-self.max_clips]:
+            with contextlib.suppress(OSError, ValueError):
+                os.remove(os.path.join(self.directory, json.loads(line)["clip"]))
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.writelines(lines[-self.max_clips:])
+        os.replace(tmp_path, path)
+        self.indexed = min(len(lines), self.max_clips)
+
+    def start(self):
+        """Flush every interval on a background thread (thread runtime)"""
+        if self.thread is not None:
+            return
+
+        def run():
+            while not self.stop_event.wait(self.interval):
+                try:
+                    self.flush()
+                except Exception as e:
+                    console.print(f"[yellow]⚠️  Flight recorder flush failed: {e}[/yellow]")
+
+        self.thread = threading.Thread(target=run, name="kevin-recorder", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        with contextlib.suppress(Exception):
+            self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "clips": self.clips,
+            "flushes": self.flushes,
+            "ms_per_flush": self.flush_seconds / self.flushes * 1000 if self.flushes else 0.0,
+        }
+
+flight_recorder = None
+
+def record_utterance(listener: PhraseListener, utterance: Tuple[int, int], text: Optional[str],
+                     intent: Optional[str], timings: dict):
+    """Hand an utterance and what became of it to the capture's flight recorder, if there is one"""
+    recorder = getattr(listener.capture, 'recorder', None)
+    if recorder is not None:
+        recorder.mark(utterance[0], utterance[1], text, intent, timings)
+
+def benchmark_recorder(seconds: float = 60.0, utterance_every: float = 2.0) -> dict:
+    """Record synthetic capture through the flight recorder in a scratch directory and report its cost.
+
+    Audio arrives in capture-sized blocks and is flushed at the recorder's
+    interval, with one marked utterance every utterance_every seconds. Checks
+    that the ring file holds the capture to 16-bit precision and that the
+    replay harness reads the clip index back.
+    """
+    import tracemalloc
+    rate = CAPTURE_RATE
+    directory = tempfile.mkdtemp(prefix="kevin_bench_")
+    try:
+        capture = ReplayCapture(rate)
+        recorder = FlightRecorder(directory, seconds=min(seconds, 60.0))
+        recorder.attach(capture)
+        rng = np.random.default_rng(0)
+        audio = (0.1 * rng.standard_normal(int(seconds * rate))).astype(np.float32)
+        flush_every = int(recorder.interval * rate) // CAPTURE_BLOCK * CAPTURE_BLOCK
+        mark_every = int(utterance_every * rate) // flush_every * flush_every
+        flush_cpu = 0.0
+        clip_cpu = 0.0
+        traced = 0
+        for position in range(CAPTURE_BLOCK, len(audio) + 1, CAPTURE_BLOCK):
+            capture.ring.write(audio[position - CAPTURE_BLOCK:position])
+            if position % flush_every:
+                continue
+            marked = position % mark_every == 0
+            if marked:
+                recorder.mark(position - rate // 2, position, f"phrase {position // mark_every}", None,
+                              {"asr": 0.001})
+            # Allocations are traced on one plain flush once the recorder is warm
+            trace = not marked and not traced and position > 2 * flush_every
+            if trace:
+                tracemalloc.start()
+            started = time.process_time()
+            recorder.flush()
+            elapsed = time.process_time() - started
+            if trace:
+                traced = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            elif marked:
+                clip_cpu += elapsed
+            else:
+                flush_cpu += elapsed
+        written = int(recorder.header['written'])
+        tail = recorder.pcm[(np.arange(written - rate, written)) % len(recorder.pcm)] / 32767.0
+        clips = load_labeled_clips(directory)
+        return {
+            "audio_seconds": seconds,
+            "cpu_percent_flush": flush_cpu / seconds * 100,
+            "cpu_percent_with_clips": (flush_cpu + clip_cpu) / seconds * 100,
+            "ms_per_flush": recorder.stats()["ms_per_flush"],
+            "flush_peak_alloc_bytes": traced,
+            "max_sample_error": float(np.max(np.abs(tail - audio[-rate:]))),
+            "clips": recorder.clips,
+            "replay_clips": sum(1 for path, text in clips if os.path.exists(path) and text.startswith("phrase ")),
+            "ring_file_mb": os.path.getsize(os.path.join(directory, "capture.ring")) / 1e6,
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+# Speech recognizer backends
+TEMPLATE_DIR = "kevin_templates"
+WAKE_TEMPLATE_DIR = "kevin_wake"
+
+def read_wav_mono(path: str) -> Tuple[np.ndarray, int]:
+    """Read an audio file as mono float32"""
+    data, sample_rate = sf.read(path, dtype='float32', always_2d=True)
+    return data.mean(axis=1), sample_rate
+
+def resample(pcm: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """Linear-interpolation resampling of mono float32 audio"""
+    if source_rate == target_rate or not len(pcm):
+        return pcm.astype(np.float32, copy=False)
+    count = int(round(len(pcm) * target_rate / source_rate))
+    positions = np.arange(count) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(len(pcm)), pcm).astype(np.float32)
+
+class RecognizerBackend:
+    """Turns one endpointed mono float32 utterance into lowercase text.
+
+    Backends raise sr.UnknownValueError when nothing was understood and
+    sr.RequestError when a remote service could not be reached.
+    """
+    name = "base"
+    streaming = False
+
+    def recognize(self, pcm: np.ndarray, sample_rate: int) -> str:
+        raise NotImplementedError
+
+    def partial(self, pcm: np.ndarray, sample_rate: int) -> Optional[str]:
+        """Hypothesis for an utterance still in progress, or None if not confident yet"""
+        return None
+
+class GoogleRecognizer(RecognizerBackend):
+    """Cloud recognition through speech_recognition's Google Web Speech API"""
+    name = "google"
+
+    def __init__(self, recognizer: Optional[sr.Recognizer] = None):
+        self.recognizer = recognizer or sr.Recognizer()
+
+    def recognize(self, pcm: np.ndarray, sample_rate: int) -> str:
+        pcm16 = (np.clip(pcm, -1.0, 1.0) * 32767).astype('<i2')
+        audio = sr.AudioData(pcm16.tobytes(), sample_rate, 2)
+        return self.recognizer.recognize_google(audio).lower()
+
+class LogMelFeatures:
+    """Vectorized log-mel / MFCC front end for one sample rate"""
+
+    def __init__(self, sample_rate: int, n_mels: int = 40, n_mfcc: int = 13,
+                 frame_ms: float = 25.0, hop_ms: float = 10.0, max_freq: float = 7600.0):
+        self.sample_rate = sample_rate
+        self.frame_len = int(sample_rate * frame_ms / 1000)
+        self.hop = int(sample_rate * hop_ms / 1000)
+        self.n_fft = 1 << (self.frame_len - 1).bit_length()
+        self.window = np.hamming(self.frame_len).astype(np.float32)
+
+        # Triangular mel filters, capped so every sample rate yields comparable features
+        def hz_to_mel(f):
+            return 2595.0 * np.log10(1.0 + f / 700.0)
+
+        def mel_to_hz(m):
+            return 700.0 * (10.0 ** (m / 2595.0) - 1.0)
+
+        top = min(max_freq, sample_rate / 2)
+        edges = mel_to_hz(np.linspace(hz_to_mel(60.0), hz_to_mel(top), n_mels + 2))
+        bins = np.fft.rfftfreq(self.n_fft, 1.0 / sample_rate)
+        lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+        rising = (bins - lower) / (center - lower)
+        falling = (upper - bins) / (upper - center)
+        self.mel_filters = np.maximum(0.0, np.minimum(rising, falling)).astype(np.float32)
+
+        # DCT-II basis for cepstra
+        k = np.arange(n_mfcc)[:, None]
+        n = np.arange(n_mels)[None, :]
+        self.dct = (np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * np.sqrt(2.0 / n_mels)).astype(np.float32)
+
+    def frames(self, pcm: np.ndarray) -> np.ndarray:
+        """Windowed frames as a (frames, frame_len) array"""
+        if len(pcm) < self.frame_len:
+            pcm = np.pad(pcm, (0, self.frame_len - len(pcm)))
+        view = np.lib.stride_tricks.sliding_window_view(pcm, self.frame_len)[::self.hop]
+        return view * self.window
+
+    def log_mel(self, pcm: np.ndarray) -> np.ndarray:
+        spectrum = np.fft.rfft(self.frames(pcm), n=self.n_fft)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2).astype(np.float32)
+        return np.log(power @ self.mel_filters.T + 1e-8)
+
+    def mfcc(self, pcm: np.ndarray, trim_db: float = 35.0) -> np.ndarray:
+        """Mean-normalized MFCCs with leading/trailing quiet frames trimmed"""
+        log_mel = self.log_mel(pcm)
+        energy = log_mel.max(axis=1)
+        loud = np.flatnonzero(energy > energy.max() - trim_db / 4.343)
+        if len(loud):
+            log_mel = log_mel[loud[0]:loud[-1] + 1]
+        cepstra = log_mel @ self.dct.T
+        return cepstra - cepstra.mean(axis=0)
+
+class KeywordSpotter(RecognizerBackend):
+    """Offline recognizer for a fixed phrase vocabulary.
+
+    Each phrase is enrolled from one or more recorded WAV templates. An
+    utterance is scored against every template at once with a slope-
+    constrained DTW over MFCCs, and the best phrase is returned if its
+    distance is under the threshold.
+    """
+    name = "kws"
+    streaming = True
+
+    def __init__(self, threshold: float = 8.0, margin: float = 0.0, partial_margin: float = 1.0):
+        self.threshold = threshold
+        self.margin = margin
+        self.partial_margin = partial_margin
+        self.front_ends = {}
+        self.templates = []  # (phrase, mfcc)
+        self._stack = None
+
+    def features(self, pcm: np.ndarray, sample_rate: int) -> np.ndarray:
+        front_end = self.front_ends.get(sample_rate)
+        if front_end is None:
+            front_end = self.front_ends[sample_rate] = LogMelFeatures(sample_rate)
+        return front_end.mfcc(np.asarray(pcm, dtype=np.float32))
+
+    def add_template(self, phrase: str, pcm: np.ndarray, sample_rate: int):
+        self.templates.append((phrase.lower(), self.features(pcm, sample_rate)))
+        self._stack = None
+
+    def load_templates(self, directory: str = TEMPLATE_DIR) -> int:
+        """Enroll <directory>/<phrase>/*.wav; returns the number of templates loaded"""
+        count = 0
+        if not os.path.isdir(directory):
+            return count
+        for phrase in sorted(os.listdir(directory)):
+            phrase_dir = os.path.join(directory, phrase)
+            if not os.path.isdir(phrase_dir):
+                continue
+            for name in sorted(os.listdir(phrase_dir)):
+                if name.lower().endswith(".wav"):
+                    pcm, sample_rate = read_wav_mono(os.path.join(phrase_dir, name))
+                    self.add_template(phrase.replace('_', ' '), pcm, sample_rate)
+                    count += 1
+        return count
+
+    def _build_stack(self):
+        # Pad all templates into one (templates, frames, coeffs) block
+        longest = max(len(t) for _, t in self.templates)
+        width = self.templates[0][1].shape[1]
+        stack = np.zeros((len(self.templates), longest, width), dtype=np.float32)
+        lengths = np.zeros(len(self.templates), dtype=np.int64)
+        for i, (_, t) in enumerate(self.templates):
+            stack[i, :len(t)] = t
+            lengths[i] = len(t)
+        self._stack = (stack, lengths, (stack ** 2).sum(axis=2))
+
+    def distances(self, query: np.ndarray) -> np.ndarray:
+        """Normalized DTW distance from query features to every template"""
+        if self._stack is None:
+            self._build_stack()
+        stack, lengths, stack_sq = self._stack
+        count, longest, _ = stack.shape
+        # Squared Euclidean frame distances for all templates: (query, templates, frames)
+        cost = ((query ** 2).sum(axis=1)[:, None, None] + stack_sq[None]
+                - 2.0 * np.einsum('qc,tfc->qtf', query, stack))
+        cost = np.sqrt(np.maximum(cost, 0.0))
+        cost[:, np.arange(longest)[None, :] >= lengths[:, None]] = np.inf
+
+        # Each query frame advances the template by 0, 1 or 2 frames
+        acc = np.full((count, longest), np.inf, dtype=np.float32)
+        acc[:, 0] = cost[0, :, 0]
+        for i in range(1, len(query)):
+            step = acc.copy()
+            np.minimum(step[:, 1:], acc[:, :-1], out=step[:, 1:])
+            np.minimum(step[:, 2:], acc[:, :-2], out=step[:, 2:])
+            acc = cost[i] + step
+        return acc[np.arange(count), lengths - 1] / len(query)
+
+    def score(self, pcm: np.ndarray, sample_rate: int) -> List[Tuple[str, float]]:
+        """Best distance per phrase, closest first"""
+        if not self.templates:
+            return []
+        dist = self.distances(self.features(pcm, sample_rate))
+        best = {}
+        for (phrase, _), d in zip(self.templates, dist):
+            if d < best.get(phrase, np.inf):
+                best[phrase] = float(d)
+        return sorted(best.items(), key=lambda item: item[1])
+
+    def recognize(self, pcm: np.ndarray, sample_rate: int) -> str:
+        ranked = self.score(pcm, sample_rate)
+        if not ranked or ranked[0][1] > self.threshold:
+            raise sr.UnknownValueError()
+        if len(ranked) > 1 and ranked[1][1] - ranked[0][1] < self.margin:
+            raise sr.UnknownValueError()
+        return ranked[0][0]
+
+    def partial(self, pcm: np.ndarray, sample_rate: int) -> Optional[str]:
+        # Stricter than the final decision: the runner-up must be clearly worse
+        ranked = self.score(pcm, sample_rate)
+        if not ranked or ranked[0][1] > self.threshold:
+            return None
+        if len(ranked) > 1 and ranked[1][1] - ranked[0][1] < max(self.margin, self.partial_margin):
+            return None
+        return ranked[0][0]
+
+class FallbackRecognizer(RecognizerBackend):
+    """Try the primary backend and fall back when it understands nothing"""
+
+    def __init__(self, primary: RecognizerBackend, fallback: RecognizerBackend):
+        self.primary = primary
+        self.fallback = fallback
+        self.name = f"{primary.name}+{fallback.name}"
+        self.streaming = primary.streaming
+        self.primary_hits = 0
+        self.fallback_calls = 0
+
+    def partial(self, pcm: np.ndarray, sample_rate: int) -> Optional[str]:
+        return self.primary.partial(pcm, sample_rate)
+
+    def recognize(self, pcm: np.ndarray, sample_rate: int) -> str:
+        try:
+            text = self.primary.recognize(pcm, sample_rate)
+            self.primary_hits += 1
+            return text
+        except sr.UnknownValueError:
+            self.fallback_calls += 1
+            return self.fallback.recognize(pcm, sample_rate)
+
+def create_recognizer(kind: str = "auto", template_dir: str = TEMPLATE_DIR,
+                      threshold: float = 8.0) -> RecognizerBackend:
+    """Build the recognizer backend: 'google', 'kws', or 'auto' (kws with google fallback)"""
+    if kind == "google":
+        return GoogleRecognizer()
+    spotter = KeywordSpotter(threshold=threshold)
+    loaded = spotter.load_templates(template_dir)
+    if kind == "kws":
+        if not loaded:
+            console.print(f"[yellow]⚠️  No keyword templates found in {template_dir}[/yellow]")
+        return spotter
+    if not loaded:
+        return GoogleRecognizer()
+    console.print(f"[green]✅ Offline keyword spotting enabled ({loaded} templates)[/green]")
+    return FallbackRecognizer(spotter, GoogleRecognizer())
+
+def evaluate_recognizer(backend: RecognizerBackend, directory: str) -> dict:
+    """Recognize labeled clips in <directory>/<phrase>/*.wav and report accuracy and speed"""
+    total = correct = rejected = 0
+    elapsed = 0.0
+    errors = []
+    for phrase in sorted(os.listdir(directory)):
+        phrase_dir = os.path.join(directory, phrase)
+        if not os.path.isdir(phrase_dir):
+            continue
+        label = phrase.replace('_', ' ').lower()
+        for name in sorted(os.listdir(phrase_dir)):
+            if not name.lower().endswith(".wav"):
+                continue
+            pcm, sample_rate = read_wav_mono(os.path.join(phrase_dir, name))
+            total += 1
+            start = time.perf_counter()
+            try:
+                text = backend.recognize(pcm, sample_rate)
+            except sr.UnknownValueError:
+                text = None
+                rejected += 1
+            elapsed += time.perf_counter() - start
+            if text == label:
+                correct += 1
+            elif text is not None:
+                errors.append({"file": os.path.join(phrase, name), "expected": label, "got": text})
+    return {
+        "backend": backend.name,
+        "clips": total,
+        "correct": correct,
+        "rejected": rejected,
+        "accuracy": correct / total if total else 0.0,
+        "ms_per_utterance": elapsed / total * 1000 if total else 0.0,
+        "errors": errors,
+    }
+
+# Wake word gate
+WAKE_MAX_SECONDS = 1.5   # the wake word is looked for at the start of an utterance
+WAKE_THRESHOLD = 8.0     # DTW distance at sensitivity 0.5
+
+class WakeWordDetector(KeywordSpotter):
+    """Spots "Kevin" at the start of an utterance with open-ended DTW.
+
+    Templates are aligned against a prefix of the utterance of any length,
+    so the command that follows the wake word in the same breath does not
+    count against the match, and the point where the wake word ends is
+    known.
+    """
+    name = "wake"
+
+    def __init__(self, sensitivity: float = 0.5):
+        super().__init__(threshold=WAKE_THRESHOLD * (0.5 + sensitivity))
+        self.sensitivity = sensitivity
+
+    def load_templates(self, directory: str = WAKE_TEMPLATE_DIR) -> int:
+        """Enroll <directory>/*.wav as the wake word"""
+        count = 0
+        if not os.path.isdir(directory):
+            return count
+        for name in sorted(os.listdir(directory)):
+            if name.lower().endswith(".wav"):
+                pcm, sample_rate = read_wav_mono(os.path.join(directory, name))
+                self.add_template("kevin", pcm, sample_rate)
+                count += 1
+        return count
+
+    def detect(self, pcm: np.ndarray, sample_rate: int) -> Tuple[Optional[int], float]:
+        """(sample where the wake word ends or None, best distance)"""
+        if not self.templates:
+            return None, float('inf')
+        if sample_rate not in self.front_ends:
+            self.front_ends[sample_rate] = LogMelFeatures(sample_rate)
+        front_end = self.front_ends[sample_rate]
+        prefix = np.asarray(pcm[:int(WAKE_MAX_SECONDS * sample_rate)], dtype=np.float32)
+        log_mel = front_end.log_mel(prefix)
+        energy = log_mel.max(axis=1)
+        loud = np.flatnonzero(energy > energy.max() - 35.0 / 4.343)
+        first = int(loud[0]) if len(loud) else 0
+        cepstra = log_mel[first:] @ front_end.dct.T
+        if self._stack is None:
+            self._build_stack()
+        stack, lengths, stack_sq = self._stack
+        # Normalize over roughly one wake word's worth of frames, as the templates were
+        span = max(1, int(lengths.mean()))
+        query = cepstra - cepstra[:span].mean(axis=0)
+
+        count, longest, _ = stack.shape
+        cost = ((query ** 2).sum(axis=1)[:, None, None] + stack_sq[None]
+                - 2.0 * np.einsum('qc,tfc->qtf', query, stack))
+        cost = np.sqrt(np.maximum(cost, 0.0))
+        cost[:, np.arange(longest)[None, :] >= lengths[:, None]] = np.inf
+
+        rows = np.arange(count)
+        acc = np.full((count, longest), np.inf, dtype=np.float32)
+        acc[:, 0] = cost[0, :, 0]
+        best, best_end = np.inf, None
+        for i in range(1, len(query)):
+            step = acc.copy()
+            np.minimum(step[:, 1:], acc[:, :-1], out=step[:, 1:])
+            np.minimum(step[:, 2:], acc[:, :-2], out=step[:, 2:])
+            acc = cost[i] + step
+            finished = acc[rows, lengths - 1].min() / (i + 1)
+            if finished < best:
+                best, best_end = float(finished), i
+        if best_end is None or best > self.threshold:
+            return None, best
+        return (first + best_end + 1) * front_end.hop + front_end.frame_len - front_end.hop, best
+
+class WakeWordGate:
+    """Only lets utterances through to ASR after the wake word opened a command window.
+
+    Within window_seconds of the wake word (or of the last command passed
+    through) every utterance goes to the recognizer; outside it an utterance
+    is passed on only when it starts with the wake word, minus the wake word
+    itself.
+    """
+
+    def __init__(self, detector: WakeWordDetector, window_seconds: float = 8.0, clock=time.monotonic):
+        self.detector = detector
+        self.window_seconds = window_seconds
+        self.clock = clock
+        self.open_until = float('-inf')
+        self.utterances = 0
+        self.wakes = 0
+        self.passed = 0
+        self.avoided = 0
+        self.checks = 0
+        self.seconds = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self.clock() < self.open_until
+
+    def open_window(self):
+        """Accept commands without the wake word for the next window_seconds"""
+        self.open_until = self.clock() + self.window_seconds
+
+    def admit(self, pcm: np.ndarray, sample_rate: int) -> Optional[np.ndarray]:
+        """The audio to recognize, or None if the utterance should not reach ASR"""
+        self.utterances += 1
+        if self.is_open:
+            self.open_until = self.clock() + self.window_seconds
+            self.passed += 1
+            return pcm
+        start = time.perf_counter()
+        end, _ = self.detector.detect(pcm, sample_rate)
+        elapsed = time.perf_counter() - start
+        self.checks += 1
+        self.seconds += elapsed
+        metrics.record('wake', elapsed)
+        if end is None:
+            self.avoided += 1
+            metrics.count('asr_calls', 'avoided')
+            return None
+        self.wakes += 1
+        self.open_until = self.clock() + self.window_seconds
+        state.status = "Wake word heard"
+        rest = pcm[end:]
+        if len(rest) < 0.3 * sample_rate:
+            # Just "Kevin"; the command comes in the next utterance
+            self.avoided += 1
+            metrics.count('asr_calls', 'avoided')
+            return None
+        self.passed += 1
+        return rest
+
+    def stats(self) -> dict:
+        return {
+            "utterances": self.utterances,
+            "wake_words": self.wakes,
+            "passed_to_asr": self.passed,
+            "asr_calls_avoided": self.avoided,
+            "ms_per_check": self.seconds / self.checks * 1000 if self.checks else 0.0,
         }
-    }
 
-    # Social interaction keywords
-    social_keywords = {
-        'praise': {
-            'keywords': ['good job', 'nice work', 'well done', 'great job', 'excellent'],
-            'response': lambda cmd: ("Thank you, boss. I'm here to help.", "Acknowledged Praise")
-        },
-        'thanks': {
-            'keywords': ['thank you', 'thanks', 'appreciate', 'grateful'],
-            'response': lambda cmd: ("You're welcome, boss.", "Acknowledged Thanks")
-        },
-        'status': {
-            'keywords': ['how are you', "how're you", 'how you doing', 'status'],
-            'response': lambda cmd: ("I'm functioning optimally and ready to serve, boss.", "Status Check")
-        },
-        'greeting': {
-            'keywords': ['hello', 'hi', 'hey', 'greetings'],
-            'response': lambda cmd: ("Hello boss! How can I assist?", "Greeting Acknowledged")
-        },
-        'device_info': {
-            'keywords': ['check devices', 'device status', 'audio setup', 'sound setup'],
-            'response': lambda cmd: (f"Using {state.mic_name} for mic and {state.speaker_name} for audio.", "Device Status Check")
-        }
+wake_gate = None
+
+def create_wake_gate(template_dir: str = WAKE_TEMPLATE_DIR, sensitivity: float = 0.5,
+                     window_seconds: float = 8.0) -> Optional[WakeWordGate]:
+    """A wake word gate when wake templates exist, else None (every utterance goes to ASR)"""
+    detector = WakeWordDetector(sensitivity)
+    loaded = detector.load_templates(template_dir)
+    if not loaded:
+        return None
+    console.print(f"[green]✅ Wake word gate enabled ({loaded} templates)[/green]")
+    return WakeWordGate(detector, window_seconds)
+
+def evaluate_wake_word(detector: WakeWordDetector, directory: str) -> dict:
+    """Run the detector over <directory>/positive/*.wav and <directory>/negative/*.wav"""
+    results = {}
+    audio_seconds = cpu_seconds = 0.0
+    for label in ("positive", "negative"):
+        label_dir = os.path.join(directory, label)
+        names = sorted(n for n in os.listdir(label_dir) if n.lower().endswith(".wav")) \
+            if os.path.isdir(label_dir) else []
+        detected = []
+        for name in names:
+            pcm, sample_rate = read_wav_mono(os.path.join(label_dir, name))
+            start = time.process_time()
+            end, distance = detector.detect(pcm, sample_rate)
+            cpu_seconds += time.process_time() - start
+            audio_seconds += len(pcm) / sample_rate
+            if end is not None:
+                detected.append(name)
+        results[label] = {"clips": len(names), "detected": len(detected),
+                          "rate": len(detected) / len(names) if names else 0.0}
+        if label == "negative":
+            results[label]["false_accepts"] = detected
+    return {
+        "templates": len(detector.templates),
+        "sensitivity": detector.sensitivity,
+        "threshold": detector.threshold,
+        "detection_rate": results["positive"]["rate"],
+        "false_accept_rate": results["negative"]["rate"],
+        "cpu_seconds_per_audio_second": cpu_seconds / audio_seconds if audio_seconds else 0.0,
+        **results,
     }
 
-    # Remove wake word if present
-    if "kevin" in command:
-        command = command.replace("kevin", "").strip()
-
-    # Check for command keywords
-    for cmd_type, cmd_info in command_keywords.items():
-        if any(keyword in command for keyword in cmd_info['keywords']):
-            action_result = cmd_info['action'](command)
-            pyautogui_action, speak_msg, status_msg = action_result
-            speak(speak_msg)
-            state.status = status_msg
-            return
+def recognize_and_dispatch(listener: PhraseListener, backend: RecognizerBackend,
+                           utterance: Tuple[int, int], after: Optional[str] = None) -> Tuple[str, Optional[str]]:
+    """Recognize one endpointed utterance and run its command; returns (text, intent).
+    after is the intent an early commit already ran for this utterance"""
+    trace = CommandTrace(listener.speech_end_time(utterance[1]))
+    timings = {'endpoint': time.monotonic() - trace.start}
+    metrics.record('endpoint', timings['endpoint'])
+    query, intent = None, None
+    try:
+        # Nothing reaches the recognizer until the wake word has been heard
+        audio = listener.audio(*utterance)
+        if wake_gate is not None:
+            wake_start = time.monotonic()
+            audio = wake_gate.admit(audio, listener.capture.sample_rate)
+            timings['wake'] = time.monotonic() - wake_start
+            if audio is None:
+                return None, None
+        metrics.count('asr_calls', 'made')
+        
+        asr_start = time.monotonic()
+        query = backend.recognize(audio, listener.capture.sample_rate)
+        timings['asr'] = time.monotonic() - asr_start
+        metrics.record('asr', timings['asr'])
+        if not query:
+            return query, None
+        console.print(f"\n[blue]🗣️  Command received:[/blue] [bold white]{query}[/bold white]")
+        timings['trigger'] = listener.since_speech_start(utterance[0])
+        metrics.record('trigger', timings['trigger'])
+        intent = handle_command(query, trace, after=after)
+        if after is not None:
+            intent = after  # the utterance's command is the one that already ran
+        return query, intent
+    finally:
+        # Rejected and unrecognized utterances are recorded too; they are what needs debugging
+        record_utterance(listener, utterance, query, intent, timings)
+
+class EarlyCommitter:
+    """Streaming mode: run commands from partial hypotheses before the phrase ends.
 
-    # Check for social keywords
-    for social_type, social_info in social_keywords.items():
-        if any(keyword in command for keyword in social_info['keywords']):
-            speak_msg, status_msg = social_info['response'](command)
-            speak(speak_msg)
-            state.status = status_msg
+    Partials are requested as audio arrives; once one settles a single
+    command of an early-commit class, that command runs immediately. If the
+    speaker stops there, the final result is dropped. If speech goes on
+    ("pause and turn the volume down"), the whole utterance is still
+    recognized and only the intents after the committed one are dispatched,
+    so a late correction cannot fire a second command.
+    """
+
+    def __init__(self, listener: PhraseListener, backend: RecognizerBackend,
+                 classes=EARLY_COMMIT_CLASSES, min_speech_ms: int = 200, max_partial_s: float = 2.0,
+                 continuation_ms: int = 300):
+        self.listener = listener
+        self.backend = backend
+        self.classes = classes
+        rate = listener.capture.sample_rate
+        self.min_samples = int(rate * min_speech_ms / 1000)
+        self.max_samples = int(rate * max_partial_s)
+        self.continuation_samples = int(rate * continuation_ms / 1000)
+        self.committed = None  # start of the utterance that already fired
+        self.committed_end = 0  # end of the partial that fired it
+        self.resume = None  # (start, intent) of a fired utterance that went on
+        self.last = (None, None)  # (text, intent) of the latest early command
+        self.trigger = 0.0
+        self.partials = 0
+        self.early = 0
+        self.suppressed = 0
+        self.continued = 0
+
+    def on_partial(self, start: int, end: int):
+        if start == self.committed or not self.min_samples <= end - start <= self.max_samples:
+            return
+        if wake_gate is not None and not wake_gate.is_open:
+            return  # the wake word check needs the whole utterance
+        rate = self.listener.capture.sample_rate
+        self.partials += 1
+        text = self.backend.partial(self.listener.audio(start, end), rate)
+        if not text:
+            return
+        parsed = command_grammar.early_match(text, self.classes)
+        if parsed is None:
             return
+        self.committed = start
+        self.committed_end = end
+        self.early += 1
+        metrics.count('streaming', 'early_commit')
+        self.trigger = self.listener.since_speech_start(start)
+        metrics.record('trigger', self.trigger)
+        console.print(f"\n[blue]⚡ Early command:[/blue] [bold white]{text}[/bold white]")
+        self.last = (text, handle_command(text, CommandTrace(time.monotonic())))
 
-    # Silently ignore unrecognized commands
-    state.status = "Ready..."
+    def finished(self, utterance: Tuple[int, int]) -> bool:
+        """True if the utterance already fired and its final result should be dropped;
+        False if it should be recognized, with resume_after() naming the fired intent"""
+        if utterance[0] != self.committed:
+            return False
+        self.committed = None
+        speech_end = utterance[1] - self.listener.endpointer.end_frames * self.listener.vad.frame_len
+        if speech_end - self.committed_end > self.continuation_samples and self.last[1] is not None:
+            self.resume = (utterance[0], self.last[1])
+            self.continued += 1
+            metrics.count('streaming', 'final_continued')
+            return False
+        self.suppressed += 1
+        metrics.count('streaming', 'final_suppressed')
+        record_utterance(self.listener, utterance, *self.last, {'trigger': self.trigger})
+        return True
+
+    def resume_after(self, utterance: Tuple[int, int]) -> Optional[str]:
+        """Intent already run for an utterance that finished() passed on, else None"""
+        resume, self.resume = self.resume, None
+        return resume[1] if resume is not None and resume[0] == utterance[0] else None
+
+    def stats(self) -> dict:
+        return {"partials": self.partials, "early_commits": self.early,
+                "finals_suppressed": self.suppressed, "finals_continued": self.continued}
 
 # Enhanced listening function with better error handling
-def listen_forever():
-    recognizer = sr.Recognizer()
+def listen_forever(backend: Optional[RecognizerBackend] = None, early_commit=None):
+    """Capture and recognize on a background thread; early_commit lists the command classes of streaming mode"""
+    global audio_capture, calibration_refiner
+    backend = backend or create_recognizer()
     calibration_retries = 0
     max_calibration_retries = 3
     
     while True:
         try:
-            # Setup microphone with specific device
-            mic = sr.Microphone(device_index=state.mic_device) if state.mic_device is not None else sr.Microphone()
+            # Keep one input stream open on the selected microphone
+            mic = device_registry.to_sd(state.mic_device)
+            if audio_capture is None or audio_capture.device != mic:
+                if audio_capture is not None:
+                    audio_capture.stop()
+                    audio_capture = None
+                capture = AudioCapture(mic, reference=echo_reference(audio_player))
+                capture.start()
+                audio_capture = capture
+                if flight_recorder is not None:
+                    flight_recorder.attach(capture)
+            listener = PhraseListener(audio_capture, on_barge_in=barge_in)
+            refiner = CalibrationRefiner(listener)
             
-            # Calibration with timeout and retry logic
-            with mic as source:
+            # A saved profile for this microphone is used at once and refined while listening
+            if listener.use_profile(state.calibration_for(state.mic_key)):
+                console.print("[green]✅ Using saved microphone calibration[/green]")
+                state.status = "Calibration loaded"
+            else:
+                # Calibration with timeout and retry logic
                 try:
                     console.print("[yellow]🎤 Calibrating microphone...[/yellow]")
                     state.status = "Calibrating..."
                     
-                    # Set a shorter calibration duration
-                    recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                    # Seed the VAD noise floor; it keeps adapting while listening
+                    listener.calibrate(seconds=0.5)
+                    refiner.refine()
                     
                     console.print("[green]✅ Microphone calibrated![/green]")
                     state.status = "Calibration successful"
@@ -613,11 +5311,17 @@ def listen_forever():
                     calibration_retries += 1
                     console.print(f"[red]⚠️  Calibration attempt {calibration_retries} failed: {e}[/red]")
                     
-                    if calibration_retries >= max_calibration_retries:
+                    if listener.use_profile(state.last_good_calibration(state.mic_key)):
+                        # Keep the devices; the profile is refined once audio flows
+                        console.print("[yellow]⚠️  Using the last good calibration[/yellow]")
+                        state.status = "Calibration loaded"
+                    elif calibration_retries >= max_calibration_retries:
                         console.print("[red]❌ Maximum calibration retries reached. Resetting audio devices...[/red]")
                         # Reset audio devices
                         state.mic_device = None
                         state.speaker_device = None
+                        state.mic_key = None
+                        state.speaker_key = None
                         state.mic_name = "Default"
                         state.speaker_name = "Default"
                         state.save_config()
@@ -626,9 +5330,13 @@ def listen_forever():
                         setup_dual_headset()
                         calibration_retries = 0
                         continue
-                    
-                    time.sleep(2)  # Wait before retrying
-                    continue
+                    else:
+                        time.sleep(2)  # Wait before retrying
+                        continue
+            
+            committer = None
+            if early_commit is not None and backend.streaming:
+                committer = EarlyCommitter(listener, backend, early_commit)
             
             def recognition_loop():
                 while True:
@@ -636,25 +5344,20 @@ def listen_forever():
                         state.is_listening = True
                         state.status = "Listening..."
                         
-                        with mic as source:
-                            try:
-                                audio = recognizer.listen(source, phrase_time_limit=4, timeout=2)
-                                state.is_listening = False
-                                
-                                query = recognizer.recognize_google(audio).lower()
-                                if query:
-                                    console.print(f"\n[blue]🗣️  Command received:[/blue] [bold white]{query}[/bold white]")
-                                    handle_command(query)
-                                    
-                                    # Reset status after command
-                                    time.sleep(1)
-                                    state.status = "Ready for commands..."
-                                
-                            except sr.WaitTimeoutError:
-                                state.is_listening = False
-                                state.status = "Ready (timeout reset)"
-                                continue
-                                
+                        # Phrases end ~200 ms after the speaker stops
+                        utterance = listener.listen(timeout=2, on_partial=committer and committer.on_partial)
+                        if utterance is None:
+                            state.is_listening = False
+                            state.status = "Ready (timeout reset)"
+                            continue
+                        state.is_listening = False
+                        if committer is not None and committer.finished(utterance):
+                            continue
+                        
+                        # Responses are spoken by the scheduler, so go straight back to capture
+                        recognize_and_dispatch(listener, backend, utterance,
+                                               committer and committer.resume_after(utterance))
+                        
                     except sr.UnknownValueError:
                         state.is_listening = False
                         state.status = "Ready (no speech detected)"
@@ -669,6 +5372,11 @@ def listen_forever():
             # Start recognition in a separate thread
             recognition_thread = threading.Thread(target=recognition_loop, daemon=True)
             recognition_thread.start()
+            calibration_refiner = refiner
+            refiner.start()
+            if flight_recorder is not None:
+                flight_recorder.start()
+            startup_profile.record("listening", 0.0)
             break
             
         except Exception as e:
@@ -677,56 +5385,1770 @@ def listen_forever():
             console.print("[yellow]⚠️  Retrying in 5 seconds...[/yellow]")
             time.sleep(5)
 
-# Live status updater
-def update_status_display():
-    def update_loop():
+# Asyncio runtime
+class KevinRuntime:
+    """Capture, endpointing, recognition, dispatch, speech and the dashboard as asyncio tasks.
+
+    Endpointing awaits the capture ring rather than polling it, finished
+    utterances reach recognition through a small bounded queue (the oldest
+    is dropped when recognition falls behind), and blocking driver calls
+    (ASR, input injection, playback, device polling, metrics files) run in
+    single-thread executors so the event loop never blocks. stop() cancels
+    every task and waits for them to finish. A ControlServer, when given,
+    serves its socket from the same loop; with listen=False no microphone
+    is opened and commands only arrive through it.
+    """
+
+    def __init__(self, backend: RecognizerBackend, early_commit=None, dashboard: Optional[StatusDashboard] = None,
+                 max_utterances: int = 2, poll_devices: bool = True, export_metrics: bool = True,
+                 on_ready=None, control: Optional[ControlServer] = None, listen: bool = True):
+        self.backend = backend
+        self.on_ready = on_ready
+        self.control = control
+        self.listen = listen
+        self.early_commit = early_commit
+        self.dashboard = dashboard
+        self.max_utterances = max_utterances
+        self.poll_devices = poll_devices
+        self.export_metrics = export_metrics
+        self.loop = None
+        self.stopping = None
+        self.tasks = []
+        self.executors = {}
+        self.dropped_utterances = 0
+
+    def stop(self):
+        """Ask the runtime to shut down; safe to call from any thread"""
+        if self.loop is not None and self.stopping is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.stopping.set)
+
+    def _executor(self, name: str) -> ThreadPoolExecutor:
+        if name not in self.executors:
+            self.executors[name] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"kevin-{name}")
+        return self.executors[name]
+
+    def _blocking(self, name: str, fn, *args):
+        return self.loop.run_in_executor(self._executor(name), fn, *args)
+
+    async def run(self, greeting: bool = True):
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            # Not available on Windows or off the main thread; Ctrl+C then cancels run() instead
+            with contextlib.suppress(NotImplementedError, RuntimeError, ValueError):
+                self.loop.add_signal_handler(sig, self.stopping.set)
+
+        actions_ready = asyncio.Event()
+        action_dispatcher.attach(self._notifier(actions_ready))
+        try:
+            self.tasks = await self._pipeline()
+            self.tasks.append(asyncio.create_task(self._dispatch(actions_ready), name="dispatch"))
+            if self.export_metrics and metrics.enabled:
+                self.tasks.append(asyncio.create_task(
+                    self._periodic("io", metrics.interval, metrics.export), name="metrics"))
+            if self.poll_devices:
+                self.tasks.append(asyncio.create_task(
+                    self._periodic("io", 3.0, device_registry.poll_once, devices_need_rescan), name="devices"))
+            if self.dashboard is not None:
+                self.dashboard.prepare()
+                self.tasks.append(asyncio.create_task(self.dashboard.run_async(), name="dashboard"))
+            if self.control is not None:
+                await self.control.start(self)
+            startup_profile.record("listening", 0.0)
+            if greeting:
+                self._greet()
+            if self.on_ready is not None:
+                self.on_ready()
+            await self.stopping.wait()
+        finally:
+            await self._shutdown()
+
+    def _notifier(self, event: asyncio.Event):
+        return lambda: self.loop.call_soon_threadsafe(event.set)
+
+    async def _pipeline(self) -> list:
+        """Start the capture-to-speech tasks of the selected microphone and speaker"""
+        speech_ready = asyncio.Event()
+        speech_scheduler.attach(self._notifier(speech_ready))
+        tasks = [asyncio.create_task(self._speech(speech_ready), name="speech")]
+        if not self.listen:
+            return tasks
+        listener = await self._open_listener()
+        utterances = asyncio.Queue(maxsize=self.max_utterances)
+        tasks += [
+            asyncio.create_task(self._endpoint(listener, utterances), name="endpoint"),
+            asyncio.create_task(self._recognize(utterances), name="recognize"),
+            asyncio.create_task(self._periodic("io", calibration_refiner.interval, calibration_refiner.refine),
+                                name="calibration"),
+        ]
+        if flight_recorder is not None:
+            tasks.append(asyncio.create_task(
+                self._periodic("io", flight_recorder.interval, flight_recorder.flush), name="recorder"))
+        return tasks
+
+    def _greet(self):
+        speech_scheduler.submit(STARTUP_GREETING, PRIORITY_INFO)
+
+    async def _shutdown(self):
+        if self.dashboard is not None:
+            self.dashboard.running = False
+        if self.control is not None:
+            await self.control.stop()
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        with contextlib.suppress(Exception):
+            audio_player.stop()
+        for executor in self.executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.executors = {}
+
+    async def _open_listener(self) -> PhraseListener:
+        """Open capture on the selected microphone and calibrate, retrying as listen_forever did"""
+        global audio_capture, calibration_refiner
+        calibration_retries = 0
+        max_calibration_retries = 3
         while True:
             try:
-                # Update display every 0.5 seconds
-                console.clear()
-                layout = create_status_display()
-                console.print(layout)
-                time.sleep(0.5)
-            except KeyboardInterrupt:
-                break
+                mic = device_registry.to_sd(state.mic_device)
+                if audio_capture is None or audio_capture.device != mic:
+                    if audio_capture is not None:
+                        audio_capture.stop()
+                        audio_capture = None
+                    capture = AudioCapture(mic, reference=echo_reference(audio_player))
+                    await self._blocking("io", capture.start)
+                    audio_capture = capture
+                    if flight_recorder is not None:
+                        flight_recorder.attach(capture)
+                listener = PhraseListener(audio_capture, on_barge_in=barge_in)
+                calibration_refiner = CalibrationRefiner(listener)
             except Exception as e:
-                console.print(f"[red]Display error:[/red] {e}")
-                time.sleep(1)
-    
-    threading.Thread(target=update_loop, daemon=True).start()
+                console.print(f"[red]❌ Microphone setup error: {e}[/red]")
+                state.status = "Microphone setup failed"
+                console.print("[yellow]⚠️  Retrying in 5 seconds...[/yellow]")
+                await asyncio.sleep(5)
+                continue
+
+            # A saved profile for this microphone is used at once and refined while listening
+            if listener.use_profile(state.calibration_for(state.mic_key)):
+                console.print("[green]✅ Using saved microphone calibration[/green]")
+                state.status = "Calibration loaded"
+                return listener
+
+            try:
+                console.print("[yellow]🎤 Calibrating microphone...[/yellow]")
+                state.status = "Calibrating..."
+                seconds = 0.5
+                needed = int(audio_capture.sample_rate * seconds)
+                if not await audio_capture.ring.wait_async(listener.position + needed, 2.0):
+                    raise TimeoutError("no audio from microphone")
+                listener.calibrate(seconds, timeout=0)
+                await self._blocking("io", calibration_refiner.refine)
+                console.print("[green]✅ Microphone calibrated![/green]")
+                state.status = "Calibration successful"
+                return listener
+            except Exception as e:
+                calibration_retries += 1
+                console.print(f"[red]⚠️  Calibration attempt {calibration_retries} failed: {e}[/red]")
+                if listener.use_profile(state.last_good_calibration(state.mic_key)):
+                    # Keep the devices; the profile is refined once audio flows
+                    console.print("[yellow]⚠️  Using the last good calibration[/yellow]")
+                    state.status = "Calibration loaded"
+                    return listener
+                if calibration_retries >= max_calibration_retries:
+                    console.print("[red]❌ Maximum calibration retries reached. Resetting audio devices...[/red]")
+                    state.mic_device = None
+                    state.speaker_device = None
+                    state.mic_key = None
+                    state.speaker_key = None
+                    state.mic_name = "Default"
+                    state.speaker_name = "Default"
+                    state.save_config()
+                    await self._blocking("io", setup_dual_headset)
+                    calibration_retries = 0
+                    continue
+                await asyncio.sleep(2)
+
+    async def _endpoint(self, listener: PhraseListener, utterances: asyncio.Queue, room=None):
+        target = room.state if room is not None else state
+        committer = None
+        if self.early_commit is not None and self.backend.streaming:
+            committer = EarlyCommitter(listener, self.backend, self.early_commit)
+        while True:
+            target.is_listening = True
+            target.status = "Listening..."
+            # The timeout only lets a rebound capture (new ring) be picked up
+            utterance = await listener.listen_async(timeout=2, on_partial=committer and committer.on_partial)
+            if utterance is None:
+                continue
+            target.is_listening = False
+            if committer is not None and committer.finished(utterance):
+                continue
+            if utterances.full():
+                # Recognition is behind; an older command is stale by now
+                utterances.get_nowait()
+                self.dropped_utterances += 1
+                metrics.count('utterances', 'dropped')
+            after = committer.resume_after(utterance) if committer is not None else None
+            utterances.put_nowait((listener, utterance, room, after))
+
+    async def _recognize(self, utterances: asyncio.Queue):
+        while True:
+            listener, utterance, _, after = await utterances.get()
+            try:
+                await self._blocking("asr", recognize_and_dispatch, listener, self.backend, utterance, after)
+            except sr.UnknownValueError:
+                state.status = "Ready (no speech detected)"
+            except Exception as e:
+                console.print(f"[red]⚠️  Recognition error: {e}[/red]")
+                state.status = "Recognition error, retrying..."
+                await asyncio.sleep(1)
+
+    async def _dispatch(self, ready: asyncio.Event):
+        while True:
+            ready.clear()
+            await self._blocking("actions", action_dispatcher.pump)
+            # Sleep until something is submitted or a rate-limited batch comes due
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(ready.wait(), action_dispatcher.next_wait())
+
+    async def _speech(self, ready: asyncio.Event, scheduler: Optional[SpeechScheduler] = None,
+                      player=None, executor: str = "audio"):
+        scheduler = scheduler or speech_scheduler
+        while True:
+            ready.clear()
+            item = scheduler.take()
+            if item is None:
+                await ready.wait()
+                continue
+            try:
+                await self._blocking(executor, scheduler.speak_item, item)
+            except asyncio.CancelledError:
+                (player or audio_player).stop()
+                raise
+
+    async def _periodic(self, executor: str, interval: float, fn, *args):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._blocking(executor, fn, *args)
+            except Exception as e:
+                console.print(f"[yellow]⚠️  {getattr(fn, '__name__', 'Background task')} failed: {e}[/yellow]")
+
+# Multi-room mode
+ROOMS_FILE = "kevin_rooms.json"
+
+class Room:
+    """One microphone and its paired speaker, with its own state, volume target and spoken responses"""
+
+    def __init__(self, name: str, mic: Optional[int] = None, speaker: Optional[int] = None,
+                 volume: Optional[VolumeBackend] = None, player=None, capture=None):
+        self.name = name
+        self.state = KevinState()
+        self.state.mic_device = mic
+        self.state.speaker_device = speaker
+        self.state.status = "Ready..."
+        self.volume = volume  # None acts on the system volume
+        if volume is not None:
+            volume.subscribe(self.sync_volume)
+        self.player = player or StreamPlayer(speaker)
+        self.speech = SpeechScheduler(speak_fn=self.speak)
+        self.capture = capture  # opened on the mic by the runtime when None
+        self.listener = None
+        self.wake_gate = None
+        self.recorder = None  # FlightRecorder of this room's microphone, when recording
+        self.last = (None, None)  # (text, intent) of the latest command
+
+    def speak(self, text, trace: Optional[CommandTrace] = None):
+        speak(text, trace, player=self.player)
+
+    def sync_volume(self, level: float, muted: bool):
+        self.state.current_volume = int(round(level * 100))
+        self.state.is_muted = bool(muted)
+
+    def __repr__(self):
+        return f"Room({self.name!r})"
+
+def _find_device(spec, devices: List[Tuple[int, str]], taken: set) -> Tuple[Optional[int], str]:
+    """Resolve a PyAudio index or a name fragment to (index, name); identical devices are taken in order"""
+    if spec is None:
+        return None, "Default"
+    names = dict(devices)
+    if isinstance(spec, int):
+        taken.add(spec)
+        return spec, names.get(spec, f"Device {spec}")
+    for index, name in devices:
+        if spec.lower() in name.lower() and index not in taken:
+            taken.add(index)
+            return index, name
+    raise ValueError(f"no audio device matches '{spec}'")
+
+def load_rooms(path: str = ROOMS_FILE) -> List[Room]:
+    """Rooms from a JSON list of {"name", "mic", "speaker", "volume_sink"}.
+
+    mic and speaker are PyAudio indexes or parts of device names. volume_sink
+    names a pactl sink the room's volume commands act on ("fake" simulates
+    one); without it they change the system volume.
+    """
+    with open(path, 'r') as f:
+        specs = json.load(f)
+    inputs, outputs = device_registry.input_devices(), device_registry.output_devices()
+    taken_inputs, taken_outputs = set(), set()
+    rooms = []
+    for i, spec in enumerate(specs):
+        mic, mic_name = _find_device(spec.get('mic'), inputs, taken_inputs)
+        speaker, speaker_name = _find_device(spec.get('speaker'), outputs, taken_outputs)
+        sink = spec.get('volume_sink')
+        volume = None
+        if sink == "fake":
+            volume = FakeVolumeBackend()
+        elif sink:
+            volume = PactlVolume(sink=sink)
+        if volume is not None:
+            volume.start()
+        room = Room(spec.get('name', f"room {i + 1}"), mic, speaker, volume)
+        room.state.mic_name = mic_name
+        room.state.speaker_name = speaker_name
+        room.state.mic_key = device_registry.key_for_pa(mic)
+        room.state.speaker_key = device_registry.key_for_pa(speaker)
+        rooms.append(room)
+    return rooms
+
+# Recognizer replica of a pool worker process
+worker_recognizer = None
+
+def _init_recognition_worker(kind: str, template_dir: str, threshold: float):
+    global worker_recognizer
+    # Ctrl+C is handled by the parent, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    worker_recognizer = create_recognizer(kind, template_dir, threshold)
+
+def _recognition_worker_ready() -> int:
+    return os.getpid()
+
+def _recognize_in_worker(pcm: np.ndarray, sample_rate: int) -> str:
+    return worker_recognizer.recognize(pcm, sample_rate)
+
+class RecognitionPool:
+    """Recognizer replicas in worker processes, so CPU-bound local recognition
+    of several rooms runs on several cores instead of one GIL-bound thread"""
+
+    def __init__(self, kind: str = "kws", template_dir: str = TEMPLATE_DIR, threshold: float = 8.0,
+                 workers: Optional[int] = None):
+        self.kind = kind
+        self.template_dir = template_dir
+        self.threshold = threshold
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = None
+
+    def start(self):
+        """Start the workers and wait until each has loaded its recognizer"""
+        if self.executor is not None:
+            return
+        import multiprocessing
+        # spawn: forking a process with live audio streams and threads is not safe
+        self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                            initializer=_init_recognition_worker,
+                                            initargs=(self.kind, self.template_dir, self.threshold))
+        for future in [self.executor.submit(_recognition_worker_ready) for _ in range(self.workers)]:
+            future.result()
+
+    def stop(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+class MultiRoomRuntime(KevinRuntime):
+    """KevinRuntime serving several rooms from one host.
+
+    Every room has its own capture stream, VAD and endpointer task; endpointed
+    utterances of all rooms share one bounded queue served by a
+    RecognitionPool, with one recognition in flight per worker process.
+    Commands run on the shared dispatch queue against the room they came
+    from, and each room answers on its own speaker.
+    """
+
+    def __init__(self, rooms: List[Room], pool: RecognitionPool, dashboard: Optional[StatusDashboard] = None,
+                 max_utterances: int = 2, poll_devices: bool = True, export_metrics: bool = True,
+                 on_ready=None, control: Optional[ControlServer] = None):
+        super().__init__(None, None, dashboard, max_utterances, poll_devices, export_metrics, on_ready, control)
+        self.rooms = rooms
+        self.pool = pool
+        self.recognitions = 0
+
+    async def _pipeline(self) -> list:
+        await self._blocking("io", self.pool.start)
+        utterances = asyncio.Queue(maxsize=self.max_utterances * len(self.rooms))
+        tasks = []
+        for room in self.rooms:
+            speech_ready = asyncio.Event()
+            room.speech.attach(self._notifier(speech_ready))
+            tasks.append(asyncio.create_task(self._room_endpoint(room, utterances), name=f"endpoint-{room.name}"))
+            tasks.append(asyncio.create_task(
+                self._speech(speech_ready, room.speech, room.player, f"audio-{room.name}"), name=f"speech-{room.name}"))
+        for worker in range(self.pool.workers):
+            tasks.append(asyncio.create_task(self._recognize_pooled(utterances), name=f"recognize-{worker}"))
+        return tasks
+
+    def _greet(self):
+        for room in self.rooms:
+            room.speech.submit(STARTUP_GREETING, PRIORITY_INFO)
+
+    async def _shutdown(self):
+        await super()._shutdown()
+        self.pool.stop()
+        for room in self.rooms:
+            for resource in (room.capture, room.volume, room.recorder):
+                if resource is not None:
+                    with contextlib.suppress(Exception):
+                        resource.stop()
+
+    async def _room_endpoint(self, room: Room, utterances: asyncio.Queue):
+        # Each room opens and calibrates on its own, so a missing mic does not hold up the rest
+        while room.listener is None:
+            try:
+                if room.capture is None:
+                    capture = AudioCapture(device_registry.to_sd(room.state.mic_device),
+                                           reference=echo_reference(room.player))
+                    await self._blocking("io", capture.start)
+                    room.capture = capture
+                    if room.recorder is not None:
+                        room.recorder.attach(capture)
+                listener = PhraseListener(room.capture, on_barge_in=lambda: barge_in(room))
+                refiner = CalibrationRefiner(listener, room)
+                if not listener.use_profile(state.calibration_for(room.state.mic_key)):
+                    seconds = 0.5
+                    needed = int(room.capture.sample_rate * seconds)
+                    if not await room.capture.ring.wait_async(listener.position + needed, 2.0):
+                        if not listener.use_profile(state.last_good_calibration(room.state.mic_key)):
+                            raise TimeoutError("no audio from microphone")
+                    else:
+                        listener.calibrate(seconds, timeout=0)
+                        await self._blocking("io", refiner.refine)
+                room.listener = listener
+            except Exception as e:
+                console.print(f"[red]⚠️  {room.name}: microphone setup failed: {e}[/red]")
+                room.state.status = "Microphone setup failed"
+                await asyncio.sleep(5)
+        console.print(f"[green]✅ {room.name}: listening on {room.state.mic_name}[/green]")
+        self.tasks.append(asyncio.create_task(self._periodic("io", refiner.interval, refiner.refine),
+                                              name=f"calibration-{room.name}"))
+        if room.recorder is not None:
+            self.tasks.append(asyncio.create_task(
+                self._periodic("io", room.recorder.interval, room.recorder.flush), name=f"recorder-{room.name}"))
+        await self._endpoint(room.listener, utterances, room)
+
+    async def _recognize_pooled(self, utterances: asyncio.Queue):
+        while True:
+            listener, utterance, room, _ = await utterances.get()
+            try:
+                await self._recognize_room(room, listener, utterance)
+            except sr.UnknownValueError:
+                room.state.status = "Ready (no speech detected)"
+            except Exception as e:
+                console.print(f"[red]⚠️  {room.name}: recognition error: {e}[/red]")
+                room.state.status = "Recognition error, retrying..."
+                await asyncio.sleep(1)
+            finally:
+                self.recognitions += 1
+
+    async def _recognize_room(self, room: Room, listener: PhraseListener, utterance: Tuple[int, int]):
+        """recognize_and_dispatch for one room, with ASR in the worker pool"""
+        trace = CommandTrace(listener.speech_end_time(utterance[1]))
+        timings = {'endpoint': time.monotonic() - trace.start}
+        metrics.record('endpoint', timings['endpoint'])
+        rate = listener.capture.sample_rate
+        query, intent = None, None
+        try:
+            # Copied out of the ring: it is pickled to a worker and the ring keeps moving
+            audio = np.array(listener.audio(*utterance))
+            if room.wake_gate is not None:
+                wake_start = time.monotonic()
+                audio = await self._blocking("wake", room.wake_gate.admit, audio, rate)
+                timings['wake'] = time.monotonic() - wake_start
+                if audio is None:
+                    return
+            metrics.count('asr_calls', 'made')
+
+            asr_start = time.monotonic()
+            query = await self.loop.run_in_executor(self.pool.executor, _recognize_in_worker, audio, rate)
+            timings['asr'] = time.monotonic() - asr_start
+            metrics.record('asr', timings['asr'])
+            if not query:
+                return
+            console.print(f"\n[blue]🗣️  {room.name}:[/blue] [bold white]{query}[/bold white]")
+            timings['trigger'] = listener.since_speech_start(utterance[0])
+            metrics.record('trigger', timings['trigger'])
+            intent = handle_command(query, trace, room)
+            room.last = (query, intent)
+        finally:
+            record_utterance(listener, utterance, query, intent, timings)
+
+# Control socket
+CONTROL_SOCKET = "kevin.sock"
+EVENT_KINDS = ('state', 'latency', 'command')
+
+class EventHub:
+    """State, latency and command events fanned out to control-socket subscribers.
+
+    publish() may be called from any thread and returns at once when nobody
+    subscribed to that kind of event. Otherwise the event is queued, and the
+    queue is handed to the subscribers on the event loop with one wake-up
+    per batch rather than per event. Each event is encoded once, however
+    many clients receive it.
+    """
+    MAX_PENDING = 100000
+
+    def __init__(self):
+        self.loop = None
+        self.wanted = dict.fromkeys(EVENT_KINDS, 0)  # kind -> subscribers
+        self.subscribers = []
+        self.followed = []  # metrics and KevinStates already reporting here
+        self.pending = deque()
+        self.scheduled = False
+        self.published = 0
+        self.dropped = 0
+        self.batches = 0
+
+    def attach(self, loop, states: List[Tuple[Optional[str], KevinState]]):
+        """Deliver on loop; follow the latency metrics and each (room name, state)"""
+        self.loop = loop
+        sources = [(metrics, lambda stage, seconds: self.publish('latency', stage=stage, seconds=seconds))]
+        for room, target in states:
+            sources.append((target, lambda name, value, room=room: self.publish('state', room=room, field=name,
+                                                                                 value=value)))
+        for source, callback in sources:
+            if not any(source is followed for followed in self.followed):
+                source.subscribe(callback)
+                self.followed.append(source)
+
+    def detach(self):
+        self.loop = None
+        self.subscribers = []
+        self.wanted = dict.fromkeys(EVENT_KINDS, 0)
+        self.pending.clear()
+
+    def subscribe(self, client, kinds: frozenset):
+        self.unsubscribe(client)
+        client.kinds = kinds
+        self.subscribers.append(client)
+        for kind in kinds:
+            self.wanted[kind] += 1
+
+    def unsubscribe(self, client):
+        if client in self.subscribers:
+            self.subscribers.remove(client)
+            for kind in client.kinds:
+                self.wanted[kind] -= 1
+            client.kinds = frozenset()
+
+    def publish(self, kind: str, **fields):
+        loop = self.loop
+        if not self.wanted[kind] or loop is None:
+            return
+        if len(self.pending) >= self.MAX_PENDING:
+            self.dropped += 1
+            return
+        self.pending.append((kind, time.time(), fields))
+        self.published += 1
+        if not self.scheduled:
+            self.scheduled = True
+            with contextlib.suppress(RuntimeError):  # loop already closed
+                loop.call_soon_threadsafe(self._deliver)
+
+    def _deliver(self):
+        self.scheduled = False
+        events = []
+        # Only what is queued now; publishers may keep appending meanwhile
+        for _ in range(len(self.pending)):
+            kind, t, fields = self.pending.popleft()
+            line = json.dumps({'event': kind, 't': round(t, 6), **fields}, default=str)
+            events.append((kind, line.encode() + b"\n"))
+        if events:
+            self.batches += 1
+            for client in list(self.subscribers):
+                client.send_events(events)
+
+event_hub = EventHub()
+
+class ControlClient:
+    """One connection to the control socket"""
+
+    def __init__(self, writer: asyncio.StreamWriter, max_buffer: int):
+        self.writer = writer
+        self.max_buffer = max_buffer
+        self.kinds = frozenset()
+        self.dropped = 0
+
+    def send_events(self, events: List[Tuple[str, bytes]]):
+        lines = [line for kind, line in events if kind in self.kinds]
+        if not lines or self.writer.is_closing():
+            return
+        if self.writer.transport.get_write_buffer_size() > self.max_buffer:
+            # A subscriber that stopped reading loses events instead of holding up Kevin
+            self.dropped += len(lines)
+            return
+        self.writer.write(b"".join(lines))
+
+class ControlServer:
+    """Newline-delimited JSON control API on a Unix-domain socket.
+
+    Each request is a JSON object on its own line and is answered in order
+    on the same connection, echoing its "id"; a line that is not JSON is
+    taken as a command, so `echo pause | nc -U kevin.sock` works:
+
+        {"op": "command", "text": "volume up", "room": "kitchen", "dedup": false, "id": 1}
+        {"op": "status"}
+        {"op": "subscribe", "events": ["state", "latency", "command"]}
+        {"op": "unsubscribe"}
+        {"op": "ping"}
+
+    Commands go straight to handle_command() on the event loop, as if they
+    had been recognized, so the dispatch and action layers can be driven
+    and load tested without a microphone ("dedup": false lets repeats
+    through the duplicate-recognition filter). Requests are read in chunks and
+    the replies to one chunk are written together. The socket is created
+    mode 0600: only the user running Kevin can connect.
+    """
+    MAX_REQUEST = 65536
+
+    def __init__(self, path: str = CONTROL_SOCKET, max_buffer: int = 1 << 20):
+        self.path = path
+        self.max_buffer = max_buffer  # unread bytes per client before events are dropped
+        self.runtime = None
+        self.server = None
+        self.clients = set()
+        self.started_at = None
+        self.counts = {'connections': 0, 'requests': 0, 'commands': 0, 'errors': 0}
+        self.ops = {'command': self._command, 'status': self._status, 'subscribe': self._subscribe,
+                    'unsubscribe': self._unsubscribe, 'ping': lambda client, request: {}}
+
+    def _remove_stale(self):
+        """Delete a socket left behind by a Kevin that is no longer running"""
+        try:
+            mode = os.stat(self.path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise OSError(f"{self.path} exists and is not a socket")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(self.path)
+            return
+        finally:
+            probe.close()
+        raise OSError(f"another Kevin is already serving {self.path}")
+
+    async def start(self, runtime: KevinRuntime):
+        if not hasattr(socket, 'AF_UNIX'):
+            raise OSError("the control socket needs Unix-domain socket support")
+        self._remove_stale()
+        self.runtime = runtime
+        event_hub.attach(runtime.loop, [(None, state)] +
+                         [(room.name, room.state) for room in getattr(runtime, 'rooms', [])])
+        umask = os.umask(0o177)
+        try:
+            self.server = await asyncio.start_unix_server(self._serve, path=self.path)
+        finally:
+            os.umask(umask)
+        self.started_at = time.monotonic()
+        console.print(f"[green]🔌 Control socket listening on {self.path}[/green]")
+
+    async def stop(self):
+        if self.server is None:
+            return
+        self.server.close()
+        for client in list(self.clients):
+            client.writer.close()
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(self.server.wait_closed(), 1.0)
+        self.server = None
+        event_hub.detach()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        client = ControlClient(writer, self.max_buffer)
+        self.clients.add(client)
+        self.counts['connections'] += 1
+        partial = b""
+        try:
+            while True:
+                data = await reader.read(self.MAX_REQUEST)
+                if not data:
+                    break
+                lines = (partial + data).split(b"\n")
+                partial = lines.pop()
+                replies = [self.handle(client, line) for line in lines if line.strip()]
+                if len(partial) > self.MAX_REQUEST:
+                    replies.append(self._encode({'ok': False, 'error': "request too long"}))
+                    writer.write(b"".join(replies))
+                    break
+                if replies:
+                    writer.write(b"".join(replies))
+                if writer.transport.get_write_buffer_size() > self.max_buffer:
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            event_hub.unsubscribe(client)
+            self.clients.discard(client)
+            writer.close()
+
+    @staticmethod
+    def _encode(reply: dict) -> bytes:
+        return json.dumps(reply, default=str).encode() + b"\n"
+
+    def handle(self, client: ControlClient, line: bytes) -> bytes:
+        """Answer one request line"""
+        self.counts['requests'] += 1
+        request_id = None
+        try:
+            line = line.strip()
+            if len(line) > self.MAX_REQUEST:
+                raise ValueError("request too long")
+            if line[:1] in (b"{", b"["):
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("a request is a JSON object")
+            else:
+                request = {'op': 'command', 'text': line.decode('utf-8', 'replace')}
+            request_id = request.get('id')
+            op = self.ops.get(request.get('op'))
+            if op is None:
+                raise ValueError(f"unknown op {request.get('op')!r}, expected one of {', '.join(self.ops)}")
+            reply = op(client, request)
+            reply['ok'] = True
+        except Exception as e:
+            self.counts['errors'] += 1
+            reply = {'ok': False, 'error': str(e)}
+        if request_id is not None:
+            reply['id'] = request_id
+        return self._encode(reply)
+
+    def _room(self, name: Optional[str]):
+        rooms = getattr(self.runtime, 'rooms', None)
+        if not rooms:
+            if name is not None:
+                raise ValueError("not serving rooms")
+            return None
+        if name is None:
+            if len(rooms) == 1:
+                return rooms[0]
+            raise ValueError(f"\"room\" is required, one of: {', '.join(room.name for room in rooms)}")
+        for room in rooms:
+            if room.name.lower() == str(name).lower():
+                return room
+        raise ValueError(f"no room named {name!r}")
+
+    def _command(self, client: ControlClient, request: dict) -> dict:
+        text = request.get('text')
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("command needs \"text\"")
+        room = self._room(request.get('room'))
+        self.counts['commands'] += 1
+        intent = handle_command(text, CommandTrace(), room, dedup=request.get('dedup', True) is not False)
+        if room is not None:
+            room.last = (text, intent)
+        return {'intent': intent}
+
+    def _status(self, client: ControlClient, request: dict) -> dict:
+        rooms = getattr(self.runtime, 'rooms', None) or []
+        status = {
+            'uptime': time.monotonic() - self.started_at if self.started_at else 0.0,
+            'listening': bool(self.runtime.listen) if self.runtime is not None else False,
+            'latency': metrics.snapshot(),
+            'counters': metrics.counter_snapshot(),
+            'actions': action_dispatcher.stats(),
+            'control': self.stats(),
+        }
+        if rooms:
+            status['rooms'] = {room.name: dict(room.state.summary(), speech=room.speech.stats()) for room in rooms}
+        else:
+            status['state'] = state.summary()
+            status['speech'] = speech_scheduler.stats()
+        return {'status': status}
+
+    def _subscribe(self, client: ControlClient, request: dict) -> dict:
+        kinds = request.get('events', EVENT_KINDS)
+        if isinstance(kinds, str):
+            kinds = [kinds]
+        unknown = [kind for kind in kinds if kind not in EVENT_KINDS]
+        if unknown:
+            raise ValueError(f"unknown events {', '.join(map(str, unknown))}, expected {', '.join(EVENT_KINDS)}")
+        event_hub.subscribe(client, frozenset(kinds))
+        return {'events': sorted(client.kinds)}
+
+    def _unsubscribe(self, client: ControlClient, request: dict) -> dict:
+        event_hub.unsubscribe(client)
+        return {}
+
+    def stats(self) -> dict:
+        return dict(self.counts, clients=len(self.clients), subscribers=len(event_hub.subscribers),
+                    events_published=event_hub.published, event_batches=event_hub.batches,
+                    events_dropped=event_hub.dropped + sum(client.dropped for client in self.clients))
+
+# Replay benchmark harness
+class ReplayCapture:
+    """Stand-in for AudioCapture whose ring buffer is fed by the replay harness"""
+
+    def __init__(self, sample_rate: int = CAPTURE_RATE, seconds: float = CAPTURE_SECONDS):
+        self.device = None
+        self.sample_rate = sample_rate
+        self.ring = RingBuffer(int(sample_rate * seconds))
+        self.overflows = 0
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+class TranscriptRecognizer(RecognizerBackend):
+    """Deterministic ASR stand-in: returns the transcript the harness expects next"""
+    name = "transcript"
+
+    def __init__(self):
+        self.transcript = None
+
+    def recognize(self, pcm: np.ndarray, sample_rate: int) -> str:
+        if not self.transcript:
+            raise sr.UnknownValueError()
+        return self.transcript
+
+def load_labeled_clips(directory: str) -> List[Tuple[str, str]]:
+    """(path, transcript) pairs from a flight recorder index, labels.json, <phrase>/*.wav folders, or file names"""
+    index_path = os.path.join(directory, "index.jsonl")
+    if os.path.exists(index_path):
+        # The recognized text is the transcript unless a "label" has been added to correct it
+        clips = []
+        with open(index_path, 'r') as f:
+            for line in f:
+                entry = json.loads(line)
+                label = entry.get("label") or entry.get("text")
+                if label:
+                    clips.append((os.path.join(directory, entry["clip"]), label.lower()))
+        return clips
+    labels_path = os.path.join(directory, "labels.json")
+    if os.path.exists(labels_path):
+        with open(labels_path, 'r') as f:
+            labels = json.load(f)
+        return [(os.path.join(directory, name), text.lower()) for name, text in sorted(labels.items())]
+    clips = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if os.path.isdir(path):
+            label = name.replace('_', ' ').lower()
+            clips.extend((os.path.join(path, clip), label) for clip in sorted(os.listdir(path))
+                         if clip.lower().endswith(".wav"))
+        elif name.lower().endswith(".wav"):
+            stem = re.sub(r"[_-]?\d+$", "", os.path.splitext(name)[0])
+            clips.append((path, stem.replace('_', ' ').lower()))
+    return clips
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process, where the platform reports it"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+def run_replay_benchmark(directory: str, recognizer: str = "transcript", template_dir: str = TEMPLATE_DIR,
+                         gap_seconds: float = 0.6, seed: int = 0, early_commit=None) -> dict:
+    """Stream labeled WAVs through capture -> endpoint -> recognize -> handle_command -> speak.
+
+    Input injection, the volume endpoint, TTS and playback are replaced with
+    deterministic in-memory stand-ins; ASR is the transcript stub unless
+    recognizer is 'kws'. Audio is pushed faster than real time, one capture
+    block at a time, and every finished utterance is processed before the
+    next block is written. early_commit enables streaming mode with those
+    command classes.
+    """
+    global input_backend, volume_backend, speech_cache, speech_scheduler, audio_player, metrics, action_dispatcher
+    clips = load_labeled_clips(directory)
+    if not clips:
+        raise ValueError(f"no labeled WAV files in {directory}")
+
+    saved = (input_backend, volume_backend, speech_cache, speech_scheduler, audio_player, metrics,
+             action_dispatcher)
+    cache_dir = tempfile.mkdtemp(prefix="kevin_replay_")
+    try:
+        input_backend = FakeInput()
+        volume_backend = FakeVolumeBackend()
+        volume_backend.subscribe(sync_volume_state)
+        audio_player = NullPlayer()
+        speech_cache = SpeechCache(cache_dir=cache_dir, synthesizer=silent_synthesize)
+        speech_scheduler = SpeechScheduler()
+        metrics = LatencyMetrics()
+        transcripts = TranscriptRecognizer()
+        backend = create_recognizer("kws", template_dir) if recognizer == "kws" else transcripts
+
+        capture = ReplayCapture()
+        ring = capture.ring
+        rate = capture.sample_rate
+        # Rate limits and dedup windows follow audio time, not the accelerated wall clock
+        action_dispatcher = ActionDispatcher(clock=lambda: ring.written / rate, threaded=False)
+        listener = PhraseListener(capture)
+        committer = None
+        if early_commit is not None and backend.streaming:
+            committer = EarlyCommitter(listener, backend, early_commit)
+        rng = np.random.default_rng(seed)
+
+        def noise(count):
+            return (0.002 * rng.standard_normal(count)).astype(np.float32)
+
+        ring.write(noise(rate // 2))
+        listener.calibrate(0.5, timeout=0)
+
+        timeline = []  # (start, end, clip index)
+        outcomes = [{"file": os.path.relpath(path, directory), "label": label,
+                     "expected": getattr(command_grammar.match(label), 'intent', None),
+                     "heard": [], "intents": []} for path, label in clips]
+
+        def clip_for(start, end):
+            best, best_overlap = None, 0
+            for clip_start, clip_end, index in timeline[-4:]:
+                overlap = min(end, clip_end) - max(start, clip_start)
+                if overlap > best_overlap:
+                    best, best_overlap = index, overlap
+            return best
+
+        def drain():
+            while True:
+                utterance = listener.listen(timeout=0, on_partial=committer and committer.on_partial)
+                if utterance is None:
+                    action_dispatcher.pump()
+                    return
+                index = clip_for(*utterance)
+                transcripts.transcript = clips[index][1] if index is not None else None
+                if committer is not None and committer.finished(utterance):
+                    text, intent = committer.last
+                else:
+                    try:
+                        text, intent = recognize_and_dispatch(listener, backend, utterance,
+                                                              committer and committer.resume_after(utterance))
+                    except sr.UnknownValueError:
+                        text, intent = None, None
+                if index is not None:
+                    outcomes[index]["heard"].append(text)
+                    outcomes[index]["intents"].append(intent)
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        audio_samples = 0
+        for index, (path, label) in enumerate(clips):
+            pcm, clip_rate = read_wav_mono(path)
+            pcm = resample(pcm, clip_rate, rate)
+            gap = int(gap_seconds * rate)
+            stream = np.concatenate([noise(gap), pcm + noise(len(pcm))])
+            timeline.append((ring.written + gap, ring.written + len(stream), index))
+            for offset in range(0, len(stream), CAPTURE_BLOCK):
+                ring.write(stream[offset:offset + CAPTURE_BLOCK])
+                drain()
+            audio_samples += len(stream)
+        tail = noise(rate)
+        for offset in range(0, len(tail), CAPTURE_BLOCK):
+            ring.write(tail[offset:offset + CAPTURE_BLOCK])
+            drain()
+        audio_samples += len(tail)
+        action_dispatcher.pump(float('inf'))
+
+        # Let the speech worker finish what is still queued
+        deadline = time.monotonic() + 5.0
+        while (speech_scheduler.depth or speech_scheduler.speaking) and time.monotonic() < deadline:
+            time.sleep(0.005)
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+
+        # Commands with a known effect, through the same dispatcher and stand-ins
+        action_checks = {}
+        for text, expected in ACTION_CHECKS:
+            handle_command(text, dedup=False)
+            action_dispatcher.pump(float('inf'))
+            action_checks[text] = bool(expected(volume_backend))
+        speech_scheduler.stop()
+
+        correct = sum(1 for o in outcomes if o["expected"] in o["intents"])
+        exact = sum(1 for o in outcomes if o["label"] in o["heard"])
+        utterances = sum(len(o["heard"]) for o in outcomes)
+        commands = sum(1 for o in outcomes for intent in o["intents"] if intent)
+        return {
+            "schema": 1,
+            "timestamp": datetime.now().isoformat(timespec='seconds'),
+            "python": sys.version.split()[0],
+            "recognizer": backend.name,
+            "clips": len(clips),
+            "utterances": utterances,
+            "commands": commands,
+            "audio_seconds": audio_samples / rate,
+            "wall_seconds": wall,
+            "cpu_seconds": cpu,
+            "commands_per_second": commands / wall if wall else 0.0,
+            "realtime_factor": (audio_samples / rate) / wall if wall else 0.0,
+            "intent_accuracy": correct / len(clips),
+            "transcript_accuracy": exact / len(clips),
+            "missed_clips": sum(1 for o in outcomes if not o["heard"]),
+            "peak_rss_mb": peak_rss_mb(),
+            "input_events": len(input_backend.events),
+            "action_checks": action_checks,
+            "action_checks_passed": all(action_checks.values()),
+            "volume": volume_backend.stats(),
+            "actions": action_dispatcher.stats(),
+            "streaming": committer.stats() if committer is not None else None,
+            "speech": speech_scheduler.stats(),
+            "stages": metrics.snapshot(),
+            "per_clip": outcomes,
+        }
+    finally:
+        if volume_backend is not None:
+            volume_backend.stop()
+        (input_backend, volume_backend, speech_cache, speech_scheduler, audio_player, metrics,
+         action_dispatcher) = saved
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+# Scripted commands run after a replay, with the expected state of the stand-in volume endpoint
+ACTION_CHECKS = (
+    ("volume 40", lambda backend: round(backend.get_level(), 2) == 0.4),
+    ("set volume to zero", lambda backend: round(backend.get_level(), 2) == 0.0),
+    ("volume 30", lambda backend: round(backend.get_level(), 2) == 0.3),
+    ("turn the volume up to 60", lambda backend: round(backend.get_level(), 2) == 0.6),
+    ("volume down to 20", lambda backend: round(backend.get_level(), 2) == 0.2),
+    ("volume up by 20", lambda backend: round(backend.get_level(), 2) == 0.4),
+    ("volume 0", lambda backend: round(backend.get_level(), 2) == 0.0),
+    ("mute", lambda backend: backend.is_muted()),
+    ("unmute", lambda backend: not backend.is_muted()),
+)
+
+# Live status updater
+def benchmark_runtime(seconds: float = 10.0, runtime: str = "asyncio", utterance_every: float = 2.0) -> dict:
+    """Run the live pipeline on simulated real-time audio and report CPU use, context switches and latency.
+
+    The first half of the run is silence (idle cost); in the second half a
+    half-second tone recognized as "pause" arrives every utterance_every
+    seconds. Audio is written in 20 ms blocks by a feeder thread, as the
+    PortAudio callback would. The thread runtime cannot be stopped, so run
+    each runtime in its own process to compare them.
+    """
+    global input_backend, volume_backend, speech_cache, speech_scheduler, audio_player, metrics, \
+        action_dispatcher, audio_capture, wake_gate, calibration_refiner
+    try:
+        import resource
+    except ImportError:
+        resource = None
+
+    def usage():
+        cpu = time.process_time()
+        if resource is None:
+            return cpu, 0, 0
+        ru = resource.getrusage(resource.RUSAGE_SELF)
+        return cpu, ru.ru_nvcsw, ru.ru_nivcsw
+
+    saved = (input_backend, volume_backend, speech_cache, speech_scheduler, audio_player, metrics,
+             action_dispatcher, audio_capture, wake_gate, calibration_refiner)
+    saved_config = (state.config_file, state.calibration)
+    cache_dir = tempfile.mkdtemp(prefix="kevin_bench_")
+    stop_feeding = threading.Event()
+    try:
+        # Calibration profiles of the simulated mic go to a scratch config
+        state.config_file, state.calibration = os.path.join(cache_dir, "config.json"), {}
+        input_backend = FakeInput()
+        volume_backend = FakeVolumeBackend()
+        audio_player = NullPlayer()
+        speech_cache = SpeechCache(cache_dir=cache_dir, synthesizer=silent_synthesize)
+        speech_scheduler = SpeechScheduler()
+        action_dispatcher = ActionDispatcher()
+        metrics = LatencyMetrics()
+        wake_gate = None
+        capture = ReplayCapture()
+        capture.device = device_registry.to_sd(state.mic_device)
+        audio_capture = capture
+        transcripts = TranscriptRecognizer()
+        transcripts.transcript = "pause"
+        rate = capture.sample_rate
+        rng = np.random.default_rng(0)
+        tone = (0.2 * np.sin(2 * np.pi * 220 * np.arange(rate // 2) / rate)).astype(np.float32)
+        speaking_from = time.monotonic() + 1.0 + seconds / 2
+
+        def feed():
+            next_block = time.monotonic()
+            pending = np.zeros(0, dtype=np.float32)
+            next_tone = speaking_from
+            while not stop_feeding.is_set():
+                next_block += CAPTURE_BLOCK / rate
+                delay = next_block - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                block = (0.002 * rng.standard_normal(CAPTURE_BLOCK)).astype(np.float32)
+                if not len(pending) and time.monotonic() >= next_tone:
+                    pending = tone
+                    next_tone += utterance_every
+                if len(pending):
+                    chunk = pending[:CAPTURE_BLOCK]
+                    block[:len(chunk)] += chunk
+                    pending = pending[CAPTURE_BLOCK:]
+                capture.ring.write(block)
+
+        feeder = threading.Thread(target=feed, name="kevin-bench-feed", daemon=True)
+        feeder.start()
+
+        kevin_runtime = None
+        runner = None
+        if runtime == "asyncio":
+            kevin_runtime = KevinRuntime(transcripts, poll_devices=False, export_metrics=False)
+            runner = threading.Thread(target=lambda: asyncio.run(kevin_runtime.run(greeting=False)),
+                                      name="kevin-bench-runtime", daemon=True)
+            runner.start()
+        else:
+            listen_forever(transcripts)
+
+        time.sleep(1.0)  # calibration
+        idle_start = usage()
+        time.sleep(seconds / 2)
+        idle_end = usage()
+        time.sleep(max(0.0, speaking_from - time.monotonic()))
+        busy_start = usage()
+        time.sleep(seconds / 2)
+        busy_end = usage()
+
+        if kevin_runtime is not None:
+            kevin_runtime.stop()
+            runner.join(timeout=5)
+        stages = metrics.snapshot()
+
+        def rates(start, end, span):
+            return {
+                "cpu_percent": (end[0] - start[0]) / span * 100,
+                "context_switches_per_second": ((end[1] - start[1]) + (end[2] - start[2])) / span
+                if resource is not None else None,
+            }
+
+        return {
+            "runtime": runtime,
+            "seconds": seconds,
+            "threads": threading.active_count(),
+            "idle": rates(idle_start, idle_end, seconds / 2),
+            "active": rates(busy_start, busy_end, seconds / 2),
+            "commands": action_dispatcher.stats()["executed"],
+            "trigger_p50_ms": stages.get("trigger", {}).get("p50", 0.0) * 1000,
+            "response_p50_ms": stages.get("response", {}).get("p50", 0.0) * 1000,
+            "stopped_cleanly": runner is not None and not runner.is_alive(),
+        }
+    finally:
+        stop_feeding.set()
+        (input_backend, volume_backend, speech_cache, speech_scheduler, audio_player, metrics,
+         action_dispatcher, audio_capture, wake_gate, calibration_refiner) = saved
+        state.config_file, state.calibration = saved_config
+
+def benchmark_rooms(max_rooms: int = 4, utterances: int = 20, workers: Optional[int] = None, seed: int = 0) -> dict:
+    """Commands per second of the multi-room runtime with 1..max_rooms rooms talking at once.
+
+    Each room replays the same number of synthetic command phrases (distinct
+    frequency sweeps enrolled as keyword templates) as fast as the pipeline
+    takes them; the pool has one worker per room, up to workers (default: the
+    core count). Worker start-up is not timed.
+    """
+    global input_backend, volume_backend, speech_cache, speech_scheduler, audio_player, metrics, \
+        action_dispatcher, wake_gate
+    rate = CAPTURE_RATE
+    rng = np.random.default_rng(seed)
+    sweeps = {"pause": (300, 700), "volume up": (900, 400), "forward": (500, 1200)}
+
+    def sweep(start_hz, end_hz, jitter=0.0):
+        t = np.arange(int(0.5 * rate))
+        phase = 2 * np.pi * np.cumsum(np.linspace(start_hz, end_hz, len(t)) * (1 + jitter)) / rate
+        return (0.3 * np.sin(phase) * np.hanning(len(t))).astype(np.float32)
+
+    def noise(seconds):
+        return (0.002 * rng.standard_normal(int(seconds * rate))).astype(np.float32)
+
+    saved = (input_backend, volume_backend, speech_cache, speech_scheduler, audio_player, metrics,
+             action_dispatcher, wake_gate)
+    saved_config = (state.config_file, state.calibration)
+    work_dir = tempfile.mkdtemp(prefix="kevin_bench_")
+    try:
+        state.config_file, state.calibration = os.path.join(work_dir, "config.json"), {}
+        for phrase, (start_hz, end_hz) in sweeps.items():
+            os.makedirs(os.path.join(work_dir, "templates", phrase))
+            sf.write(os.path.join(work_dir, "templates", phrase, "0.wav"), sweep(start_hz, end_hz), rate)
+        input_backend = FakeInput()
+        volume_backend = FakeVolumeBackend()
+        audio_player = NullPlayer()
+        speech_cache = SpeechCache(cache_dir=os.path.join(work_dir, "cache"), synthesizer=silent_synthesize)
+        speech_scheduler = SpeechScheduler()
+        wake_gate = None
+        max_workers = workers or os.cpu_count() or 1
+        results = []
+        for count in range(1, max_rooms + 1):
+            action_dispatcher = ActionDispatcher()
+            metrics = LatencyMetrics()
+            phrases = list(sweeps)
+            signals = []
+            for _ in range(count):
+                parts = [noise(0.3)]
+                for i in rng.integers(len(phrases), size=utterances):
+                    parts += [sweep(*sweeps[phrases[i]], rng.uniform(-0.03, 0.03)), noise(0.6)]
+                signals.append(np.concatenate(parts))
+            rooms = [Room(f"room {i + 1}", volume=FakeVolumeBackend(), player=NullPlayer(),
+                          capture=ReplayCapture(rate, 1.0 + len(signals[i]) / rate + 1.0)) for i in range(count)]
+            pool = RecognitionPool("kws", os.path.join(work_dir, "templates"), workers=min(count, max_workers))
+            runtime = MultiRoomRuntime(rooms, pool, max_utterances=utterances, poll_devices=False,
+                                       export_metrics=False)
+            runner = threading.Thread(target=lambda: asyncio.run(runtime.run(greeting=False)),
+                                      name="kevin-bench-rooms", daemon=True)
+            runner.start()
+            deadline = time.monotonic() + 60.0
+            while any(room.listener is None for room in rooms) and runner.is_alive() and time.monotonic() < deadline:
+                # Background noise, as a live mic would deliver it, until every room has calibrated
+                for room in rooms:
+                    room.capture.ring.write(noise(0.1))
+                time.sleep(0.01)
+
+            start = time.monotonic()
+            for room, samples in zip(rooms, signals):
+                room.capture.ring.write(samples)
+            while runtime.recognitions < count * utterances and runner.is_alive() and time.monotonic() < deadline:
+                time.sleep(0.001)
+            elapsed = time.monotonic() - start
+            runtime.stop()
+            runner.join(timeout=5)
+
+            commands = sum(room.state.commands_processed for room in rooms)
+            asr = metrics.snapshot().get("asr", {})
+            results.append({
+                "rooms": count,
+                "workers": pool.workers,
+                "commands": commands,
+                "seconds": elapsed,
+                "commands_per_second": commands / elapsed if elapsed else 0.0,
+                "asr_p50_ms": asr.get("p50", 0.0) * 1000,
+                "asr_p95_ms": asr.get("p95", 0.0) * 1000,
+            })
+        return {"cores": os.cpu_count(), "utterances_per_room": utterances, "runs": results}
+    finally:
+        (input_backend, volume_backend, speech_cache, speech_scheduler, audio_player, metrics,
+         action_dispatcher, wake_gate) = saved
+        state.config_file, state.calibration = saved_config
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def benchmark_daemon(commands: int = 20000, clients: int = 16, window: int = 64) -> dict:
+    """Commands per second injected through the control socket, and what the dispatch queue made of them.
+
+    The commands are shared among clients connections, each keeping up to
+    window requests in flight and bypassing the duplicate filter, while one
+    more connection subscribes to every event. The daemon opens no microphone and acts on the offline
+    stand-ins. Clients and daemon share this process (and its GIL), so the
+    rate is a lower bound.
+    """
+    global input_backend, volume_backend, speech_cache, speech_scheduler, audio_player, metrics, action_dispatcher
+    phrases = ["volume up", "volume down", "pause", "play", "forward", "back", "scroll down", "scroll up",
+               "mute", "unmute", "set volume to 40", "hello", "what is the weather"]
+    saved = (input_backend, volume_backend, speech_cache, speech_scheduler, audio_player, metrics, action_dispatcher)
+    saved_config = (state.config_file, state.calibration)
+    work_dir = tempfile.mkdtemp(prefix="kevin_bench_")
+    path = os.path.join(work_dir, "kevin.sock")
+    try:
+        state.config_file, state.calibration = os.path.join(work_dir, "config.json"), {}
+        input_backend = FakeInput()
+        volume_backend = FakeVolumeBackend()
+        audio_player = NullPlayer()
+        speech_cache = SpeechCache(cache_dir=os.path.join(work_dir, "cache"), synthesizer=silent_synthesize)
+        speech_scheduler = SpeechScheduler()
+        action_dispatcher = ActionDispatcher()
+        metrics = LatencyMetrics()
+        server = ControlServer(path)
+        runtime = KevinRuntime(None, poll_devices=False, export_metrics=False, control=server, listen=False)
+        runner = threading.Thread(target=lambda: asyncio.run(runtime.run(greeting=False)),
+                                  name="kevin-bench-daemon", daemon=True)
+        runner.start()
+        deadline = time.monotonic() + 10.0
+        while server.server is None and runner.is_alive() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        events = dict.fromkeys(EVENT_KINDS, 0)
+        latencies = []
+        failures = []
+
+        async def subscriber(ready: asyncio.Event):
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b'{"op": "subscribe"}\n')
+            await reader.readline()
+            ready.set()
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        return
+                    events[json.loads(line)['event']] += 1
+            finally:
+                writer.close()
+
+        async def client(offset: int, count: int):
+            reader, writer = await asyncio.open_unix_connection(path)
+            sent = {}
+            for i in range(count):
+                while len(sent) >= window:
+                    reply = json.loads(await reader.readline())
+                    latencies.append(time.perf_counter() - sent.pop(reply['id']))
+                    if not reply['ok']:
+                        failures.append(reply['error'])
+                sent[i] = time.perf_counter()
+                request = {'op': 'command', 'text': phrases[(offset + i) % len(phrases)], 'dedup': False, 'id': i}
+                writer.write(json.dumps(request).encode() + b"\n")
+            while sent:
+                reply = json.loads(await reader.readline())
+                latencies.append(time.perf_counter() - sent.pop(reply['id']))
+                if not reply['ok']:
+                    failures.append(reply['error'])
+            writer.close()
+
+        async def drive():
+            ready = asyncio.Event()
+            follower = asyncio.create_task(subscriber(ready))
+            await asyncio.wait_for(ready.wait(), 5.0)
+            start = time.perf_counter()
+            await asyncio.gather(*(client(n, commands // clients + (n < commands % clients))
+                                   for n in range(clients)))
+            elapsed = time.perf_counter() - start
+            # Let queued actions run and their events arrive
+            for _ in range(500):
+                if not action_dispatcher.depth:
+                    break
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.2)
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b'{"op": "status"}\n')
+            status = json.loads(await reader.readline())
+            writer.close()
+            follower.cancel()
+            await asyncio.gather(follower, return_exceptions=True)
+            return elapsed, status
+
+        elapsed, status = asyncio.run(drive())
+        runtime.stop()
+        runner.join(timeout=5)
+        latencies.sort()
+
+        def percentile(q):
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+
+        actions = action_dispatcher.stats()
+        return {
+            "commands": len(latencies),
+            "clients": clients,
+            "window": window,
+            "seconds": elapsed,
+            "commands_per_second": len(latencies) / elapsed if elapsed else 0.0,
+            "reply_p50_ms": percentile(0.50),
+            "reply_p99_ms": percentile(0.99),
+            "errors": len(failures),
+            "actions": {key: actions[key] for key in ('submitted', 'merged', 'deduplicated', 'executed', 'max_depth')},
+            "dispatch_p50_ms": metrics.snapshot().get("dispatch", {}).get("p50", 0.0) * 1000,
+            "events_received": events,
+            "events_dropped": status.get('status', {}).get('control', {}).get('events_dropped'),
+            "status_ok": status.get('ok', False),
+            "stopped_cleanly": not runner.is_alive() and not os.path.exists(path),
+        }
+    finally:
+        (input_backend, volume_backend, speech_cache, speech_scheduler, audio_player, metrics,
+         action_dispatcher) = saved
+        state.config_file, state.calibration = saved_config
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def benchmark_input(presses: int = 50) -> dict:
+    """Time per injected key press through each input backend that can run here.
+
+    Every backend taps F24, which applications ignore, presses times; it is
+    registered with the backends measured here and nowhere else. The
+    pyautogui path is measured as Kevin used it (sleeping pyautogui.PAUSE
+    after each call) and without the pause. uinput writes to /dev/null
+    instead of a device when /dev/uinput is not writable, which leaves out
+    only the kernel's own handling of the events.
+    """
+    def measure(backend: InputBackend) -> dict:
+        seconds = []
+        for _ in range(presses):
+            start = time.perf_counter()
+            backend.press('f24')
+            seconds.append(time.perf_counter() - start)
+        seconds.sort()
+        return {
+            "p50_ms": seconds[len(seconds) // 2] * 1000,
+            "p99_ms": seconds[min(len(seconds) - 1, int(0.99 * len(seconds)))] * 1000,
+            "mean_ms": sum(seconds) / len(seconds) * 1000,
+            "writes_per_press": backend.batches / presses,
+        }
+
+    candidates = [("fake", lambda: FakeInput(keys={'f24': None})),
+                  ("pyautogui", lambda: PyAutoGuiInput(pause=True, keys={'f24': 'f24'})),
+                  ("pyautogui_no_pause", lambda: PyAutoGuiInput(keys={'f24': 'f24'}))]
+    if sys.platform == "win32":
+        candidates.append(("sendinput", lambda: SendInputInput(keys={'f24': 0x87})))
+    elif os.access("/dev/uinput", os.W_OK):
+        candidates.append(("uinput", lambda: UinputInput(keys={'f24': 194})))
+    else:
+        candidates.append(("uinput_dry_run",
+                           lambda: UinputInput(os.devnull, create=False, keys={'f24': 194})))
+    results = {}
+    for label, factory in candidates:
+        backend = None
+        try:
+            backend = factory()
+            if isinstance(backend, UinputInput):
+                time.sleep(max(0.0, backend.ready_at - time.monotonic()))
+            results[label] = measure(backend)
+        except Exception as e:
+            results[label] = {"available": False, "error": str(e) or type(e).__name__}
+        finally:
+            if backend is not None:
+                backend.close()
+    baseline = results.get("pyautogui", {}).get("p50_ms")
+    if baseline:
+        for label, result in results.items():
+            if result.get("p50_ms"):
+                result["speedup_vs_pyautogui"] = baseline / result["p50_ms"]
+    return {"presses": presses, "backends": results}
+
+def update_status_display(max_fps: float = 4.0):
+    global dashboard
+    dashboard = StatusDashboard(max_fps=max_fps)
+    dashboard.start()
 
 # Enhanced shutdown handler
-def handle_shutdown():
+def handle_shutdown(save_config: bool = True):
+    if dashboard is not None:
+        dashboard.stop()
     console.print("\n[yellow]👋 Shutting down Kevin AI...[/yellow]")
+    metrics.stop_export()
     
-    # Save current configuration
-    state.save_config()
+    # Keep the latest calibration for the next start
+    if calibration_refiner is not None:
+        calibration_refiner.stop()
+        with contextlib.suppress(Exception):
+            calibration_refiner.refine()
+    
+    # Write out the last audio and any clips still waiting for it
+    if flight_recorder is not None:
+        flight_recorder.stop()
+    
+    # Save current configuration (not in multi-room mode, where the rooms file holds the devices)
+    if save_config:
+        state.save_config()
     
     # Cleanup audio devices
+    device_registry.stop_polling()
+    if volume_backend is not None:
+        volume_backend.stop()
+    if input_backend is not None:
+        input_backend.close()
+    if audio_capture is not None:
+        audio_capture.stop()
     device_manager.cleanup()
     
-    speak("Kevin AI shutting down. Goodbye boss.")
+    # Drop queued actions and responses so the goodbye is not talked over
+    action_dispatcher.stop()
+    speech_scheduler.stop()
+    speak(SHUTDOWN_MESSAGE)
     console.print("[green]✅ Kevin AI has been shut down successfully.[/green]")
     sys.exit(0)
 
+# Command-line options
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="K.E.V.I.N - Voice Controlled Media Assistant",
+                                     fromfile_prefix_chars="@",
+                                     epilog="Options can also be read from a file, one per line: kevin.py @FILE")
+    parser.add_argument("--grammar", default=GRAMMAR_FILE,
+                        help="command grammar JSON file (default: %(default)s)")
+    parser.add_argument("--recognizer", choices=["auto", "kws", "google"], default="auto",
+                        help="speech recognizer backend; auto uses offline keyword spotting "
+                             "when templates exist, with Google as fallback (default: %(default)s)")
+    parser.add_argument("--templates", default=TEMPLATE_DIR,
+                        help="keyword template directory, one sub-directory of WAVs per phrase (default: %(default)s)")
+    parser.add_argument("--kws-threshold", type=float, default=8.0,
+                        help="maximum DTW distance accepted by the keyword spotter (default: %(default)s)")
+    parser.add_argument("--eval-recognizer", metavar="DIR",
+                        help="recognize labeled WAVs in DIR/<phrase>/ with the selected backend and exit")
+    parser.add_argument("--streaming", action="store_true",
+                        help="run commands from partial results before the phrase ends (keyword spotter only)")
+    parser.add_argument("--early-commit", default=",".join(sorted(EARLY_COMMIT_CLASSES)), metavar="CLASSES",
+                        help="command classes allowed to fire early in streaming mode, from "
+                             "toggle,seek,track,scroll,volume,volume_set,mute,reply (default: %(default)s)")
+    parser.add_argument("--wake-templates", default=WAKE_TEMPLATE_DIR,
+                        help="recordings of \"Kevin\"; when present, audio only reaches the recognizer "
+                             "after the wake word (default: %(default)s)")
+    parser.add_argument("--wake-sensitivity", type=float, default=0.5,
+                        help="wake word sensitivity from 0 (strict) to 1 (lenient) (default: %(default)s)")
+    parser.add_argument("--wake-window", type=float, default=8.0,
+                        help="seconds commands are accepted after the wake word (default: %(default)s)")
+    parser.add_argument("--no-wake-word", action="store_true",
+                        help="send every utterance to the recognizer")
+    parser.add_argument("--eval-wake", metavar="DIR",
+                        help="run the wake word detector over DIR/positive and DIR/negative WAVs and exit")
+    parser.add_argument("--use-saved", action="store_true",
+                        help="use the saved device configuration without asking")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print an import and initialization timing breakdown once listening")
+    parser.add_argument("--volume-backend", choices=["auto", "pycaw", "pactl", "fake"], default="auto",
+                        help="system volume control (default: %(default)s)")
+    parser.add_argument("--input-backend", choices=["auto", *INPUT_BACKENDS], default="auto",
+                        help="key and scroll injection: auto uses SendInput on Windows and /dev/uinput on Linux "
+                             "when writable, else pyautogui (default: %(default)s)")
+    parser.add_argument("--toggle-key", choices=["playpause", "space"], default=toggle_key,
+                        help="key sent by play and pause: the media key, or space for players that only "
+                             "listen to their own window (default: %(default)s)")
+    parser.add_argument("--runtime", choices=["asyncio", "threads"], default="asyncio",
+                        help="asyncio task runtime, or the previous thread-per-loop design (default: %(default)s)")
+    parser.add_argument("--rooms", metavar="FILE", nargs="?", const=ROOMS_FILE,
+                        help="serve every microphone/speaker pair listed in FILE at once, each with its own "
+                             f"state and volume (default file: {ROOMS_FILE})")
+    parser.add_argument("--workers", type=int, metavar="N",
+                        help="recognizer processes in multi-room mode (default: one per core)")
+    parser.add_argument("--headless", action="store_true",
+                        help="run without the live status dashboard")
+    parser.add_argument("--daemon", action="store_true",
+                        help="run as a service: no prompts or dashboard, devices from the saved configuration "
+                             "or --mic/--speaker, and the control socket on")
+    parser.add_argument("--socket", nargs="?", const=CONTROL_SOCKET, metavar="PATH",
+                        help=f"serve the control API on a Unix socket at PATH (default: {CONTROL_SOCKET}, "
+                             "always on with --daemon)")
+    parser.add_argument("--config", default=state.config_file, metavar="FILE",
+                        help="device and calibration configuration file (default: %(default)s)")
+    parser.add_argument("--mic", metavar="DEVICE",
+                        help="microphone for --daemon, as a PyAudio index or part of its name")
+    parser.add_argument("--speaker", metavar="DEVICE",
+                        help="audio output for --daemon, as a PyAudio index or part of its name")
+    parser.add_argument("--no-mic", action="store_true",
+                        help="with --daemon, open no microphone and take commands from the control socket only")
+    parser.add_argument("--max-fps", type=float, default=4.0,
+                        help="dashboard refresh rate cap (default: %(default)s)")
+    parser.add_argument("--no-metrics", action="store_true",
+                        help="disable per-stage latency instrumentation")
+    parser.add_argument("--metrics-interval", type=float, default=10.0,
+                        help=f"seconds between rewrites of {METRICS_JSON} and {METRICS_PROM} (default: %(default)s)")
+    parser.add_argument("--bench-replay", metavar="DIR",
+                        help="replay labeled WAVs in DIR through the full pipeline with offline stand-ins and exit "
+                             "(ASR is a transcript stub unless --recognizer kws)")
+    parser.add_argument("--bench-output", metavar="FILE",
+                        help="also write benchmark results as JSON to FILE")
+    parser.add_argument("--bench-dashboard", type=int, metavar="N",
+                        help="time N dashboard redraws off-screen and exit")
+    parser.add_argument("--bench-tts", action="store_true",
+                        help="splice every volume acknowledgement from cached segments, check the joins and exit")
+    parser.add_argument("--bench-playback", type=int, metavar="N",
+                        help="play N short responses through the stream player on a simulated device and exit")
+    parser.add_argument("--record", nargs="?", const=FLIGHT_DIR, metavar="DIR",
+                        help=f"keep a flight recording of the microphone and a clip of every utterance in DIR "
+                             f"(default: {FLIGHT_DIR})")
+    parser.add_argument("--record-seconds", type=float, default=300.0, metavar="SECONDS",
+                        help="length of the flight recording ring (default: %(default)s)")
+    parser.add_argument("--barge-in", choices=BARGE_IN_MODES, default="stop",
+                        help="when the user talks over a response: stop it, duck it, or turn echo cancellation "
+                             "and barge-in off (default: %(default)s)")
+    parser.add_argument("--bench-echo", type=float, metavar="SECONDS",
+                        help="interrupt a simulated SECONDS-long response in a simulated room and report echo "
+                             "cancellation and barge-in results, then exit")
+    parser.add_argument("--bench-recorder", type=float, metavar="SECONDS",
+                        help="flight-record SECONDS of synthetic capture and report its CPU cost, then exit")
+    parser.add_argument("--bench-vad", type=float, metavar="SECONDS",
+                        help="benchmark voice activity detection over SECONDS of synthetic audio and exit")
+    parser.add_argument("--bench-runtime", type=float, metavar="SECONDS",
+                        help="run the --runtime on simulated live audio for SECONDS and report idle CPU, "
+                             "context switches and command latency, then exit")
+    parser.add_argument("--bench-rooms", type=int, metavar="N",
+                        help="measure multi-room commands per second with 1..N rooms talking at once and exit")
+    parser.add_argument("--bench-grammar", type=int, metavar="N",
+                        help="benchmark grammar matching over N synthetic utterances and exit")
+    parser.add_argument("--bench-input", type=int, metavar="N",
+                        help="time N key presses through each available input backend against pyautogui and exit")
+    parser.add_argument("--bench-daemon", type=int, metavar="N",
+                        help="inject N commands through the control socket from concurrent clients and exit")
+    args = parser.parse_args(argv)
+    if args.runtime == "threads" and (args.daemon or args.socket):
+        parser.error("--daemon and --socket need the asyncio runtime")
+    if args.no_mic and (not args.daemon or args.rooms):
+        parser.error("--no-mic needs --daemon and is not available with --rooms")
+    return args
+
 # Main execution with better error handling
 if __name__ == "__main__":
+    startup_profile.record("module load", time.perf_counter() - STARTUP_T0)
+    args = parse_args()
+    state.config_file = args.config
+    if args.grammar != GRAMMAR_FILE:
+        command_grammar = load_grammar(args.grammar)
+    
+    if args.bench_grammar:
+        console.print_json(data=benchmark_grammar(command_grammar, args.bench_grammar))
+        sys.exit(0)
+    
+    if args.bench_dashboard:
+        console.print_json(data=benchmark_dashboard(args.bench_dashboard))
+        sys.exit(0)
+    
+    if args.bench_vad:
+        console.print_json(data=benchmark_vad(args.bench_vad))
+        sys.exit(0)
+    
+    if args.bench_recorder:
+        console.print_json(data=benchmark_recorder(args.bench_recorder))
+        sys.exit(0)
+    
+    if args.bench_echo:
+        console.print_json(data=benchmark_echo(args.bench_echo))
+        sys.exit(0)
+    
+    if args.bench_tts:
+        results = benchmark_tts()
+        console.print_json(data=results)
+        sys.exit(0 if results["continuous"] else 1)
+    
+    if args.bench_playback:
+        console.print_json(data=benchmark_playback(args.bench_playback))
+        sys.exit(0)
+    
+    if args.bench_runtime:
+        console.print_json(data=benchmark_runtime(args.bench_runtime, args.runtime))
+        sys.exit(0)
+    
+    if args.bench_rooms:
+        console.print_json(data=benchmark_rooms(args.bench_rooms, workers=args.workers))
+        sys.exit(0)
+    
+    if args.bench_daemon:
+        console.print_json(data=benchmark_daemon(args.bench_daemon))
+        sys.exit(0)
+    
+    if args.bench_input:
+        console.print_json(data=benchmark_input(args.bench_input))
+        sys.exit(0)
+    
+    metrics.set_enabled(not args.no_metrics)
+    metrics.interval = args.metrics_interval
+    barge_in_mode = args.barge_in
+    
+    if args.bench_replay:
+        results = run_replay_benchmark(args.bench_replay, "kws" if args.recognizer == "kws" else "transcript",
+                                       args.templates, early_commit=frozenset(args.early_commit.split(','))
+                                       if args.streaming else None)
+        if args.bench_output:
+            with open(args.bench_output, 'w') as f:
+                json.dump(results, f, indent=2)
+        console.print_json(data={k: v for k, v in results.items() if k != "per_clip"})
+        sys.exit(0)
+    
+    with startup_profile.stage("recognizer"):
+        recognizer_backend = create_recognizer(args.recognizer, args.templates, args.kws_threshold)
+    if args.eval_recognizer:
+        console.print_json(data=evaluate_recognizer(recognizer_backend, args.eval_recognizer))
+        sys.exit(0)
+    if args.eval_wake:
+        detector = WakeWordDetector(args.wake_sensitivity)
+        detector.load_templates(args.wake_templates)
+        console.print_json(data=evaluate_wake_word(detector, args.eval_wake))
+        sys.exit(0)
+    if not args.no_wake_word:
+        wake_gate = create_wake_gate(args.wake_templates, args.wake_sensitivity, args.wake_window)
+    
+    headless = args.headless or args.daemon
+    control = ControlServer(args.socket or CONTROL_SOCKET) if args.daemon or args.socket else None
     try:
-        # Show enhanced UI with device setup
-        show_enhanced_ui()
+        rooms = None
+        if args.rooms:
+            # Devices come from the rooms file instead of the interactive setup
+            speech_cache_instance().prewarm(static_phrases())
+            rooms = load_rooms(args.rooms)
+            if args.record:
+                for room in rooms:
+                    slug = re.sub(r"[^a-z0-9]+", "-", room.name.lower()).strip("-") or "room"
+                    room.recorder = FlightRecorder(os.path.join(args.record, slug), args.record_seconds,
+                                                   room=room.name)
+            console.print(Rule(f"[bold cyan]🎧 KEVIN AI SERVING {len(rooms)} ROOMS 🎧[/bold cyan]"))
+            state.status = "Online & Ready"
+        elif args.daemon:
+            # Saved or command-line devices; nothing waits for a keyboard
+            console.print(Rule("[bold cyan]🎧 KEVIN AI DAEMON 🎧[/bold cyan]"))
+            setup_headless(args.mic, args.speaker)
+            if args.record and not args.no_mic:
+                flight_recorder = FlightRecorder(args.record, args.record_seconds)
+        else:
+            # Show enhanced UI with device setup
+            show_enhanced_ui(args.use_saved)
+            if args.record:
+                flight_recorder = FlightRecorder(args.record, args.record_seconds)
         
-        # Start listening
-        listen_forever()
+        # System volume mirror
+        volume_backend = create_volume_backend(args.volume_backend)
+        volume_backend.subscribe(sync_volume_state)
         
-        # Start status display updater
-        update_status_display()
+        # Key and scroll injection, opened now so the first command does not wait for it
+        input_backend = create_input_backend(args.input_backend)
+        toggle_key = args.toggle_key
         
-        # Keep the program running
-        while True:
-            time.sleep(1)
+        # Follow hot-plugged devices without restarting capture or prompting
+        device_registry.subscribe(on_devices_changed)
+        device_registry.before_rescan.append(lambda: audio_capture is not None and audio_capture.stop())
+        device_registry.before_rescan.append(audio_player.close)
+        
+        early_commit = None
+        if args.streaming:
+            early_commit = frozenset(c.strip() for c in args.early_commit.split(',') if c.strip())
+            if not recognizer_backend.streaming:
+                console.print("[yellow]⚠️  Streaming needs the keyword spotter; waiting for final results[/yellow]")
+        
+        if rooms is not None:
+            # Capture and endpointing per room, recognition in a shared process pool
+            if early_commit is not None:
+                console.print("[yellow]⚠️  Streaming is not available in multi-room mode[/yellow]")
+            if wake_gate is not None:
+                for room in rooms:
+                    room.wake_gate = WakeWordGate(wake_gate.detector, wake_gate.window_seconds)
+            pool = RecognitionPool(args.recognizer, args.templates, args.kws_threshold, args.workers)
+            dashboard = None if headless else StatusDashboard(max_fps=args.max_fps)
+            # Rooms keep the streams they opened; a PortAudio rescan would close them all
+            runtime = MultiRoomRuntime(rooms, pool, dashboard, poll_devices=False,
+                                       on_ready=startup_profile.report if args.profile_startup else None,
+                                       control=control)
+            with contextlib.suppress(KeyboardInterrupt):
+                asyncio.run(runtime.run())
+            handle_shutdown(save_config=False)
+        elif args.runtime == "asyncio":
+            # Every loop is a task on one event loop; Ctrl+C or SIGTERM cancels them all
+            dashboard = None if headless else StatusDashboard(max_fps=args.max_fps)
+            runtime = KevinRuntime(recognizer_backend, early_commit, dashboard,
+                                   on_ready=startup_profile.report if args.profile_startup else None,
+                                   control=control, listen=not args.no_mic)
+            with contextlib.suppress(KeyboardInterrupt):
+                asyncio.run(runtime.run())
+            # The daemon's devices come from its configuration and flags, not from this run
+            handle_shutdown(save_config=not args.daemon)
+        else:
+            # Previous design: one daemon thread per loop
+            device_registry.start_polling(needs_rescan=devices_need_rescan)
+            
+            # Start listening before anything is said, so no command is missed
+            if metrics.enabled:
+                metrics.start_export()
+            with startup_profile.stage("capture start + calibration"):
+                listen_forever(recognizer_backend, early_commit)
+            speech_scheduler.submit(STARTUP_GREETING, PRIORITY_INFO)
+            
+            # Start status display updater
+            if not args.headless:
+                update_status_display(args.max_fps)
+            
+            if args.profile_startup:
+                startup_profile.report()
+            
+            # Keep the program running
+            while True:
+                time.sleep(1)
             
     except KeyboardInterrupt:
-        handle_shutdown()
+        handle_shutdown(save_config=not (args.rooms or args.daemon))
     except Exception as e:
         console.print(f"[red]💥 Fatal error: {e}[/red]")
         sys.exit(1)
\ No newline at end of file
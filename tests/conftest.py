@@ -0,0 +1,58 @@
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kevin
+
+
+class SpokenReplies:
+    """Stands in for the speech scheduler and keeps what would have been said"""
+
+    def __init__(self):
+        self.texts = []
+
+    def submit(self, text, priority=None, trace=None):
+        self.texts.append(text)
+        return True
+
+    def stats(self):
+        return {'spoken': len(self.texts)}
+
+
+class ManualClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def grammar():
+    """The built-in grammar, whatever kevin_grammar.json the working directory holds"""
+    return kevin.CommandGrammar(kevin.DEFAULT_GRAMMAR)
+
+
+@pytest.fixture
+def actions(monkeypatch, grammar):
+    """An unthreaded dispatcher on a manual clock, acting on fake volume and input backends"""
+    clock = ManualClock()
+    dispatcher = kevin.ActionDispatcher(clock=clock, threaded=False)
+    volume = kevin.FakeVolumeBackend(level=0.5)
+    keys = kevin.FakeInput()
+    spoken = SpokenReplies()
+    monkeypatch.setattr(kevin, 'command_grammar', grammar)
+    monkeypatch.setattr(kevin, 'action_dispatcher', dispatcher)
+    monkeypatch.setattr(kevin, 'volume_backend', volume)
+    monkeypatch.setattr(kevin, 'input_backend', keys)
+    monkeypatch.setattr(kevin, 'speech_scheduler', spoken)
+    monkeypatch.setattr(kevin, 'state', kevin.KevinState())
+    yield types.SimpleNamespace(dispatcher=dispatcher, clock=clock, volume=volume, input=keys, spoken=spoken)
+    volume.stop()
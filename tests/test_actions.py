@@ -0,0 +1,163 @@
+import time
+
+import pytest
+
+import kevin
+
+
+def keys(actions):
+    """Keys pressed so far, in order"""
+    return [event[1] for event in actions.input.events if event[0] == 'key' and event[2]]
+
+
+def test_burst_of_volume_steps_is_one_change_with_one_reply(actions):
+    for _ in range(3):
+        kevin.handle_command("volume up", dedup=False)
+    assert actions.dispatcher.depth == 1
+    assert actions.dispatcher.pump() == 1
+    assert actions.volume.get_level() == pytest.approx(0.8)
+    assert actions.spoken.texts == ["Volume increased to 80 percent."]
+    assert actions.dispatcher.stats()['merged'] == 2
+
+
+def test_repeat_within_the_dedup_window_is_dropped(actions):
+    assert actions.dispatcher.submit([('volume_up', 0.1)]) == ['volume_up']
+    actions.clock.advance(0.1)
+    assert actions.dispatcher.submit([('volume_up', 0.1), ('pause', 1)]) == ['pause']
+    actions.clock.advance(kevin.DEDUP_WINDOW)
+    assert actions.dispatcher.submit([('volume_up', 0.1)]) == ['volume_up']
+    assert actions.dispatcher.submit([('volume_up', 0.1)], dedup=False) == ['volume_up']
+    assert actions.dispatcher.stats()['deduplicated'] == 1
+
+
+def test_status_shows_only_commands_that_were_queued(actions):
+    kevin.handle_command("pause")
+    assert kevin.state.status == "Media Paused"
+    actions.dispatcher.pump()
+    kevin.handle_command("volume up")
+    actions.clock.advance(0.1)
+    # "pause" again is a duplicate recognition; only the volume change is shown
+    kevin.handle_command("pause and volume down")
+    assert kevin.state.status == "Volume Decreased"
+    actions.clock.advance(0.1)
+    kevin.handle_command("volume down")
+    assert kevin.state.status == "Volume Decreased"
+    kevin.handle_command("pause")
+    assert kevin.state.status == "Volume Decreased"
+
+
+def test_group_waits_out_its_min_interval(actions):
+    interval = kevin.ACTION_GROUPS['volume']['min_interval']
+    actions.dispatcher.submit([('volume_down', -0.1)])
+    assert actions.dispatcher.pump() == 1
+    actions.clock.advance(0.1)
+    actions.dispatcher.submit([('volume_down', -0.1)], dedup=False)
+    assert actions.dispatcher.pump() == 0
+    assert actions.dispatcher.next_wait() == pytest.approx(interval - 0.1)
+    # Arrivals while it waits join the waiting batch
+    actions.dispatcher.submit([('volume_down', -0.1)], dedup=False)
+    assert actions.dispatcher.pump(actions.clock() + interval) == 1
+    assert actions.volume.get_level() == pytest.approx(0.2)
+
+
+def test_other_groups_are_not_held_by_a_rate_limit(actions):
+    kevin.handle_command("pause")
+    actions.dispatcher.pump()
+    actions.clock.advance(0.05)
+    kevin.handle_command("skip forward 30 seconds")
+    assert actions.dispatcher.pump() == 1
+    assert keys(actions) == [kevin.toggle_key] + ["right"] * 6
+
+
+def test_pause_then_play_cancels_out(actions):
+    kevin.handle_command("pause")
+    kevin.handle_command("play")
+    actions.dispatcher.pump()
+    assert keys(actions) == []
+    assert actions.dispatcher.stats()['cancelled'] == 1
+
+
+def test_one_utterance_runs_every_intent_with_one_reply(actions):
+    assert kevin.handle_command("pause and turn the volume down") == "pause"
+    assert actions.dispatcher.pump() == 2
+    assert keys(actions) == [kevin.toggle_key]
+    assert actions.volume.get_level() == pytest.approx(0.4)
+    assert actions.spoken.texts == ["Media paused. Volume decreased to 40 percent."]
+
+
+@pytest.mark.parametrize("command, level", [("volume 0", 0.0), ("set volume to zero", 0.0), ("volume 35", 0.35)])
+def test_absolute_levels_are_always_applied(actions, command, level):
+    kevin.handle_command(command)
+    actions.dispatcher.pump()
+    assert actions.volume.get_level() == pytest.approx(level)
+
+
+def test_mute_and_unmute(actions):
+    kevin.handle_command("mute")
+    actions.dispatcher.pump()
+    assert actions.volume.is_muted()
+    actions.clock.advance(1.0)
+    kevin.handle_command("unmute")
+    actions.dispatcher.pump()
+    assert not actions.volume.is_muted()
+
+
+def test_volume_backend_applies_only_the_latest_write():
+    backend = kevin.FakeVolumeBackend(level=0.5)
+    for step in range(20):
+        backend.set_level(step / 100)
+    assert backend.flush()
+    assert backend.device_level == pytest.approx(0.19)
+    assert backend.device_writes <= backend.requests
+    backend.stop()
+
+
+def test_volume_backend_that_cannot_open_simulates():
+    class Unavailable(kevin.FakeVolumeBackend):
+        name = "unavailable"
+
+        def _thread_init(self):
+            raise OSError("no mixer")
+
+    backend = Unavailable()
+    backend.start()
+    assert backend.synced.wait(1.0)
+    started = time.monotonic()
+    backend.set_level(0.3)
+    assert backend.flush()
+    assert time.monotonic() - started < 0.5
+    assert backend.get_level() == pytest.approx(0.3) and not backend.running
+    assert backend.stats()['error'] == "no mixer"
+
+
+def test_volume_up_to_a_level_is_not_a_step(actions):
+    kevin.handle_command("turn the volume up to 60")
+    actions.dispatcher.pump()
+    assert actions.volume.get_level() == pytest.approx(0.6)
+    assert actions.spoken.texts == ["Volume set to 60 percent."]
+
+
+@pytest.mark.parametrize("command", ["hey kevin pause", "hi kevin, pause please", "pause, thanks kevin"])
+def test_pleasantries_around_a_command_are_not_answered(actions, command):
+    kevin.handle_command(command)
+    actions.dispatcher.pump()
+    assert keys(actions) == [kevin.toggle_key]
+    assert actions.spoken.texts == ["Media paused."]
+    assert kevin.state.status == "Media Paused"
+
+
+def test_each_room_turns_its_own_volume(actions):
+    rooms = [kevin.Room(name, volume=kevin.FakeVolumeBackend(level=0.5), player=object())
+             for name in ("kitchen", "office")]
+    for room in rooms:
+        room.speech = actions.spoken
+    kevin.handle_command("volume up", room=rooms[0])
+    kevin.handle_command("volume 20", room=rooms[1])
+    kevin.handle_command("mute")
+    actions.dispatcher.pump()
+    assert rooms[0].volume.get_level() == pytest.approx(0.6)
+    assert rooms[1].volume.get_level() == pytest.approx(0.2)
+    assert actions.volume.get_level() == pytest.approx(0.5) and actions.volume.is_muted()
+    assert rooms[0].state.current_volume == 60
+    for room in rooms:
+        room.volume.stop()
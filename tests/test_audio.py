@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+import kevin
+
+RATE = 16000
+
+
+def ramp(start, count):
+    return np.arange(start, start + count, dtype=np.float32)
+
+
+def test_ring_buffer_views_stay_contiguous_across_the_wrap():
+    ring = kevin.RingBuffer(10)
+    ring.write(ramp(0, 7))
+    ring.write(ramp(7, 6))  # wraps: positions 10-12 land at the start of the backing array
+    assert ring.written == 13 and ring.oldest == 3
+    view = ring.view(5, 13)
+    assert np.array_equal(view, ramp(5, 8))
+    assert view.base is ring.data  # a view, not a copy
+    assert np.array_equal(ring.latest(4), ramp(9, 4))
+
+
+def test_ring_buffer_keeps_the_newest_samples_of_an_oversized_write():
+    ring = kevin.RingBuffer(10)
+    ring.write(ramp(0, 25))
+    assert ring.written == 25
+    assert np.array_equal(ring.view(15, 25), ramp(15, 10))
+
+
+def test_ring_buffer_rejects_windows_it_no_longer_holds():
+    ring = kevin.RingBuffer(10)
+    ring.write(ramp(0, 15))
+    with pytest.raises(IndexError):
+        ring.view(2, 8)
+    with pytest.raises(IndexError):
+        ring.view(10, 16)
+
+
+def noise(seconds, level=0.002, seed=0):
+    return (level * np.random.default_rng(seed).standard_normal(int(seconds * RATE))).astype(np.float32)
+
+
+def voiced(seconds, level=0.2):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (level * (np.sin(2 * np.pi * 180 * t) + 0.5 * np.sin(2 * np.pi * 360 * t))).astype(np.float32)
+
+
+def test_vad_separates_voice_from_the_noise_floor():
+    vad = kevin.VoiceActivityDetector(RATE)
+    vad.calibrate(noise(0.5))
+    floor = vad.noise_floor_db
+    assert not vad.detect(noise(0.5, seed=1)).any()
+    assert vad.detect(voiced(0.3) + noise(0.3, seed=2)).all()
+    # Speech barely moves the floor
+    assert abs(vad.noise_floor_db - floor) < 3.0
+
+
+def test_vad_floor_follows_louder_noise():
+    # 6 dB more noise stays under the margin, so the floor adapts to it within a second
+    vad = kevin.VoiceActivityDetector(RATE)
+    vad.calibrate(noise(0.5, level=0.001))
+    before = vad.noise_floor_db
+    assert not vad.detect(noise(1.0, level=0.002, seed=3)).any()
+    assert vad.noise_floor_db == pytest.approx(before + 6.0, abs=1.0)
+
+
+def test_vad_decisions_are_per_frame():
+    vad = kevin.VoiceActivityDetector(RATE)
+    vad.calibrate(noise(0.5))
+    clip = np.concatenate([noise(0.2, seed=4), voiced(0.2), noise(0.2, seed=5)])
+    decisions = vad.detect(clip)
+    frames = len(clip) // vad.frame_len
+    assert len(decisions) == frames
+    third = frames // 3
+    assert not decisions[:third - 1].any() and decisions[third + 1:2 * third - 1].all()
+
+
+def endpointer(**options):
+    return kevin.Endpointer(frame_len=160, sample_rate=RATE, **options)  # 10 ms frames
+
+
+def test_endpointer_emits_one_utterance_with_pre_roll():
+    ep = endpointer(trailing_silence_ms=100, min_speech_ms=30, pre_roll_ms=50)
+    decisions = np.array([False] * 20 + [True] * 30 + [False] * 10)
+    utterances = ep.feed(decisions, position=0)
+    # Speech starts at frame 20 (sample 3200); it ends once 10 silent frames follow frame 49
+    assert utterances == [(3200 - 800, 60 * 160)]
+    assert not ep.in_speech
+
+
+def test_endpointer_ignores_blips_shorter_than_min_speech():
+    ep = endpointer(min_speech_ms=60)
+    assert ep.feed(np.array([False, True, True, False] * 10 + [False] * 30), position=0) == []
+
+
+def test_endpointer_carries_a_phrase_across_blocks_and_caps_its_length():
+    ep = endpointer(trailing_silence_ms=100, min_speech_ms=30, pre_roll_ms=0, max_phrase_s=0.5)
+    assert ep.feed(np.ones(20, dtype=bool), position=0) == []
+    assert ep.in_speech
+    # Still talking at 0.5 s: the phrase is cut there
+    assert ep.feed(np.ones(40, dtype=bool), position=20 * 160) == [(0, 50 * 160)]
+
+
+def test_phrase_listener_endpoints_audio_from_the_capture_ring():
+    capture = kevin.ReplayCapture(RATE, seconds=5.0)
+    listener = kevin.PhraseListener(capture)
+    capture.ring.write(noise(0.5))
+    listener.calibrate(0.5, timeout=0)
+    capture.ring.write(np.concatenate([noise(0.3, seed=6), voiced(0.4), noise(0.6, seed=7)]))
+    start, end = listener.listen(timeout=0)
+    # Onset at 0.8 s less the 200 ms pre-roll; the end follows 200 ms of trailing silence
+    assert start == pytest.approx(0.6 * RATE, abs=0.03 * RATE)
+    assert end == pytest.approx(1.4 * RATE, abs=0.05 * RATE)
+    assert listener.audio(start, end).base is capture.ring.data
+    assert listener.listen(timeout=0) is None
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+import kevin
+
+
+@pytest.fixture
+def control(actions, monkeypatch):
+    monkeypatch.setattr(kevin, 'event_hub', kevin.EventHub())
+    server = kevin.ControlServer(path="unused.sock")
+    client = kevin.ControlClient(writer=None, max_buffer=1 << 16)
+
+    def ask(line):
+        raw = server.handle(client, line if isinstance(line, bytes) else line.encode())
+        assert raw.endswith(b"\n")
+        return json.loads(raw)
+    ask.server, ask.client = server, client
+    return ask
+
+
+def test_command_request_dispatches_and_echoes_the_id(control, actions):
+    reply = control('{"op": "command", "text": "volume 30", "id": 7}')
+    assert reply == {'intent': 'set_volume', 'ok': True, 'id': 7}
+    actions.dispatcher.pump()
+    assert actions.volume.get_level() == pytest.approx(0.3)
+
+
+def test_a_line_that_is_not_json_is_a_command(control, actions):
+    assert control("pause") == {'intent': 'pause', 'ok': True}
+    assert actions.dispatcher.depth == 1
+
+
+def test_dedup_false_lets_repeats_through(control, actions):
+    for _ in range(3):
+        control('{"op": "command", "text": "volume up", "dedup": false}')
+    assert actions.dispatcher.stats()['deduplicated'] == 0
+    control('{"op": "command", "text": "volume up"}')
+    assert actions.dispatcher.stats()['deduplicated'] == 1
+
+
+def test_unrecognized_command_has_no_intent(control):
+    assert control('{"op": "command", "text": "what time is it"}') == {'intent': None, 'ok': True}
+
+
+@pytest.mark.parametrize("line, error", [
+    ('{"op": "launch"}', "unknown op 'launch'"),
+    ('[1, 2]', "a request is a JSON object"),
+    ('{"op": "command"}', "command needs \"text\""),
+    ('{"op": "command", "text": "pause", "room": "kitchen"}', "not serving rooms"),
+    ('{"op": "subscribe", "events": ["weather"]}', "unknown events weather"),
+    ('{"op": ', None),
+])
+def test_bad_requests_are_answered_with_an_error(control, line, error):
+    reply = control(line)
+    assert reply['ok'] is False
+    if error is not None:
+        assert reply['error'].startswith(error)
+    assert control.server.counts['errors'] == 1
+
+
+def test_oversized_request_is_refused(control):
+    reply = control(b"x" * (kevin.ControlServer.MAX_REQUEST + 1))
+    assert reply == {'ok': False, 'error': "request too long"}
+
+
+def test_subscribe_and_unsubscribe(control):
+    assert control('{"op": "subscribe", "events": "command", "id": "s"}') == {'events': ['command'], 'ok': True,
+                                                                               'id': 's'}
+    assert kevin.event_hub.wanted['command'] == 1
+    assert control('{"op": "unsubscribe"}') == {'ok': True}
+    assert kevin.event_hub.wanted['command'] == 0
+
+
+def test_status_reports_state_and_dispatch_counters(control, actions):
+    control("mute")
+    status = control('{"op": "status"}')['status']
+    assert status['state']['last_command'] == "mute"
+    assert status['actions']['submitted'] == 1
+    assert status['control']['commands'] == 1
+    assert control('{"op": "ping"}') == {'ok': True}
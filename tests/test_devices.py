@@ -0,0 +1,42 @@
+import kevin
+
+
+def registry(fingerprint):
+    devices = kevin.DeviceRegistry()
+    devices.loaded = True  # nothing enumerated: every saved device is missing
+    devices.fingerprint = fingerprint
+    return devices
+
+
+def test_missing_device_waits_for_the_signature_to_change(monkeypatch):
+    monkeypatch.setattr(kevin, 'device_registry', registry("cards-v1"))
+    monkeypatch.setattr(kevin, 'audio_capture', None)
+    monkeypatch.setattr(kevin, 'state', kevin.KevinState())
+    kevin.state.mic_key = ("USB Headset", "ALSA", 1, 0, 0)
+    assert not kevin.devices_need_rescan()
+
+
+def test_missing_device_is_retried_slowly_without_a_signature(monkeypatch):
+    devices = registry(None)
+    monkeypatch.setattr(kevin, 'device_registry', devices)
+    monkeypatch.setattr(kevin, 'audio_capture', None)
+    monkeypatch.setattr(kevin, 'state', kevin.KevinState())
+    kevin.state.mic_key = ("USB Headset", "Core Audio", 1, 0, 0)
+    devices.last_rescan = kevin.time.monotonic()
+    assert not kevin.devices_need_rescan()
+    devices.last_rescan -= kevin.MISSING_DEVICE_RESCAN_S + 1
+    assert kevin.devices_need_rescan()
+
+
+def test_stalled_capture_always_rescans(monkeypatch):
+    stalled = type('Capture', (), {'stalled': True})()
+    monkeypatch.setattr(kevin, 'device_registry', registry("cards-v1"))
+    monkeypatch.setattr(kevin, 'audio_capture', stalled)
+    assert kevin.devices_need_rescan()
+
+
+def test_keyed_devices_number_identical_headsets():
+    entries = [(("Headset", "ALSA", 1, 2), 3, 48000.0), (("Headset", "ALSA", 1, 2), 5, 48000.0),
+               (("Speakers", "ALSA", 0, 2), 4, 44100.0)]
+    assert [key for key, _, _ in kevin.DeviceRegistry._keyed(entries)] == [
+        ("Headset", "ALSA", 1, 2, 0), ("Headset", "ALSA", 1, 2, 1), ("Speakers", "ALSA", 0, 2, 0)]
@@ -0,0 +1,120 @@
+import pytest
+
+import kevin
+
+
+def parsed(grammar, text):
+    return [(c.intent, c.value, c.unit) for c in grammar.parse(text)]
+
+
+@pytest.mark.parametrize("tokens, expected", [
+    (["40"], (40.0, None, 1)),
+    (["forty"], (40.0, None, 1)),
+    (["twenty", "five", "percent"], (25.0, "percent", 3)),
+    (["a", "hundred"], (100.0, None, 2)),
+    (["two", "hundred"], (200.0, None, 2)),
+    (["ninety", "nine"], (99.0, None, 2)),
+    (["30", "seconds"], (30.0, "seconds", 2)),
+    (["two", "minutes"], (2.0, "minutes", 2)),
+    (["3", "notches"], (3.0, "steps", 2)),
+    (["zero"], (0.0, None, 1)),
+])
+def test_parse_number(tokens, expected):
+    assert kevin.parse_number(tokens, 0) == expected
+
+
+def test_parse_number_without_a_number_stays_put():
+    assert kevin.parse_number(["up", "please"], 0) == (None, None, 0)
+    assert kevin.parse_number(["volume", "40"], 1) == (40.0, None, 2)
+    assert kevin.parse_number([], 0) == (None, None, 0)
+
+
+def test_parse_single_intents(grammar):
+    assert parsed(grammar, "pause") == [("pause", None, None)]
+    assert parsed(grammar, "Kevin, PAUSE the video!") == [("pause", None, None)]
+    assert parsed(grammar, "what's the weather") == []
+
+
+def test_parse_prefers_the_longest_phrase(grammar):
+    assert parsed(grammar, "skip forward") == [("forward", None, None)]
+    assert parsed(grammar, "next track") == [("next_track", None, None)]
+    assert parsed(grammar, "volume up") == [("volume_up", None, None)]
+
+
+def test_parse_matches_whole_words_only(grammar):
+    # "up" must not fire inside "unpause", nor "stop" inside "stopwatch"
+    assert parsed(grammar, "unpause") == [("play", None, None)]
+    assert parsed(grammar, "stopwatch") == []
+
+
+def test_parse_numbers_after_a_phrase(grammar):
+    assert parsed(grammar, "volume 40") == [("set_volume", 40.0, None)]
+    assert parsed(grammar, "set volume to forty") == [("set_volume", 40.0, None)]
+    assert parsed(grammar, "skip forward 30 seconds") == [("forward", 30.0, "seconds")]
+    assert parsed(grammar, "go back two minutes") == [("backward", 2.0, "minutes")]
+    assert parsed(grammar, "volume up by 20 percent") == [("volume_up", 20.0, "percent")]
+    assert parsed(grammar, "scroll down 3") == [("scroll_down", 3.0, None)]
+
+
+def test_parse_several_intents_in_order(grammar):
+    assert parsed(grammar, "pause and turn the volume down") == [("pause", None, None),
+                                                                 ("volume_down", None, None)]
+    # A number belongs to the phrase before it and never reaches past the next phrase
+    assert parsed(grammar, "volume 30 and skip forward 10 seconds") == [("set_volume", 30.0, None),
+                                                                        ("forward", 10.0, "seconds")]
+
+
+@pytest.mark.parametrize("action, value, unit, amount", [
+    ("set_volume", 40.0, None, 0.4),
+    ("set_volume", 0.0, None, 0.0),
+    ("set_volume", 250.0, None, 1.0),
+    ("set_volume", None, None, None),
+    ("volume_up", None, None, 0.1),
+    ("volume_up", 20.0, "percent", 0.2),
+    ("volume_up", 2.0, None, 0.2),
+    ("volume_down", 20.0, None, -0.2),
+    ("forward", 30.0, "seconds", 6),
+    ("forward", 3.0, None, 3),
+    ("forward", 99.0, None, 20),
+    ("backward", 10.0, "minutes", -kevin.MAX_SEEK_STEPS),
+    ("scroll_down", 3.0, None, -3 * kevin.SCROLL_STEP),
+    ("next_track", 2.0, None, 2),
+    ("praise", None, None, None),
+])
+def test_action_amount(action, value, unit, amount):
+    if amount is None:
+        assert kevin.action_amount(action, value, unit) is None
+    else:
+        assert kevin.action_amount(action, value, unit) == pytest.approx(amount)
+
+
+def test_early_match_waits_for_a_phrase_that_cannot_grow(grammar):
+    # "volume" may still become "volume up"; mute waits for the final result
+    assert grammar.early_match("volume") is None
+    assert grammar.early_match("mute") is None
+    assert grammar.early_match("pause").intent == "pause"
+    assert grammar.early_match("pause and") is None
+    assert grammar.early_match("pause play") is None
+
+
+def test_up_or_down_to_a_level_sets_it(grammar):
+    assert parsed(grammar, "turn the volume up to 60") == [("set_volume", 60.0, None)]
+    assert parsed(grammar, "volume down to 20 percent") == [("set_volume", 20.0, "percent")]
+    assert parsed(grammar, "volume up by 20") == [("volume_up", 20.0, None)]
+    assert parsed(grammar, "volume down 20") == [("volume_down", 20.0, None)]
+    assert parsed(grammar, "volume up to") == [("volume_up", None, None)]
+
+
+def test_volume_steps_wait_for_the_final_result(grammar):
+    assert grammar.early_match("volume up") is None
+    custom = kevin.CommandGrammar(dict(kevin.DEFAULT_GRAMMAR, volume_up=dict(kevin.DEFAULT_GRAMMAR['volume_up'],
+                                                                                  commit='early')))
+    assert custom.early_match("volume up").intent == "volume_up"
+
+
+def test_pleasantries_give_way_to_a_command(grammar):
+    assert parsed(grammar, "hey kevin pause") == [("pause", None, None)]
+    assert parsed(grammar, "hey kevin") == [("greeting", None, None)]
+    assert parsed(grammar, "thanks, how are you") == [("thanks", None, None), ("status", None, None)]
+    # "hey" may still go on to a command
+    assert grammar.early_match("hey") is None
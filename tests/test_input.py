@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+import kevin
+
+
+def test_presses_are_one_batch_of_down_up_pairs():
+    backend = kevin.FakeInput()
+    backend.press("right", presses=3)
+    assert backend.events == [('key', 'right', True), ('key', 'right', False)] * 3
+    assert backend.batches == 1 and backend.sent == 6
+
+
+def test_only_known_keys_can_be_pressed():
+    with pytest.raises(ValueError):
+        kevin.FakeInput().press("f24")
+    backend = kevin.FakeInput(keys={'f24': None})
+    backend.press("f24")
+    assert backend.events[0] == ('key', 'f24', True)
+
+
+def uinput_events(backend, events):
+    """(type, code, value) of each input_event the batch encodes to"""
+    return [event[2:] for event in kevin.UinputInput.EVENT.iter_unpack(backend.encode(events))]
+
+
+def test_uinput_encodes_keys_from_its_own_and_registered_codes():
+    backend = kevin.UinputInput(os.devnull, create=False, keys={'f24': 194})
+    events = uinput_events(backend, [('key', 'playpause', True), ('key', 'f24', True)])
+    assert events == [(1, 164, 1), (0, 0, 0), (1, 194, 1), (0, 0, 0)]
+    assert 'f24' not in kevin.UinputInput.KEY_CODES
+    backend.close()
+
+
+def test_uinput_scrolls_in_high_resolution_units_with_whole_notches():
+    backend = kevin.UinputInput(os.devnull, create=False)
+    events = uinput_events(backend, [('scroll', -kevin.SCROLL_STEP)])
+    assert [(code, value) for kind, code, value in events if kind == backend.EV_REL] == \
+        [(backend.REL_WHEEL_HI_RES, -300), (backend.REL_WHEEL, -2)]
+    backend.close()
+
+
+class ClickInput(kevin.FakeInput):
+    """A backend whose wheel events count whole clicks, like pyautogui off Windows"""
+    wheel_resolution = 1
+
+
+def test_scroll_amounts_cover_the_same_distance_on_every_backend():
+    fine, clicks = kevin.FakeInput(), ClickInput()
+    for backend in (fine, clicks):
+        for _ in range(4):
+            backend.scroll(kevin.SCROLL_STEP)
+        backend.scroll(-kevin.WHEEL_DELTA)
+    # 4 x 2.5 notches up, 1 down: 9 notches, however the backend counts them
+    assert sum(event[1] for event in fine.events) == 9 * kevin.WHEEL_DELTA
+    assert [event[1] for event in clicks.events] == [2, 3, 2, 3, -1]
+
+
+def test_pyautogui_scrolls_in_clicks_off_windows():
+    expected = kevin.WHEEL_DELTA if kevin.sys.platform == "win32" else 1
+    assert kevin.PyAutoGuiInput.wheel_resolution == expected
@@ -0,0 +1,65 @@
+import types
+
+import numpy as np
+import pytest
+
+import kevin
+
+
+class BrokenPlayer:
+    def play(self, data, sample_rate):
+        raise OSError("device unavailable")
+
+
+@pytest.fixture
+def default_output(monkeypatch, tmp_path, grammar):
+    """Replies rendered from a tone cache in tmp_path; sounddevice replaced by a recorder of its calls"""
+    monkeypatch.setattr(kevin, 'command_grammar', grammar)
+    monkeypatch.setattr(kevin, 'speech_cache', kevin.SpeechCache(cache_dir=str(tmp_path),
+                                                                 synthesizer=kevin.tone_synthesize))
+    calls = []
+    monkeypatch.setattr(kevin, 'sd', types.SimpleNamespace(
+        play=lambda data, rate, device=None: calls.append(('play', len(data), rate, device)),
+        wait=lambda: calls.append(('wait',))))
+    return calls
+
+
+def test_failed_speaker_falls_back_to_the_system_default(monkeypatch, default_output):
+    state = kevin.KevinState()
+    state.speaker_device = 3
+    monkeypatch.setattr(kevin, 'state', state)
+    kevin.speak("Media paused.", player=BrokenPlayer())
+    assert [call[0] for call in default_output] == ['play', 'wait']
+    assert default_output[0][1] > 0 and default_output[0][3] is None
+
+
+class StalledStream(kevin.FakeOutputStream):
+    """An output stream whose device stops asking for audio"""
+
+    def start(self):
+        self.active = True
+
+
+def test_a_stalled_speaker_times_out_and_is_reopened():
+    player = kevin.StreamPlayer(device=0, samplerate=48000, stream_factory=StalledStream, stall_seconds=0.05)
+    clip = np.zeros(480, dtype=np.float32)
+    with pytest.raises(TimeoutError):
+        player.play(clip, 48000)
+    assert player.stalls == 1 and player.opens == 2
+    assert player.clips == [] and not player.stream.active
+
+
+def test_a_working_speaker_plays_the_whole_clip():
+    player = kevin.StreamPlayer(device=0, samplerate=48000, stream_factory=kevin.FakeOutputStream,
+                                stall_seconds=0.5)
+    player.play(np.full(2400, 0.25, dtype=np.float32), 48000)
+    assert player.stalls == 0 and player.opens == 1
+    assert player.stream.samples >= 2400
+    player.close()
+
+
+def test_a_stalled_speaker_falls_back_to_the_system_default(default_output):
+    player = kevin.StreamPlayer(device=0, samplerate=48000, stream_factory=StalledStream, stall_seconds=0.05)
+    kevin.speak("Media paused.", player=player)
+    assert [call[0] for call in default_output] == ['play', 'wait']
+    assert default_output[0][3] is None
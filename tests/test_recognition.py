@@ -0,0 +1,37 @@
+import numpy as np
+import soundfile as sf
+
+import kevin
+
+RATE = 16000
+PHRASES = {'pause': (300, 800, 0.5), 'volume up': (900, 300, 0.6), 'mute': (500, 520, 0.5)}
+
+
+def chirp(start_hz, end_hz, seconds, detune=0.0):
+    t = np.arange(int(seconds * RATE)) / RATE
+    phase = 2 * np.pi * np.cumsum(np.linspace(start_hz, end_hz, len(t)) * (1 + detune)) / RATE
+    return (0.3 * (np.sin(phase) + 0.5 * np.sin(2 * phase)) * np.hanning(len(t))).astype(np.float32)
+
+
+def test_keyword_spotter_enrolls_wav_templates(tmp_path):
+    for phrase, (start_hz, end_hz, seconds) in PHRASES.items():
+        folder = tmp_path / phrase.replace(' ', '_')
+        folder.mkdir()
+        for take in range(2):
+            sf.write(str(folder / f"{take}.wav"), chirp(start_hz, end_hz, seconds, 0.02 * take), RATE)
+    spotter = kevin.KeywordSpotter()
+    assert spotter.load_templates(str(tmp_path)) == 6
+
+    for phrase, (start_hz, end_hz, seconds) in PHRASES.items():
+        ranked = spotter.score(chirp(start_hz, end_hz, seconds, 0.01), RATE)
+        assert ranked[0][0] == phrase
+        assert ranked[0][1] < spotter.threshold
+        assert spotter.partial(chirp(start_hz, end_hz, seconds, 0.01), RATE) in (phrase, None)
+
+
+def test_read_wav_mono_downmixes(tmp_path):
+    stereo = np.stack([np.full(800, 0.5), np.full(800, -0.25)], axis=1).astype(np.float32)
+    sf.write(str(tmp_path / "stereo.wav"), stereo, 8000)
+    pcm, rate = kevin.read_wav_mono(str(tmp_path / "stereo.wav"))
+    assert rate == 8000 and pcm.ndim == 1
+    assert np.allclose(pcm, 0.125, atol=1e-3)
@@ -0,0 +1,51 @@
+import os
+
+import kevin
+
+
+def counting_synthesizer(calls):
+    def synthesize(text, lang, voice):
+        calls.append(text)
+        return kevin.silent_synthesize(text, lang, voice)
+    return synthesize
+
+
+def test_hits_are_served_from_memory(tmp_path):
+    calls = []
+    cache = kevin.SpeechCache(cache_dir=str(tmp_path), synthesizer=counting_synthesizer(calls))
+    first, rate = cache.get("Media paused.")
+    again, _ = cache.get("Media paused.")
+    assert again is first and rate == 16000
+    assert calls == ["Media paused."]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_memory_evicts_least_recently_used(tmp_path):
+    cache = kevin.SpeechCache(cache_dir=str(tmp_path), synthesizer=kevin.silent_synthesize)
+    size = cache.get("aaaa")[0].nbytes
+    cache.max_memory_bytes = 2 * size
+    cache.get("bbbb")
+    cache.get("aaaa")  # now the most recently used
+    cache.get("cccc")
+    assert list(cache.memory) == [cache.key("aaaa"), cache.key("cccc")]
+    assert cache.stats()["memory_bytes"] == 2 * size
+
+
+def test_disk_evicts_least_recently_used_files(tmp_path):
+    cache = kevin.SpeechCache(cache_dir=str(tmp_path), synthesizer=kevin.silent_synthesize)
+    cache.get("aaaa")
+    size = cache.stats()["disk_bytes"]
+    cache.max_disk_bytes = 2 * size
+    cache.get("bbbb")
+    cache.get("cccc")
+    assert sorted(os.listdir(tmp_path)) == sorted(f"{cache.key(t)}.mp3" for t in ("bbbb", "cccc"))
+    assert cache.stats()["disk_entries"] == 2
+
+
+def test_disk_entries_survive_a_restart(tmp_path):
+    calls = []
+    kevin.SpeechCache(cache_dir=str(tmp_path), synthesizer=counting_synthesizer(calls)).get("Media playing.")
+    restarted = kevin.SpeechCache(cache_dir=str(tmp_path), synthesizer=counting_synthesizer(calls))
+    restarted.get("Media playing.")
+    assert calls == ["Media playing."]
+    assert restarted.stats()["disk_hits"] == 1
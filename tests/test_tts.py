@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+import kevin
+
+
+@pytest.fixture
+def renderer(monkeypatch, tmp_path, grammar):
+    """A renderer over a fresh cache in tmp_path, fed by the deterministic tone synthesizer"""
+    monkeypatch.setattr(kevin, 'command_grammar', grammar)
+    monkeypatch.setattr(kevin, 'speech_cache', kevin.SpeechCache(cache_dir=str(tmp_path),
+                                                                 synthesizer=kevin.tone_synthesize))
+    return kevin.ResponseRenderer()
+
+
+def volume_replies(levels):
+    templates = [spec['response'] for spec in kevin.DEFAULT_GRAMMAR.values() if '{volume}' in spec['response']]
+    return [template.format(volume=level) for template in templates for level in levels]
+
+
+@pytest.mark.parametrize("text", volume_replies([0, 7, 40, 100]))
+def test_volume_replies_are_spliced_without_clicks(renderer, text):
+    out, rate = renderer.render(text)
+    pieces, piece_rate = renderer.pieces(renderer.parse(text))
+    fade = int(rate * kevin.SPLICE_FADE_MS / 1000)
+    assert renderer.spliced == 1 and piece_rate == rate
+    assert len(out) == sum(len(piece) for piece in pieces) - fade * (len(pieces) - 1)
+    assert max(kevin.join_step_ratios(out, pieces, fade)) <= kevin.SPLICE_MAX_JOIN_RATIO
+    # Away from the crossfades every segment is played as it was prepared
+    position = 0
+    for piece in pieces:
+        assert np.allclose(out[position + fade:position + len(piece) - fade], piece[fade:-fade])
+        position += len(piece) - fade
+
+
+def test_segments_are_spoken_at_one_level(renderer):
+    out, rate = renderer.render("Volume set to 40 percent.")
+    pieces, _ = renderer.pieces(renderer.parse("Volume set to 40 percent."))
+    pad = int(rate * kevin.SPLICE_PAD_MS / 1000)
+    levels = [20 * np.log10(np.sqrt(np.mean(piece[pad:-pad] ** 2))) for piece in pieces]
+    assert max(levels) - min(levels) < 1.0
+    assert np.max(np.abs(out)) < 1.0
+
+
+def test_combined_reply_pauses_between_sentences(renderer):
+    out, rate = renderer.render("Media paused. Volume decreased to 40 percent.")
+    pieces, _ = renderer.pieces(renderer.parse("Media paused. Volume decreased to 40 percent."))
+    fade = int(rate * kevin.SPLICE_FADE_MS / 1000)
+    pause = int(rate * kevin.SENTENCE_PAUSE_MS / 1000)
+    assert len(pieces[1]) == pause and not pieces[1].any()
+    start = len(pieces[0]) - fade
+    assert not out[start + fade:start + pause - fade].any()
+    assert max(kevin.join_step_ratios(out, pieces, fade)) <= kevin.SPLICE_MAX_JOIN_RATIO
+
+
+def test_fixed_and_unknown_replies_are_synthesized_whole(renderer):
+    fixed, _ = renderer.render("Media paused.")
+    assert np.array_equal(fixed, kevin.speech_cache.get("Media paused.")[0])
+    renderer.render("Something else entirely.")
+    assert renderer.whole == 2 and renderer.spliced == 0
+
+
+def test_silent_segments_splice_to_silence(monkeypatch, tmp_path, grammar):
+    monkeypatch.setattr(kevin, 'command_grammar', grammar)
+    monkeypatch.setattr(kevin, 'speech_cache', kevin.SpeechCache(cache_dir=str(tmp_path),
+                                                                 synthesizer=kevin.silent_synthesize))
+    out, rate = kevin.ResponseRenderer().render("Volume increased to 80 percent.")
+    assert rate == 16000 and len(out) > 0
+    assert np.isfinite(out).all() and not out.any()